@@ -2,7 +2,17 @@
 This module contains various agent implementations for the healthcare simulation.
 """
 
+from .assignment import AssignmentWeights, PatientAssignmentEngine
+from .async_step import step_agents, step_agents_async
 from .base_agent import BaseAgent
 from .doctor_agent import DoctorAgent
+from .memory_index import Embedder, HashingEmbedder, MemoryIndex
+from .plan_schedule import PlanSchedule
+from .population import AgentPopulation
+from .reflection import ReflectionQueue
+from .rounds_planner import RoundsPlanner, RoundsStop
 
-__all__ = ['BaseAgent', 'DoctorAgent'] 
\ No newline at end of file
+__all__ = ['BaseAgent', 'DoctorAgent', 'Embedder', 'HashingEmbedder', 'MemoryIndex', 'PlanSchedule',
+           'AgentPopulation', 'step_agents', 'step_agents_async', 'AssignmentWeights',
+           'PatientAssignmentEngine', 'RoundsPlanner', 'RoundsStop',
+           'ReflectionQueue'] 
\ No newline at end of file
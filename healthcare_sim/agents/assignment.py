@@ -0,0 +1,206 @@
+"""
+Cost-based assignment of patients to doctors.
+
+Each doctor offers one slot per patient it can still take; the cost of a
+slot grows with the workload it represents, so filling a doctor's last slot
+is more expensive than its first. New and transferred patients are matched
+to the open slots with the Hungarian algorithm, while existing assignments
+stay fixed, so every update only solves for the patients that changed.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Cost of leaving a patient unassigned when every slot is taken
+UNASSIGNED_COST = 1e6
+
+@dataclass
+class AssignmentWeights:
+    """Weights of the cost terms of assigning a patient to a doctor slot."""
+    specialization: float = 1.0  # doctor lacks the specialization the patient needs
+    workload: float = 0.5        # share of the doctor's capacity in use
+    fatigue: float = 0.5         # doctor fatigue (0-1)
+    distance: float = 0.25       # travel distance, scaled to 0-1 over the batch
+
+def solve_assignment(cost: np.ndarray) -> np.ndarray:
+    """Minimum-cost assignment of rows to distinct columns (Hungarian algorithm).
+
+    Shortest augmenting path formulation with row/column potentials; the
+    inner scan over columns is vectorized, giving O(n^2 m) for n rows <= m
+    columns.
+
+    Returns:
+        Column assigned to each row
+    """
+    n, m = cost.shape
+    if n > m:
+        raise ValueError("cost matrix must have at least as many columns as rows")
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.int64)  # row (1-based) matched to each column, 0 if free
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for row in range(1, n + 1):
+        owner[0] = row
+        col = 0
+        min_reduced = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[col] = True
+            current_row = owner[col]
+            free = np.flatnonzero(~used[1:]) + 1
+            reduced = cost[current_row - 1, free - 1] - u[current_row] - v[free]
+            better = reduced < min_reduced[free]
+            min_reduced[free[better]] = reduced[better]
+            way[free[better]] = col
+
+            next_col = free[np.argmin(min_reduced[free])]
+            delta = min_reduced[next_col]
+            matched = np.flatnonzero(used)
+            u[owner[matched]] += delta
+            v[matched] -= delta
+            min_reduced[free] -= delta
+
+            col = next_col
+            if owner[col] == 0:
+                break
+
+        # Flip the augmenting path
+        while col:
+            previous = way[col]
+            owner[col] = owner[previous]
+            col = previous
+
+    assignment = np.empty(n, dtype=np.int64)
+    matched_cols = np.flatnonzero(owner[1:]) + 1
+    assignment[owner[matched_cols] - 1] = matched_cols - 1
+    return assignment
+
+class PatientAssignmentEngine:
+    """Assigns new and transferred patients to doctors at minimum total cost."""
+
+    def __init__(self,
+                 doctors: Sequence,
+                 max_patients_per_doctor: int = 12,
+                 distance_fn: Optional[Callable[[str, str], float]] = None,
+                 weights: Optional[AssignmentWeights] = None):
+        """
+        Args:
+            doctors: DoctorAgents that can take patients
+            max_patients_per_doctor: Capacity of each doctor
+            distance_fn: Travel distance between two location names
+                (e.g. from HospitalEnvironment); ignored when None
+            weights: Weights of the cost terms
+        """
+        self.doctors = {doctor.agent_id: doctor for doctor in doctors}
+        self.max_patients_per_doctor = max_patients_per_doctor
+        self.distance_fn = distance_fn
+        self.weights = weights or AssignmentWeights()
+        self.assignments: Dict[str, str] = {}  # patient_id -> doctor agent_id
+        for doctor in doctors:
+            for patient_id in doctor.patients:
+                self.assignments[patient_id] = doctor.agent_id
+
+    def add_doctor(self, doctor) -> None:
+        """Make a doctor available for future assignments."""
+        self.doctors[doctor.agent_id] = doctor
+        for patient_id in doctor.patients:
+            self.assignments[patient_id] = doctor.agent_id
+
+    def assign(self, patients: List[Dict]) -> Dict[str, Optional[str]]:
+        """Assign patients to open doctor slots, keeping existing assignments.
+
+        Args:
+            patients: Patient dicts with 'patient_id' and optionally 'ward'
+                (or 'location') and 'specialization'
+
+        Returns:
+            Patient id to the assigned doctor id (None if no slot was left)
+        """
+        patients = [p for p in patients if p['patient_id'] not in self.assignments]
+        if not patients:
+            return {}
+
+        slot_doctors, cost = self.cost_matrix(patients)
+        # Dummy columns let patients stay unassigned when slots run out
+        padded = np.hstack([cost, np.full((len(patients), len(patients)), UNASSIGNED_COST)])
+        columns = solve_assignment(padded)
+
+        result: Dict[str, Optional[str]] = {}
+        for patient, column in zip(patients, columns):
+            patient_id = patient['patient_id']
+            if column >= len(slot_doctors):
+                result[patient_id] = None
+                continue
+            doctor = slot_doctors[column]
+            info = dict(patient)
+            info.setdefault('ward', patient.get('location', ''))
+            doctor.patients[patient_id] = info
+            self.assignments[patient_id] = doctor.agent_id
+            result[patient_id] = doctor.agent_id
+        return result
+
+    def release(self, patient_id: str) -> Optional[Dict]:
+        """Remove a patient (e.g. on discharge), freeing the doctor's slot."""
+        doctor_id = self.assignments.pop(patient_id, None)
+        if doctor_id is None:
+            return None
+        return self.doctors[doctor_id].patients.pop(patient_id, None)
+
+    def transfer(self, patient: Dict) -> Optional[str]:
+        """Reassign a patient after a transfer, e.g. to a new ward."""
+        previous = self.release(patient['patient_id']) or {}
+        info = {**previous, **patient}
+        if 'location' in patient:
+            info['ward'] = patient['location']
+        return self.assign([info]).get(patient['patient_id'])
+
+    def cost_matrix(self, patients: List[Dict]) -> Tuple[List, np.ndarray]:
+        """Cost of each patient (row) in each open doctor slot (column)."""
+        doctors = [d for d in self.doctors.values() if d.status != "off-duty"]
+        slot_doctors = []
+        slot_workload = []
+        slot_index = []  # index into doctors
+        for i, doctor in enumerate(doctors):
+            load = len(doctor.patients)
+            for k in range(load, self.max_patients_per_doctor):
+                slot_doctors.append(doctor)
+                slot_workload.append((k + 1) / self.max_patients_per_doctor)
+                slot_index.append(i)
+        slot_index = np.asarray(slot_index, dtype=np.int64)
+        if len(slot_doctors) == 0:
+            return [], np.empty((len(patients), 0))
+
+        fatigue = np.array([d.fatigue for d in doctors])
+        specializations = [str(d.specialization or '').lower() for d in doctors]
+        mismatch = np.array([
+            [bool(p.get('specialization')) and str(p['specialization']).lower() != s
+             for s in specializations]
+            for p in patients
+        ], dtype=np.float64)
+
+        per_doctor = self.weights.specialization * mismatch + self.weights.fatigue * fatigue
+        if self.distance_fn is not None:
+            per_doctor = per_doctor + self.weights.distance * self._distances(patients, doctors)
+
+        cost = per_doctor[:, slot_index] + self.weights.workload * np.asarray(slot_workload)
+        return slot_doctors, cost
+
+    def _distances(self, patients: List[Dict], doctors: List) -> np.ndarray:
+        """Patient-to-doctor travel distances scaled to [0, 1], one lookup per location pair."""
+        targets, target_ids = np.unique(
+            [str(p.get('ward') or p.get('location') or '') for p in patients], return_inverse=True)
+        sources, source_ids = np.unique(
+            [str(d.current_location) for d in doctors], return_inverse=True)
+        pair_distances = np.array([
+            [self.distance_fn(source, target) for source in sources] for target in targets
+        ], dtype=np.float64)
+        distances = pair_distances[np.ix_(target_ids, source_ids)]
+
+        finite = distances[np.isfinite(distances)]
+        scale = finite.max() if finite.size and finite.max() > 0 else 1.0
+        # Unreachable locations cost twice the farthest reachable one
+        return np.minimum(distances / scale, 2.0)
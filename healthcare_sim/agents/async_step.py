@@ -0,0 +1,76 @@
+"""
+Concurrent evaluation of queued agent decisions.
+
+Agents queue decisions during a tick (see DoctorAgent.queue_decision). An
+async step builds every situation up front, awaits all brain calls
+concurrently under one semaphore that bounds in-flight LLM requests, and then
+applies the results on the calling thread in agent order and queue order, so
+the outcome does not depend on which call finishes first. With a
+DecisionBroker, the calls are micro-batched across agents that share a brain
+instead; each situation is still decided by its own agent's brain.
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from healthcare_sim.config import config
+
+async def decide_async(brain, situation: Dict, semaphore: asyncio.Semaphore,
+                       executor: Optional[Executor] = None) -> Dict:
+    """Evaluate one situation with the brain, holding the semaphore while in flight.
+
+    Brains with a make_decision_async coroutine are awaited directly; blocking
+    make_decision implementations run in the given executor.
+    """
+    async with semaphore:
+        if hasattr(brain, 'make_decision_async'):
+            return await brain.make_decision_async(situation)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, brain.make_decision, situation)
+
+async def step_agents_async(agents: Sequence,
+                            max_concurrent: Optional[int] = None,
+                            broker=None) -> Dict[str, List[Any]]:
+    """Resolve the pending decisions of all agents concurrently.
+
+    Args:
+        agents: Agents with take_pending_decisions() and a brain
+        max_concurrent: Maximum brain calls in flight across all agents
+            (defaults to config.VLLM_MAX_CONCURRENT)
+        broker: Optional DecisionBroker that batches the calls of all agents
+            per brain; it bounds in-flight batches itself
+
+    Returns:
+        Agent id to the results of its applied decisions, in queue order
+    """
+    limit = max_concurrent or config.VLLM_MAX_CONCURRENT
+    semaphore = asyncio.Semaphore(limit)
+
+    prepared = []  # (agent, situation, apply) in deterministic order
+    for agent in agents:
+        for situation, apply in agent.take_pending_decisions():
+            prepared.append((agent, situation, apply))
+
+    if broker is not None:
+        decisions = await asyncio.gather(*[
+            broker.make_decision_async(situation, agent.brain)
+            for agent, situation, _ in prepared
+        ])
+    else:
+        # One thread per permitted in-flight call for brains without an async API
+        with ThreadPoolExecutor(max_workers=limit) as executor:
+            decisions = await asyncio.gather(*[
+                decide_async(agent.brain, situation, semaphore, executor)
+                for agent, situation, _ in prepared
+            ])
+
+    results: Dict[str, List[Any]] = {agent.agent_id: [] for agent in agents}
+    for (agent, _, apply), decision in zip(prepared, decisions):
+        results[agent.agent_id].append(apply(decision))
+    return results
+
+def step_agents(agents: Sequence, max_concurrent: Optional[int] = None,
+                broker=None) -> Dict[str, List[Any]]:
+    """Blocking wrapper around step_agents_async for callers without an event loop."""
+    return asyncio.run(step_agents_async(agents, max_concurrent, broker))
@@ -1,8 +1,14 @@
 from typing import List, Dict, Optional
+from collections import Counter
 from dataclasses import dataclass, field
 from datetime import datetime
+import threading
 import numpy as np
 from enum import Enum
+from .memory_index import Embedder, MemoryIndex
+from .plan_schedule import PlanSchedule
+from .population import AgentPopulation, SkillView
+from .reflection import ReflectionQueue, get_default_reflection_queue
 
 class AgentRole(Enum):
     DOCTOR = "doctor"
@@ -19,6 +25,7 @@ class Memory:
     importance: float
     related_agents: List[str] = field(default_factory=list)
     location: str = ""
+    consolidated_count: int = 0  # number of original memories this entry summarizes
     
 @dataclass
 class Plan:
@@ -34,25 +41,88 @@ class BaseAgent:
                  agent_id: str,
                  role: AgentRole,
                  name: str,
-                 specialization: Optional[str] = None):
+                 specialization: Optional[str] = None,
+                 embedder: Optional[Embedder] = None,
+                 memory_budget: int = 500,
+                 reflection_budget: int = 50,
+                 population: Optional[AgentPopulation] = None,
+                 reflection_threshold: float = 2.5,
+                 reflection_queue: Optional[ReflectionQueue] = None):
         self.agent_id = agent_id
         self.role = role
         self.name = name
         self.specialization = specialization
         
+        # Fatigue, status, location and skills live in the population arrays
+        self.population = population if population is not None else AgentPopulation(initial_capacity=1)
+        self.population_index = self.population.register(self, role.value)
+        
         # Agent state
-        self.current_location = ""
         self.current_action = ""
-        self.status = "available"
         
         # Memory and planning
         self.memories: List[Memory] = []
-        self.daily_plan: List[Plan] = []
+        self.memory_index = MemoryIndex(embedder)  # row i embeds self.memories[i]
+        self.retrieval_weights = (1.0, 1.0, 1.0)  # recency, importance, relevance
+        self.schedule = PlanSchedule()
         self.reflections: List[str] = []
         
-        # Skills and attributes (can be extended based on role)
-        self.skills: Dict[str, float] = {}
-        self.fatigue = 0.0
+        # Memory budgets: once exceeded, the lowest-scoring old memories are
+        # consolidated into a summary entry until memory_compaction_ratio of
+        # the budget is in use; the newest memories are never consolidated
+        self.memory_budget = memory_budget
+        self.reflection_budget = reflection_budget
+        self.memory_compaction_ratio = 0.75
+        self.protected_recent_memories = max(5, memory_budget // 10)
+        self.memory_stats = {
+            "evicted": 0,              # original memories folded into summaries
+            "summaries_created": 0,
+            "reflections_dropped": 0,
+            "bytes_reclaimed": 0       # estimated text and index bytes released
+        }
+        
+        # Reflection runs on a background queue once the importance of the
+        # memories since the last reflection reaches reflection_threshold
+        self.reflection_threshold = reflection_threshold
+        self.reflection_queue = reflection_queue  # None: shared default queue
+        self._unreflected: List[Memory] = []
+        self._unreflected_importance = 0.0
+        self._reflection_lock = threading.Lock()
+        
+    @property
+    def fatigue(self) -> float:
+        return float(self.population.fatigue[self.population_index])
+    
+    @fatigue.setter
+    def fatigue(self, value: float) -> None:
+        self.population.fatigue[self.population_index] = value
+    
+    @property
+    def status(self) -> str:
+        return self.population.status_names.names[self.population.status[self.population_index]]
+    
+    @status.setter
+    def status(self, value: str) -> None:
+        self.population.status[self.population_index] = self.population.status_names.code(value)
+    
+    @property
+    def current_location(self) -> str:
+        return self.population.location_names.names[self.population.location[self.population_index]]
+    
+    @current_location.setter
+    def current_location(self, value: str) -> None:
+        self.population.location[self.population_index] = self.population.location_names.code(value)
+    
+    @property
+    def skills(self) -> SkillView:
+        """Skills and attributes (can be extended based on role)."""
+        return SkillView(self.population, self.population_index)
+    
+    @skills.setter
+    def skills(self, value: Dict[str, float]) -> None:
+        view = self.skills
+        view.clear()
+        view.update(value)
         
     def add_memory(self, description: str, importance: float,
                   related_agents: List[str] = None, location: str = "") -> None:
@@ -68,24 +138,94 @@ class BaseAgent:
             location=location
         )
         self.memories.append(memory)
+        self.memory_index.add(description, importance, memory.timestamp)
         
         # Trigger reflection if enough important memories have accumulated
-        if len(self.memories) % 5 == 0:
-            self.reflect()
+        self._unreflected.append(memory)
+        self._unreflected_importance += importance
+        if self._unreflected_importance >= self.reflection_threshold:
+            self.request_reflection()
+        
+        if len(self.memories) > self.memory_budget:
+            self.consolidate_memories()
+    
+    def consolidate_memories(self, now: Optional[datetime] = None) -> int:
+        """Fold the least important, least recent memories into one summary.
+        
+        Args:
+            now: Reference time for recency (defaults to the current time)
+            
+        Returns:
+            Number of memories removed from the stream
+        """
+        target = int(self.memory_budget * self.memory_compaction_ratio)
+        candidates = len(self.memories) - min(self.protected_recent_memories, len(self.memories))
+        # One slot is taken by the summary entry itself
+        n_remove = min(len(self.memories) - target + 1, candidates)
+        if n_remove < 2:
+            return 0
+        
+        scores = self.memory_index.retention_scores(now)[:candidates]
+        rows = np.sort(np.argpartition(scores, n_remove - 1)[:n_remove])
+        removed = [self.memories[row] for row in rows]
+        summary = self._summarize_memories(removed)
+        
+        self.memory_index.remove(rows)
+        removed_rows = set(rows.tolist())
+        self.memories = [m for i, m in enumerate(self.memories) if i not in removed_rows]
+        self.memories.append(summary)
+        self.memory_index.add(summary.description, summary.importance, summary.timestamp)
+        
+        text_bytes = sum(len(m.description.encode("utf-8")) for m in removed)
+        # The reflection worker updates the same counters in _store_reflection
+        with self._reflection_lock:
+            # Summaries folded again were already counted when they were created
+            self.memory_stats["evicted"] += sum(1 for m in removed if not m.consolidated_count)
+            self.memory_stats["summaries_created"] += 1
+            self.memory_stats["bytes_reclaimed"] += max(
+                0,
+                text_bytes - len(summary.description.encode("utf-8"))
+                + (n_remove - 1) * self.memory_index.row_nbytes
+            )
+        return n_remove
+    
+    def _summarize_memories(self, memories: List[Memory]) -> Memory:
+        """Build the summary entry that replaces a group of memories."""
+        count = sum(max(m.consolidated_count, 1) for m in memories)
+        start = min(m.timestamp for m in memories)
+        end = max(m.timestamp for m in memories)
+        highlights = sorted(memories, key=lambda m: m.importance, reverse=True)[:3]
+        
+        description = (f"Summary of {count} memories from {start:%Y-%m-%d %H:%M} "
+                       f"to {end:%Y-%m-%d %H:%M}: ")
+        description += "; ".join(m.description for m in highlights)
+        if len(memories) > len(highlights):
+            description += f" and {len(memories) - len(highlights)} more"
+        
+        related_agents = Counter(a for m in memories for a in m.related_agents)
+        locations = Counter(m.location for m in memories if m.location)
+        return Memory(
+            timestamp=end,
+            description=description,
+            importance=max(m.importance for m in memories),
+            related_agents=[a for a, _ in related_agents.most_common(10)],
+            location=locations.most_common(1)[0][0] if locations else "",
+            consolidated_count=count
+        )
     
     def retrieve_relevant_memories(self, context: str, k: int = 5) -> List[Memory]:
-        """Retrieve k most relevant memories for the given context."""
-        # In a real implementation, this would use embedding similarity
-        # For now, we'll use simple importance-based retrieval
-        sorted_memories = sorted(self.memories, 
-                               key=lambda x: x.importance, 
-                               reverse=True)
-        return sorted_memories[:k]
+        """Retrieve k most relevant memories for the given context.
+        
+        Memories are ranked by a weighted sum of recency, importance and
+        embedding similarity to the context (see MemoryIndex.search).
+        """
+        rows = self.memory_index.search(context, k, weights=self.retrieval_weights)
+        return [self.memories[row] for row in rows]
     
     def add_plan(self, start_time: datetime, end_time: datetime,
                  action: str, location: str, priority: int,
-                 related_agents: List[str] = None) -> None:
-        """Add a new plan to the agent's schedule."""
+                 related_agents: List[str] = None) -> int:
+        """Add a new plan to the agent's schedule and return its id."""
         if related_agents is None:
             related_agents = []
             
@@ -97,26 +237,63 @@ class BaseAgent:
             priority=priority,
             related_agents=related_agents
         )
-        
-        # Insert plan in chronological order
-        insert_idx = 0
-        for i, existing_plan in enumerate(self.daily_plan):
-            if existing_plan.start_time > start_time:
-                insert_idx = i
-                break
-        self.daily_plan.insert(insert_idx, plan)
+        return self.schedule.add(plan)
+    
+    def cancel_plan(self, plan_id: int) -> bool:
+        """Cancel a scheduled plan by id."""
+        return self.schedule.cancel(plan_id)
+    
+    @property
+    def daily_plan(self) -> List[Plan]:
+        """Scheduled plans in chronological order (read-only view)."""
+        return self.schedule.plans()
+    
+    def get_reflection_queue(self) -> ReflectionQueue:
+        """Queue that runs this agent's reflections."""
+        return self.reflection_queue or get_default_reflection_queue()
+    
+    def request_reflection(self) -> None:
+        """Reflect on the memories since the last reflection in the background."""
+        snapshot = self._take_reflection_snapshot()
+        if snapshot:
+            self.get_reflection_queue().submit(self._summarize_reflection, snapshot,
+                                               callback=self._store_reflection)
     
     def reflect(self) -> None:
-        """Generate reflections based on recent memories."""
-        recent_memories = sorted(self.memories[-5:], 
+        """Generate a reflection on recent memories immediately."""
+        snapshot = self._take_reflection_snapshot() or self.memories[-5:]
+        if snapshot:
+            self._store_reflection(self._summarize_reflection(snapshot))
+    
+    def _take_reflection_snapshot(self) -> List[Memory]:
+        """Hand over the memories added since the last reflection checkpoint."""
+        snapshot = self._unreflected
+        self._unreflected = []
+        self._unreflected_importance = 0.0
+        return snapshot
+    
+    def _summarize_reflection(self, memories: List[Memory]) -> str:
+        """Summarize a snapshot of memories (runs on the reflection worker)."""
+        recent_memories = sorted(memories, 
                                key=lambda x: x.importance, 
-                               reverse=True)
+                               reverse=True)[:5]
         
         # In a real implementation, this would use LLM to generate meaningful reflections
         # For now, we'll create a simple summary
         reflection = f"Reflection based on recent activities: "
         reflection += ", ".join([m.description for m in recent_memories])
-        self.reflections.append(reflection)
+        return reflection
+    
+    def _store_reflection(self, reflection: str) -> None:
+        """Record a reflection, keeping only the newest reflection_budget entries."""
+        with self._reflection_lock:
+            self.reflections.append(reflection)
+            excess = len(self.reflections) - self.reflection_budget
+            if excess > 0:
+                dropped = self.reflections[:excess]
+                del self.reflections[:excess]
+                self.memory_stats["reflections_dropped"] += excess
+                self.memory_stats["bytes_reclaimed"] += sum(len(r.encode("utf-8")) for r in dropped)
     
     def update_location(self, new_location: str) -> None:
         """Update the agent's current location."""
@@ -141,12 +318,5 @@ class BaseAgent:
     
     def get_next_action(self) -> Optional[Plan]:
         """Get the next planned action based on current time and priority."""
-        current_time = datetime.now()
-        valid_plans = [p for p in self.daily_plan 
-                      if p.start_time > current_time]
-        
-        if not valid_plans:
-            return None
-            
-        # Return the next plan, prioritizing high-priority tasks
-        return max(valid_plans, key=lambda x: x.priority) 
\ No newline at end of file
+        # Highest-priority plan that has not started yet; earlier plans are pruned
+        return self.schedule.next_plan(datetime.now()) 
\ No newline at end of file
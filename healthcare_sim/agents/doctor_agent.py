@@ -1,9 +1,19 @@
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from healthcare_sim.agents.base_agent import BaseAgent, AgentRole, Memory, Plan
+from healthcare_sim.agents.rounds_planner import RoundsPlanner
 from healthcare_sim.intelligence.agent_brain import AgentBrain
 
 class DoctorAgent(BaseAgent):
+    # Decisions that can be queued for concurrent evaluation:
+    # name -> (situation builder, result applier)
+    DECISIONS = {
+        'diagnose_patient': ('_diagnosis_situation', '_apply_diagnosis'),
+        'schedule_procedure': ('_procedure_situation', '_apply_procedure'),
+        'write_prescription': ('_prescription_situation', '_apply_prescription'),
+        'update_patient_record': ('_record_situation', '_apply_record_update')
+    }
+    
     def __init__(self,
                  agent_id: str,
                  name: str,
@@ -18,6 +28,9 @@ class DoctorAgent(BaseAgent):
         # Initialize the intelligent agent brain
         self.brain = AgentBrain("Doctor", specialization)
         
+        # Decisions waiting for an async step: (name, args, kwargs)
+        self.pending_decisions: List[Tuple[str, tuple, dict]] = []
+        
         # Initialize doctor-specific skills
         self.skills = {
             "diagnosis": min(0.5 + years_experience * 0.05, 1.0),
@@ -26,18 +39,53 @@ class DoctorAgent(BaseAgent):
             "emergency_response": min(0.4 + years_experience * 0.06, 1.0)
         }
     
+    def queue_decision(self, decision: str, *args, **kwargs) -> None:
+        """Queue a decision (e.g. 'diagnose_patient') for the next async agent step.
+        
+        Args:
+            decision: Name of a decision method listed in DECISIONS
+            *args, **kwargs: Arguments of that method
+        """
+        if decision not in self.DECISIONS:
+            raise ValueError(f"Unknown decision: {decision}")
+        self.pending_decisions.append((decision, args, kwargs))
+    
+    def take_pending_decisions(self) -> List[Tuple[Dict, Any]]:
+        """Build the situations of all queued decisions and clear the queue.
+        
+        Returns:
+            (situation, apply) pairs, where apply(decision) finishes the call
+        """
+        prepared = []
+        for decision, args, kwargs in self.pending_decisions:
+            build, apply = self.DECISIONS[decision]
+            situation = getattr(self, build)(*args, **kwargs)
+            prepared.append((situation, self._bind_apply(apply, situation, args, kwargs)))
+        self.pending_decisions = []
+        return prepared
+    
+    def _bind_apply(self, apply: str, situation: Dict, args: tuple, kwargs: dict):
+        """Bind the arguments of a queued call to its result applier."""
+        return lambda decision: getattr(self, apply)(situation, decision, *args, **kwargs)
+    
     def diagnose_patient(self, patient_id: str, symptoms: List[str]) -> str:
         """Diagnose a patient using AI-enhanced decision making."""
-        situation = {
+        situation = self._diagnosis_situation(patient_id, symptoms)
+        
+        # Use AI brain to make diagnosis decision
+        diagnosis_decision = self.brain.make_decision(situation)
+        return self._apply_diagnosis(situation, diagnosis_decision, patient_id, symptoms)
+    
+    def _diagnosis_situation(self, patient_id: str, symptoms: List[str]) -> Dict:
+        return {
             'patient_id': patient_id,
             'symptoms': symptoms,
             'patient_history': self.patients.get(patient_id, {}),
-            'doctor_skills': self.skills
+            'doctor_skills': dict(self.skills)
         }
-        
-        # Use AI brain to make diagnosis decision
-        diagnosis_decision = self.brain.make_decision(situation)
-        
+    
+    def _apply_diagnosis(self, situation: Dict, diagnosis_decision: Dict,
+                         patient_id: str, symptoms: List[str]) -> str:
         # Add to memory
         self.brain.memory.add_observation(
             f"Diagnosed patient {patient_id} with symptoms: {symptoms}",
@@ -54,6 +102,18 @@ class DoctorAgent(BaseAgent):
                          location: str,
                          required_equipment: List[str]) -> bool:
         """Schedule a medical procedure with intelligent planning."""
+        schedule_situation = self._procedure_situation(
+            patient_id, procedure_type, scheduled_time, location, required_equipment)
+        schedule_decision = self.brain.make_decision(schedule_situation)
+        return self._apply_procedure(schedule_situation, schedule_decision, patient_id,
+                                     procedure_type, scheduled_time, location, required_equipment)
+    
+    def _procedure_situation(self,
+                             patient_id: str,
+                             procedure_type: str,
+                             scheduled_time: datetime,
+                             location: str,
+                             required_equipment: List[str]) -> Dict:
         procedure = {
             "patient_id": patient_id,
             "type": procedure_type,
@@ -63,15 +123,17 @@ class DoctorAgent(BaseAgent):
             "status": "scheduled"
         }
         
-        # Use AI to validate and optimize the procedure schedule
-        schedule_situation = {
+        # Situation for the AI to validate and optimize the procedure schedule
+        return {
             'procedure': procedure,
             'current_schedule': self.scheduled_procedures,
             'patient_info': self.patients.get(patient_id, {})
         }
-        
-        schedule_decision = self.brain.make_decision(schedule_situation)
-        
+    
+    def _apply_procedure(self, schedule_situation: Dict, schedule_decision: Dict,
+                         patient_id: str, procedure_type: str, scheduled_time: datetime,
+                         location: str, required_equipment: List[str]) -> bool:
+        procedure = schedule_situation['procedure']
         if 'proceed' in schedule_decision['action'].lower():
             self.scheduled_procedures.append(procedure)
             
@@ -95,8 +157,13 @@ class DoctorAgent(BaseAgent):
             return True
         return False
     
-    def perform_rounds(self, ward: str) -> List[str]:
-        """Perform rounds with intelligent patient assessment."""
+    def perform_rounds(self, ward: str, environment=None) -> List[str]:
+        """Perform rounds, visiting patients along an acuity-weighted shortest route.
+        
+        Args:
+            ward: Ward whose patients are visited
+            environment: Optional HospitalEnvironment used for travel distances
+        """
         observations = []
         
         # Get all patients in the ward
@@ -105,29 +172,28 @@ class DoctorAgent(BaseAgent):
             if pinfo.get("ward") == ward
         }
         
-        # Use AI to plan the rounds
-        rounds_plan = self.brain.plan_schedule(
-            list(ward_patients.values()),
-            {'location': ward, 'time_available': 120}  # 2 hours for rounds
-        )
+        # Plan the visiting order as a routing problem (no LLM call needed)
+        start = self.current_location or ward
+        rounds_plan = RoundsPlanner(environment).plan(start, ward_patients)
         
-        for plan_item in rounds_plan:
-            patient_id = plan_item['action'].split()[1]  # Extract patient ID from action
-            observation = f"Checked patient {patient_id} during rounds"
+        for stop in rounds_plan:
+            observation = f"Checked patient {stop.patient_id} during rounds"
             observations.append(observation)
             
             self.brain.memory.add_observation(
                 observation,
                 importance=0.6,
-                context={'location': ward, 'priority': plan_item['priority']}
+                context={'location': stop.location or ward, 'priority': stop.acuity}
             )
             
             # Increase fatigue slightly for each patient checked
             self.increase_fatigue(0.05)
         
-        # Generate insights from rounds
-        reflection = self.brain.memory.reflect()
-        observations.append(f"Rounds reflection: {reflection}")
+        # Generate insights from rounds in the background
+        self.get_reflection_queue().submit(
+            self.brain.memory.reflect,
+            callback=lambda reflection: self._store_reflection(f"Rounds reflection: {reflection}")
+        )
         
         return observations
     
@@ -141,18 +207,16 @@ class DoctorAgent(BaseAgent):
             'type': emergency_type,
             'patient_id': patient_id,
             'location': location,
-            'doctor_skills': self.skills,
+            'doctor_skills': dict(self.skills),
             'current_status': self.status
         }
         
         response_plan = self.brain.handle_emergency(emergency_info)
         
-        # Cancel or reschedule lower priority tasks
+        # Cancel lower priority tasks and drop plans that already started
         current_time = datetime.now()
-        self.daily_plan = [
-            plan for plan in self.daily_plan
-            if plan.start_time > current_time and plan.priority >= 9
-        ]
+        self.schedule.cancel_below_priority(9)
+        self.schedule.prune(current_time)
         
         # Add emergency response to plan with highest priority
         self.add_plan(
@@ -180,7 +244,16 @@ class DoctorAgent(BaseAgent):
                          dosage: str,
                          duration: int) -> Dict:
         """Write a prescription with AI validation."""
-        prescription_info = {
+        prescription_info = self._prescription_situation(patient_id, medication, dosage, duration)
+        
+        # Get AI validation
+        prescription_decision = self.brain.make_decision(prescription_info)
+        return self._apply_prescription(prescription_info, prescription_decision,
+                                        patient_id, medication, dosage, duration)
+    
+    def _prescription_situation(self, patient_id: str, medication: str,
+                                dosage: str, duration: int) -> Dict:
+        return {
             'patient_id': patient_id,
             'medication': medication,
             'dosage': dosage,
@@ -188,10 +261,9 @@ class DoctorAgent(BaseAgent):
             'patient_history': self.patients.get(patient_id, {}),
             'doctor_specialization': self.specialization
         }
-        
-        # Get AI validation
-        prescription_decision = self.brain.make_decision(prescription_info)
-        
+    
+    def _apply_prescription(self, prescription_info: Dict, prescription_decision: Dict,
+                            patient_id: str, medication: str, dosage: str, duration: int) -> Dict:
         prescription = {
             "patient_id": patient_id,
             "medication": medication,
@@ -216,19 +288,25 @@ class DoctorAgent(BaseAgent):
                             notes: str,
                             vital_signs: Optional[Dict] = None) -> None:
         """Update patient records with AI-enhanced note processing."""
-        if patient_id not in self.patients:
-            self.patients[patient_id] = {}
-            
-        # Use AI to process and enhance the medical notes
-        notes_context = {
+        notes_context = self._record_situation(patient_id, notes, vital_signs)
+        processed_notes = self.brain.make_decision(notes_context)
+        self._apply_record_update(notes_context, processed_notes, patient_id, notes, vital_signs)
+    
+    def _record_situation(self, patient_id: str, notes: str,
+                          vital_signs: Optional[Dict] = None) -> Dict:
+        # Situation for the AI to process and enhance the medical notes
+        return {
             'patient_id': patient_id,
             'vital_signs': vital_signs,
-            'previous_notes': self.patients[patient_id].get('notes', []),
+            'previous_notes': list(self.patients.get(patient_id, {}).get('notes', [])),
             'doctor_specialization': self.specialization
         }
-        
-        processed_notes = self.brain.make_decision(notes_context)
-        
+    
+    def _apply_record_update(self, notes_context: Dict, processed_notes: Dict, patient_id: str,
+                             notes: str, vital_signs: Optional[Dict] = None) -> None:
+        if patient_id not in self.patients:
+            self.patients[patient_id] = {}
+            
         if vital_signs:
             self.patients[patient_id]["vital_signs"] = vital_signs
             
@@ -0,0 +1,150 @@
+"""
+Vector index over an agent's memory stream.
+
+Memories are embedded once when added and stored in a growable NumPy matrix
+alongside their importance and timestamp. Retrieval scores every memory by
+recency, importance and relevance to the query with a single matrix-vector
+product and selects the top k with argpartition, following the
+recency/importance/relevance scheme of the generative agents retriever.
+"""
+
+import re
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional, Tuple
+
+import numpy as np
+
+class Embedder(ABC):
+    """Maps text to a fixed-size, L2-normalized float32 vector."""
+    dim: int = 0
+
+    @abstractmethod
+    def embed(self, text: str) -> np.ndarray:
+        """Vector of length dim for a text."""
+
+class HashingEmbedder(Embedder):
+    """Offline embedder using signed feature hashing of word unigrams and bigrams."""
+
+    _token_pattern = re.compile(r"[a-z0-9]+")
+
+    def __init__(self, dim: int = 128):
+        self.dim = dim
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        tokens = self._token_pattern.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for feature in features:
+            # crc32 is stable across processes, unlike the salted built-in hash
+            h = zlib.crc32(feature.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+class MemoryIndex:
+    """Growable matrix of memory embeddings with importance and timestamps."""
+
+    def __init__(self, embedder: Optional[Embedder] = None, initial_capacity: int = 64):
+        self.embedder = embedder or HashingEmbedder()
+        self.size = 0
+        self._embeddings = np.zeros((initial_capacity, self.embedder.dim), dtype=np.float32)
+        self._importance = np.zeros(initial_capacity, dtype=np.float32)
+        self._timestamps = np.zeros(initial_capacity, dtype=np.float64)  # POSIX seconds
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, description: str, importance: float, timestamp: datetime) -> int:
+        """Embed and append a memory, returning its row in the index."""
+        if self.size == len(self._importance):
+            self._grow()
+        row = self.size
+        self._embeddings[row] = self.embedder.embed(description)
+        self._importance[row] = importance
+        self._timestamps[row] = timestamp.timestamp()
+        self.size += 1
+        return row
+
+    def retention_scores(self, now: Optional[datetime] = None,
+                         recency_decay: float = 0.995) -> np.ndarray:
+        """Importance plus recency of every row, used to pick memories to evict."""
+        recency = self._recency(now, recency_decay)
+        return self._normalize(recency) + self._normalize(self._importance[:self.size])
+
+    def remove(self, rows: np.ndarray) -> None:
+        """Drop rows from the index, compacting the remaining rows in order."""
+        keep = np.ones(self.size, dtype=bool)
+        keep[rows] = False
+        remaining = int(keep.sum())
+        self._embeddings[:remaining] = self._embeddings[:self.size][keep]
+        self._importance[:remaining] = self._importance[:self.size][keep]
+        self._timestamps[:remaining] = self._timestamps[:self.size][keep]
+        self.size = remaining
+
+    @property
+    def row_nbytes(self) -> int:
+        """Bytes used by one row across the backing arrays."""
+        return (self._embeddings.itemsize * self.embedder.dim
+                + self._importance.itemsize + self._timestamps.itemsize)
+
+    def search(self,
+               query: str,
+               k: int = 5,
+               now: Optional[datetime] = None,
+               recency_decay: float = 0.995,
+               weights: Tuple[float, float, float] = (1.0, 1.0, 1.0)) -> np.ndarray:
+        """Rows of the k best memories for the query, best first.
+
+        Args:
+            query: Text the memories should be relevant to (may be empty)
+            k: Number of rows to return
+            now: Reference time for recency (defaults to the current time)
+            recency_decay: Per-hour decay factor of the recency score
+            weights: Weights of the (recency, importance, relevance) scores
+        """
+        n = self.size
+        k = min(k, n)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        recency = self._recency(now, recency_decay)
+        importance = self._importance[:n]
+
+        scores = weights[0] * self._normalize(recency) + weights[1] * self._normalize(importance)
+        if query:
+            relevance = self._embeddings[:n] @ self.embedder.embed(query)
+            scores = scores + weights[2] * self._normalize(relevance)
+
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        return top[np.argsort(-scores[top], kind='stable')]
+
+    def _recency(self, now: Optional[datetime], recency_decay: float) -> np.ndarray:
+        """Exponential per-hour decay of every row's age."""
+        now_ts = (now or datetime.now()).timestamp()
+        hours_ago = np.maximum(now_ts - self._timestamps[:self.size], 0.0) / 3600.0
+        return np.exp(hours_ago * np.log(recency_decay))
+
+    def _grow(self) -> None:
+        """Double the capacity of the backing arrays."""
+        capacity = max(1, 2 * len(self._importance))
+        embeddings = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+        embeddings[:self.size] = self._embeddings[:self.size]
+        self._embeddings = embeddings
+        self._importance = np.resize(self._importance, capacity)
+        self._timestamps = np.resize(self._timestamps, capacity)
+
+    @staticmethod
+    def _normalize(values: np.ndarray) -> np.ndarray:
+        """Min-max scale scores to [0, 1] so the three components are comparable."""
+        low = values.min()
+        span = values.max() - low
+        if span <= 0:
+            return np.zeros_like(values, dtype=np.float64)
+        return (values - low) / span
@@ -0,0 +1,125 @@
+"""
+Time- and priority-indexed agent schedule.
+
+Plans are kept in two heaps: one ordered by start time, used to prune plans
+whose start has passed, and one ordered by priority (then start time), used
+to answer "highest-priority plan starting at or after t". Cancellation only
+drops the plan from the live table; stale heap entries are skipped lazily
+when they reach the top, and the heaps are rebuilt once stale entries
+outnumber live plans.
+"""
+
+import heapq
+import itertools
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .base_agent import Plan
+
+class PlanSchedule:
+    """Heap-backed set of plans with O(log n) insert, cancel and next-plan queries."""
+
+    def __init__(self):
+        self._plans: Dict[int, 'Plan'] = {}  # live plans by id
+        self._ids_by_priority: Dict[int, Set[int]] = {}
+        self._by_time: List[Tuple[datetime, int]] = []  # (start_time, plan_id)
+        self._by_priority: List[Tuple[int, datetime, int]] = []  # (-priority, start_time, plan_id)
+        self._ids = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def __iter__(self):
+        return iter(self.plans())
+
+    def add(self, plan: 'Plan') -> int:
+        """Schedule a plan and return its id."""
+        plan_id = next(self._ids)
+        self._plans[plan_id] = plan
+        self._ids_by_priority.setdefault(plan.priority, set()).add(plan_id)
+        heapq.heappush(self._by_time, (plan.start_time, plan_id))
+        heapq.heappush(self._by_priority, (-plan.priority, plan.start_time, plan_id))
+        return plan_id
+
+    def get(self, plan_id: int) -> Optional['Plan']:
+        """The live plan with the given id, if any."""
+        return self._plans.get(plan_id)
+
+    def cancel(self, plan_id: int) -> bool:
+        """Cancel a plan; returns False if it was not scheduled."""
+        plan = self._plans.pop(plan_id, None)
+        if plan is None:
+            return False
+        self._discard_priority(plan.priority, plan_id)
+        self._maybe_rebuild()
+        return True
+
+    def cancel_below_priority(self, priority: int) -> int:
+        """Cancel every plan with a priority lower than the given one."""
+        cancelled = 0
+        for level in [p for p in self._ids_by_priority if p < priority]:
+            for plan_id in self._ids_by_priority.pop(level):
+                del self._plans[plan_id]
+                cancelled += 1
+        self._maybe_rebuild()
+        return cancelled
+
+    def prune(self, now: datetime) -> int:
+        """Drop plans that start before now; returns the number removed."""
+        removed = 0
+        while self._by_time and self._by_time[0][0] < now:
+            _, plan_id = heapq.heappop(self._by_time)
+            plan = self._plans.pop(plan_id, None)
+            if plan is not None:
+                self._discard_priority(plan.priority, plan_id)
+                removed += 1
+        self._maybe_rebuild()
+        return removed
+
+    def next_plan(self, now: datetime) -> Optional['Plan']:
+        """Highest-priority plan starting at or after now (earliest first on ties).
+
+        Plans starting before now are pruned, so queries are expected to move
+        forward in time.
+        """
+        self.prune(now)
+        while self._by_priority:
+            _, _, plan_id = self._by_priority[0]
+            if plan_id in self._plans:
+                return self._plans[plan_id]
+            heapq.heappop(self._by_priority)
+        return None
+
+    def next_by_time(self, now: datetime) -> Optional['Plan']:
+        """Earliest plan starting at or after now."""
+        self.prune(now)
+        while self._by_time:
+            _, plan_id = self._by_time[0]
+            if plan_id in self._plans:
+                return self._plans[plan_id]
+            heapq.heappop(self._by_time)
+        return None
+
+    def plans(self) -> List['Plan']:
+        """Live plans in chronological order (ties in insertion order)."""
+        return [self._plans[plan_id] for plan_id in
+                sorted(self._plans, key=lambda i: (self._plans[i].start_time, i))]
+
+    def _discard_priority(self, priority: int, plan_id: int) -> None:
+        ids = self._ids_by_priority.get(priority)
+        if ids is not None:
+            ids.discard(plan_id)
+            if not ids:
+                del self._ids_by_priority[priority]
+
+    def _maybe_rebuild(self) -> None:
+        """Rebuild the heaps when cancelled entries dominate them."""
+        stale = max(len(self._by_time), len(self._by_priority)) - len(self._plans)
+        if stale <= len(self._plans) + 16:
+            return
+        self._by_time = [(plan.start_time, plan_id) for plan_id, plan in self._plans.items()]
+        self._by_priority = [(-plan.priority, plan.start_time, plan_id)
+                             for plan_id, plan in self._plans.items()]
+        heapq.heapify(self._by_time)
+        heapq.heapify(self._by_priority)
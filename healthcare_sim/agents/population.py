@@ -0,0 +1,213 @@
+"""
+Struct-of-arrays storage for agent state.
+
+AgentPopulation keeps the fatigue, status, location, role and skills of many
+agents in NumPy arrays so per-tick updates and staff searches run as
+vectorized operations. BaseAgent reads and writes its own row through
+properties, so single-agent code keeps working unchanged.
+"""
+
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+class _Vocabulary:
+    """Bidirectional mapping between names and small integer codes."""
+
+    def __init__(self, names: Sequence[str] = ()):
+        self.names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for name in names:
+            self.code(name)
+
+    def code(self, name: str) -> int:
+        """Code of a name, assigning a new one if it is unseen."""
+        code = self._codes.get(name)
+        if code is None:
+            code = len(self.names)
+            self._codes[name] = code
+            self.names.append(name)
+        return code
+
+    def get(self, name: str) -> int:
+        """Code of a known name, or -1."""
+        return self._codes.get(name, -1)
+
+class SkillView(MutableMapping):
+    """Dict-like view of one agent's row in the skill matrix (missing skills are NaN)."""
+
+    def __init__(self, population: 'AgentPopulation', index: int):
+        self._population = population
+        self._index = index
+
+    def __getitem__(self, skill: str) -> float:
+        column = self._population.skill_names.get(skill)
+        value = self._population.skills[self._index, column] if column >= 0 else np.nan
+        if np.isnan(value):
+            raise KeyError(skill)
+        return float(value)
+
+    def __setitem__(self, skill: str, level: float) -> None:
+        column = self._population._skill_column(skill)
+        self._population.skills[self._index, column] = level
+
+    def __delitem__(self, skill: str) -> None:
+        self[skill]  # raises KeyError if missing
+        self._population.skills[self._index, self._population.skill_names.get(skill)] = np.nan
+
+    def __iter__(self) -> Iterator[str]:
+        row = self._population.skills[self._index]
+        names = self._population.skill_names.names
+        return iter([names[c] for c in np.flatnonzero(~np.isnan(row[:len(names)]))])
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+class AgentPopulation:
+    """Agent state for many agents stored column-wise in NumPy arrays."""
+
+    def __init__(self, initial_capacity: int = 64):
+        self.size = 0
+        self.agents: List = []  # row i -> BaseAgent
+        self.status_names = _Vocabulary(["available", "busy", "off-duty"])
+        self.location_names = _Vocabulary([""])
+        self.role_names = _Vocabulary()
+        self.skill_names = _Vocabulary()
+
+        self.fatigue = np.zeros(initial_capacity, dtype=np.float64)
+        self.status = np.zeros(initial_capacity, dtype=np.int16)
+        self.location = np.zeros(initial_capacity, dtype=np.int32)
+        self.role = np.zeros(initial_capacity, dtype=np.int16)
+        self.skills = np.full((initial_capacity, 4), np.nan, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def register(self, agent, role: str) -> int:
+        """Add a row for an agent and return its index."""
+        if self.size == len(self.fatigue):
+            self._grow_rows()
+        index = self.size
+        self.fatigue[index] = 0.0
+        self.status[index] = self.status_names.code("available")
+        self.location[index] = self.location_names.code("")
+        self.role[index] = self.role_names.code(role)
+        self.skills[index] = np.nan
+        self.agents.append(agent)
+        self.size += 1
+        return index
+
+    # Vectorized updates
+
+    def increase_fatigue(self, amount: float, mask: Optional[np.ndarray] = None) -> None:
+        """Add fatigue to every agent (or the masked agents), capped at 1."""
+        fatigue = self.fatigue[:self.size]
+        if mask is None:
+            np.minimum(fatigue + amount, 1.0, out=fatigue)
+        else:
+            fatigue[mask] = np.minimum(fatigue[mask] + amount, 1.0)
+
+    def decay_fatigue(self, amount: float, statuses: Sequence[str] = ("available", "off-duty")) -> None:
+        """Per-tick recovery of agents in the given statuses, floored at 0.
+
+        Unlike BaseAgent.rest, no memory is recorded for the agents.
+        """
+        mask = self.status_mask(*statuses)
+        fatigue = self.fatigue[:self.size]
+        fatigue[mask] = np.maximum(fatigue[mask] - amount, 0.0)
+
+    # Queries
+
+    def status_mask(self, *statuses: str) -> np.ndarray:
+        """Agents whose status is one of the given statuses."""
+        codes = [self.status_names.get(s) for s in statuses]
+        return np.isin(self.status[:self.size], codes)
+
+    def available_mask(self, max_fatigue: float = 0.8, role: Optional[str] = None) -> np.ndarray:
+        """Agents that are available and not too tired."""
+        mask = self.status_mask("available") & (self.fatigue[:self.size] <= max_fatigue)
+        if role is not None:
+            mask &= self.role[:self.size] == self.role_names.get(role)
+        return mask
+
+    def find_available(self,
+                       skill: Optional[str] = None,
+                       min_level: float = 0.0,
+                       location: Optional[str] = None,
+                       distance_fn: Optional[Callable[[str, str], float]] = None,
+                       role: Optional[str] = None,
+                       max_fatigue: float = 0.8,
+                       k: int = 1) -> List:
+        """Available agents with skill >= min_level, nearest to location first.
+
+        Args:
+            skill: Required skill name (None for any)
+            min_level: Minimum level of that skill
+            location: Location to rank agents by distance from
+            distance_fn: Distance between two location names; called once
+                per distinct agent location (defaults to 0 for the same
+                location and 1 otherwise)
+            role: Restrict to agents of this role (e.g. "doctor")
+            max_fatigue: Agents above this fatigue are not available
+            k: Maximum number of agents to return
+
+        Returns:
+            Up to k agents, nearest first, then most skilled, then least tired
+        """
+        mask = self.available_mask(max_fatigue, role)
+        if skill is not None:
+            column = self.skill_names.get(skill)
+            if column < 0:
+                return []
+            with np.errstate(invalid='ignore'):
+                mask &= self.skills[:self.size, column] >= min_level
+            level = self.skills[:self.size, column]
+        else:
+            level = np.zeros(self.size, dtype=np.float64)
+
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            return []
+
+        if location is not None:
+            # One distance lookup per distinct location instead of per agent
+            location_ids, inverse = np.unique(self.location[rows], return_inverse=True)
+            if distance_fn is None:
+                target = self.location_names.get(location)
+                per_location = (location_ids != target).astype(np.float64)
+            else:
+                per_location = np.array([
+                    distance_fn(self.location_names.names[i], location) for i in location_ids
+                ], dtype=np.float64)
+            distance = per_location[inverse]
+        else:
+            distance = np.zeros(len(rows))
+
+        order = np.lexsort((self.fatigue[rows], -level[rows], distance))[:k]
+        return [self.agents[row] for row in rows[order]]
+
+    # Storage
+
+    def _skill_column(self, skill: str) -> int:
+        """Column of a skill, widening the matrix for new skills."""
+        column = self.skill_names.code(skill)
+        if column >= self.skills.shape[1]:
+            widened = np.full((self.skills.shape[0], 2 * self.skills.shape[1]), np.nan, dtype=np.float64)
+            widened[:, :self.skills.shape[1]] = self.skills
+            self.skills = widened
+        return column
+
+    def _grow_rows(self) -> None:
+        """Double the row capacity of every array."""
+        capacity = max(1, 2 * len(self.fatigue))
+        self.fatigue = np.resize(self.fatigue, capacity)
+        self.status = np.resize(self.status, capacity)
+        self.location = np.resize(self.location, capacity)
+        self.role = np.resize(self.role, capacity)
+        skills = np.full((capacity, self.skills.shape[1]), np.nan, dtype=np.float64)
+        skills[:self.size] = self.skills[:self.size]
+        self.skills = skills
@@ -0,0 +1,73 @@
+"""
+Background reflection work queue.
+
+Reflections summarize an agent's recent memories. Instead of running inside
+the action that added a memory, agents hand a snapshot of their unreflected
+memories to a ReflectionQueue whose worker thread builds the summary and
+passes it back through a callback. Jobs run one at a time in submission
+order, so an agent's reflections are produced in order.
+"""
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class ReflectionQueue:
+    """Single worker thread executing reflection jobs in FIFO order."""
+
+    def __init__(self):
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, fn: Callable[..., Any], *args,
+               callback: Optional[Callable[[Any], None]] = None) -> None:
+        """Run fn(*args) on the worker thread and pass the result to callback."""
+        self._ensure_worker()
+        self._jobs.put((fn, args, callback))
+
+    def join(self) -> None:
+        """Block until every submitted job has finished."""
+        self._jobs.join()
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs not yet finished."""
+        return self._jobs.unfinished_tasks
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="reflection-worker",
+                                                daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            fn, args, callback = self._jobs.get()
+            try:
+                result = fn(*args)
+                if callback is not None:
+                    callback(result)
+                self.completed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Error running reflection")
+            finally:
+                self._jobs.task_done()
+
+_default_queue: Optional[ReflectionQueue] = None
+_default_lock = threading.Lock()
+
+def get_default_reflection_queue() -> ReflectionQueue:
+    """The process-wide queue used by agents that were not given one."""
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            _default_queue = ReflectionQueue()
+        return _default_queue
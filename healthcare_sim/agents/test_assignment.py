@@ -0,0 +1,72 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import itertools
+from types import SimpleNamespace
+
+import numpy as np
+
+from assignment import PatientAssignmentEngine, solve_assignment
+
+def brute_force_cost(cost):
+    """Lowest total cost over every assignment of rows to distinct columns."""
+    n, m = cost.shape
+    return min(cost[np.arange(n), list(columns)].sum()
+               for columns in itertools.permutations(range(m), n))
+
+def make_doctor(agent_id, specialization, fatigue=0.0, patients=()):
+    return SimpleNamespace(agent_id=agent_id, specialization=specialization, fatigue=fatigue,
+                           status="available", current_location="Ward A",
+                           patients={patient_id: {} for patient_id in patients})
+
+def test_solve_assignment_is_optimal():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n = int(rng.integers(1, 6))
+        m = int(rng.integers(n, 8))
+        cost = rng.uniform(0, 10, (n, m))
+        if rng.random() < 0.3:
+            cost = np.round(cost)  # ties
+        columns = solve_assignment(cost)
+        assert len(set(columns.tolist())) == n
+        assert ((columns >= 0) & (columns < m)).all()
+        assert np.isclose(cost[np.arange(n), columns].sum(), brute_force_cost(cost))
+
+def test_solve_assignment_rejects_more_rows_than_columns():
+    try:
+        solve_assignment(np.zeros((3, 2)))
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
+
+def test_assign_prefers_matching_specialization():
+    cardiology = make_doctor('doctor_1', 'Cardiology')
+    neurology = make_doctor('doctor_2', 'Neurology')
+    engine = PatientAssignmentEngine([cardiology, neurology], max_patients_per_doctor=2)
+    result = engine.assign([
+        {'patient_id': 'p1', 'specialization': 'neurology'},
+        {'patient_id': 'p2', 'specialization': 'cardiology'},
+    ])
+    assert result == {'p1': 'doctor_2', 'p2': 'doctor_1'}
+    assert set(neurology.patients) == {'p1'}
+
+def test_assign_respects_capacity():
+    doctors = [make_doctor('doctor_1', 'General', patients=['old']),
+               make_doctor('doctor_2', 'General', fatigue=0.9)]
+    engine = PatientAssignmentEngine(doctors, max_patients_per_doctor=2)
+    result = engine.assign([{'patient_id': f"p{i}"} for i in range(4)])
+    assigned = [doctor for doctor in result.values() if doctor is not None]
+    assert len(assigned) == 3 and list(result.values()).count(None) == 1
+    assert all(len(doctor.patients) <= 2 for doctor in doctors)
+    # Existing assignments stay fixed and released slots are reused
+    assert engine.assignments['old'] == 'doctor_1'
+    engine.release('old')
+    assert engine.assign([{'patient_id': 'p9'}]) == {'p9': 'doctor_1'}
+
+if __name__ == "__main__":
+    test_solve_assignment_is_optimal()
+    test_solve_assignment_rejects_more_rows_than_columns()
+    test_assign_prefers_matching_specialization()
+    test_assign_respects_capacity()
+    print("assignment tests passed")
@@ -0,0 +1,6 @@
+"""
+Scaling benchmarks for the healthcare simulation.
+
+Run a benchmark as a module, e.g.
+``python -m healthcare_sim.benchmarks.layout_benchmark``.
+"""
@@ -0,0 +1,96 @@
+"""
+Layout scaling benchmark.
+
+Generates hospital layouts from 10 to 50,000 locations and measures, for
+each size: layout build time, the time to prepare shortest path state
+(all-pairs tables for small layouts, nothing up front for large ones),
+path queries per second over random room pairs, and memory allocated while
+building the layout.
+
+    python -m healthcare_sim.benchmarks.layout_benchmark --sizes 10 1000 50000
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from healthcare_sim.environment import HospitalLayoutGenerator, LayoutSpec
+
+DEFAULT_SIZES = (10, 100, 1_000, 5_000, 10_000, 50_000)
+
+def benchmark_layout(locations: int,
+                     queries: int = 200,
+                     graph_backend: str = "csr",
+                     seed: int = 0) -> Dict[str, float]:
+    """Build one layout of about the given size and measure it."""
+    generator = HospitalLayoutGenerator(LayoutSpec.for_location_count(locations))
+
+    gc.collect()
+    start = time.perf_counter()
+    environment = generator.generate(graph_backend=graph_backend)
+    build_seconds = time.perf_counter() - start
+
+    # Memory is measured on a second build so tracing does not skew the timing
+    gc.collect()
+    tracemalloc.start()
+    generator.generate(graph_backend=graph_backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    rooms = list(environment.locations)
+    rng = np.random.default_rng(seed)
+    pairs = rng.integers(0, len(rooms), size=(queries, 2))
+
+    start = time.perf_counter()
+    environment.get_distance(rooms[0], rooms[0])  # prepares the path state
+    index_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for a, b in pairs:
+        environment.get_path(rooms[a], rooms[b])
+    query_seconds = time.perf_counter() - start
+
+    graph = environment._get_graph()
+    return {
+        'locations': len(rooms),
+        'nodes': len(graph),
+        'edges': graph.number_of_edges(),
+        'build_seconds': build_seconds,
+        'index_seconds': index_seconds,
+        'path_queries_per_second': queries / query_seconds if query_seconds > 0 else float('inf'),
+        'build_peak_mb': peak / 1e6,
+        'graph_mb': graph.nbytes / 1e6,
+    }
+
+def run_benchmark(sizes: Sequence[int] = DEFAULT_SIZES,
+                  queries: int = 200,
+                  graph_backend: str = "csr") -> List[Dict[str, float]]:
+    """Benchmark every size and print a results table."""
+    results = []
+    print(f"{'locations':>10} {'nodes':>8} {'build s':>9} {'index s':>9} "
+          f"{'paths/s':>10} {'build MB':>9} {'graph MB':>9}")
+    for size in sizes:
+        result = benchmark_layout(size, queries=queries, graph_backend=graph_backend)
+        results.append(result)
+        print(f"{result['locations']:>10} {result['nodes']:>8} {result['build_seconds']:>9.3f} "
+              f"{result['index_seconds']:>9.3f} {result['path_queries_per_second']:>10.0f} "
+              f"{result['build_peak_mb']:>9.1f} {result['graph_mb']:>9.2f}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hospital layout scaling")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Approximate location counts to generate")
+    parser.add_argument('--queries', type=int, default=200,
+                        help="Random path queries per layout")
+    parser.add_argument('--backend', choices=['csr', 'networkx'], default='csr',
+                        help="HospitalEnvironment graph backend")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, queries=args.queries, graph_backend=args.backend)
+
+if __name__ == "__main__":
+    main()
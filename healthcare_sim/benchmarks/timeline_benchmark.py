@@ -0,0 +1,126 @@
+"""
+Lifecycle timeline rendering benchmark.
+
+Builds timelines of synthetic lifecycle events with the per-event trace
+approach the timelines used before (one go.Scatter per event) and with
+the current one WebGL trace per stage of visualization.py, and measures
+figure build time, JSON serialization time and JSON size (what Streamlit
+ships to the browser, which is what dominates render time there).
+
+The modules are loaded from the healthcare_sim directory rather than
+through the healthcare_sim package, whose __init__ needs the simulation
+database backend. visualization.py is loaded by path because the
+visualization package shadows it. Plotly and Streamlit (imported by
+visualization.py) must be installed.
+
+    python healthcare_sim/benchmarks/timeline_benchmark.py --sizes 1000 10000 100000
+
+Adding traces one at a time slows down as the figure grows: the per-event
+timeline takes around eight minutes at 100,000 events. Use --legacy-max to
+skip it above a size.
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+import plotly.graph_objects as go
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(PACKAGE_DIR)
+
+from lifecycle.lifecycle_manager import LifecycleEvent, LifecycleStage
+
+_spec = importlib.util.spec_from_file_location(
+    'timeline_visualization', os.path.join(PACKAGE_DIR, 'visualization.py'))
+visualization = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(visualization)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+def make_events(count: int, seed: int = 0) -> List[LifecycleEvent]:
+    """Synthetic lifecycle events in time order."""
+    rng = random.Random(seed)
+    stages = list(LifecycleStage)
+    start = datetime(2024, 1, 1)
+    events = []
+    for i in range(count):
+        events.append(LifecycleEvent(
+            event_id=f"event_{i}",
+            timestamp=start + timedelta(minutes=i),
+            stage=rng.choice(stages),
+            description=f"Event {i}",
+            location=rng.choice(["Emergency Room", "Intensive Care Unit", "General Ward"]),
+            providers=["Dr. Smith", "Nurse Taylor"],
+            biometric_data=None,
+            genetic_data={'marker': 1} if rng.random() < 0.1 else None
+        ))
+    return events
+
+def per_event_timeline(events: List[LifecycleEvent]) -> go.Figure:
+    """Timeline with one trace per event, as the timelines were built before."""
+    fig = go.Figure()
+    for event in events:
+        fig.add_trace(go.Scatter(
+            x=[event.timestamp],
+            y=[event.stage.name],
+            mode='markers+text',
+            name=event.event_id,
+            text=[event.description],
+            marker=dict(size=10),
+            textposition="top center"
+        ))
+    return fig
+
+def benchmark_timeline(build: Callable[[List[LifecycleEvent]], go.Figure],
+                       events: List[LifecycleEvent]) -> Dict[str, float]:
+    """Build one timeline and serialize it."""
+    start = time.perf_counter()
+    fig = build(events)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    payload = fig.to_json()
+    json_seconds = time.perf_counter() - start
+    return {
+        'traces': len(fig.data),
+        'build_seconds': build_seconds,
+        'json_seconds': json_seconds,
+        'json_mb': len(payload) / 1e6,
+    }
+
+def run_benchmark(sizes: Sequence[int] = DEFAULT_SIZES,
+                  legacy_max: Optional[int] = None) -> List[Dict[str, float]]:
+    """Benchmark both timelines at every size and print a results table."""
+    builders = {'per-event': per_event_timeline,
+                'per-stage gl': visualization.create_lifecycle_timeline}
+    results = []
+    print(f"{'events':>8} {'timeline':>13} {'traces':>8} {'build s':>9} {'json s':>8} {'json MB':>8}")
+    for size in sizes:
+        events = make_events(size)
+        for name, build in builders.items():
+            if build is per_event_timeline and legacy_max is not None and size > legacy_max:
+                continue
+            result = benchmark_timeline(build, events)
+            result.update(events=size, timeline=name)
+            results.append(result)
+            print(f"{size:>8} {name:>13} {result['traces']:>8} {result['build_seconds']:>9.3f} "
+                  f"{result['json_seconds']:>8.3f} {result['json_mb']:>8.2f}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark lifecycle timeline rendering")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help="Event counts to plot")
+    parser.add_argument('--legacy-max', type=int, default=None,
+                        help="Largest event count to build the per-event timeline for")
+    args = parser.parse_args()
+    run_benchmark(args.sizes, legacy_max=args.legacy_max)
+
+if __name__ == "__main__":
+    main()
@@ -61,6 +61,12 @@ class Config:
             "/mount/src/healthcare-lifecycle-sim/data/mimic"
         )
         
+        # Fitted simulation parameters (see data/calibration.py)
+        self.CALIBRATION_PATH = self._get_secret(
+            "simulation", "calibration_path",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "calibration.json")
+        )
+        
         # Simulation settings
         self.SIMULATION_STEP_DURATION = int(self._get_secret("simulation", "step_duration", 10))
         self.DEBUG_MODE = str(self._get_secret("simulation", "debug_mode", "false")).lower() == "true"
@@ -3,5 +3,22 @@ This module contains data loading and processing components.
 """
 
 from .patient_loader import PatientDataLoader
+from .synthetic_generator import SyntheticDataConfig, SyntheticPatientGenerator
+from .trace_replay import AdmissionTraceReplayer, TraceEvent
+from .cohort_query import CohortQuery
+from .icd_codes import ICDCodeTable, ICDFrequencyTables
+from .calibration import CalibrationArtifact, SimulationCalibrator, load_or_fit_calibration
 
-__all__ = ['PatientDataLoader'] 
\ No newline at end of file
+__all__ = [
+    'PatientDataLoader',
+    'SyntheticDataConfig',
+    'SyntheticPatientGenerator',
+    'AdmissionTraceReplayer',
+    'TraceEvent',
+    'CalibrationArtifact',
+    'SimulationCalibrator',
+    'load_or_fit_calibration',
+    'CohortQuery',
+    'ICDCodeTable',
+    'ICDFrequencyTables'
+] 
\ No newline at end of file
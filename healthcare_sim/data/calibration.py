@@ -0,0 +1,187 @@
+"""
+Simulation parameter calibration from admission records.
+
+Fits arrival profiles, arrival routing, location transitions and length of
+stay distributions from an admissions table with vectorized pandas/NumPy
+operations, and stores them as a versioned JSON artifact that
+SimulationManager loads at startup.
+"""
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Bump when the artifact layout or fitting method changes
+CALIBRATION_VERSION = 1
+HOURS_PER_WEEK = 168
+
+def department_for_location(location: str) -> str:
+    """Map a recorded admission location onto a simulated department key."""
+    location = str(location).upper()
+    if "INTENSIVE" in location or "ICU" in location:
+        return "icu"
+    if "EMERGENCY" in location:
+        return "er"
+    if "OPERATING" in location or "PROCEDURE" in location:
+        return "or"
+    return "ward"
+
+def compute_length_of_stay(admissions_df: pd.DataFrame) -> pd.Series:
+    """Length of stay in days from admittime/dischtime (NaN while still admitted)."""
+    admittime = pd.to_datetime(admissions_df['admittime'])
+    dischtime = pd.to_datetime(admissions_df['dischtime'])
+    return (dischtime - admittime).dt.total_seconds() / 86400.0
+
+@dataclass
+class CalibrationArtifact:
+    """Fitted simulation parameters."""
+    version: int
+    created_at: str
+    fingerprint: str
+    admission_count: int
+    # Mean arrivals per hour for each hour of the week (Monday 00:00 = 0)
+    arrival_rate_per_hour: List[float] = field(default_factory=list)
+    admission_type_mix: Dict[str, float] = field(default_factory=dict)
+    # Share of arrivals routed to each simulated department
+    department_mix: Dict[str, float] = field(default_factory=dict)
+    # admission_location -> {discharge_location: probability}
+    location_transitions: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    # admission_type -> lognormal fit and summary statistics of LOS in days
+    los_by_admission_type: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def save(self, path: str) -> None:
+        """Write the artifact as JSON."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(asdict(self), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> Optional['CalibrationArtifact']:
+        """Load an artifact, returning None if it was written by another version."""
+        with open(path) as f:
+            data = json.load(f)
+        if data.get('version') != CALIBRATION_VERSION:
+            return None
+        return cls(**data)
+
+    def arrival_rate(self, when: datetime) -> float:
+        """Expected arrivals per hour at the given time."""
+        if not self.arrival_rate_per_hour:
+            return 0.0
+        return self.arrival_rate_per_hour[when.weekday() * 24 + when.hour]
+
+    def sample_department(self, rng: np.random.Generator) -> Optional[str]:
+        """Sample the department a new arrival is routed to."""
+        if not self.department_mix:
+            return None
+        departments = list(self.department_mix)
+        p = np.asarray(list(self.department_mix.values()), dtype=float)
+        return departments[rng.choice(len(departments), p=p / p.sum())]
+
+    def sample_length_of_stay(self, admission_type: str, rng: np.random.Generator) -> Optional[float]:
+        """Sample a length of stay in days from the fitted lognormal."""
+        fit = self.los_by_admission_type.get(admission_type)
+        if fit is None:
+            return None
+        return float(rng.lognormal(fit['lognorm_mu'], fit['lognorm_sigma']))
+
+class SimulationCalibrator:
+    """Fit simulation parameters from an admissions table."""
+
+    def __init__(self, admissions_df: pd.DataFrame):
+        self.admissions_df = admissions_df
+
+    def fingerprint(self) -> str:
+        """Cheap identity of the source data used to detect stale artifacts."""
+        admittime = pd.to_datetime(self.admissions_df['admittime'])
+        return f"{len(self.admissions_df)}:{admittime.min()}:{admittime.max()}"
+
+    def fit(self) -> CalibrationArtifact:
+        """Fit all parameters and return a new artifact."""
+        return CalibrationArtifact(
+            version=CALIBRATION_VERSION,
+            created_at=datetime.now().isoformat(),
+            fingerprint=self.fingerprint(),
+            admission_count=len(self.admissions_df),
+            arrival_rate_per_hour=self.fit_arrival_profile(),
+            admission_type_mix=self._normalized_counts(self.admissions_df['admission_type']),
+            department_mix=self._normalized_counts(
+                self.admissions_df['admission_location'].map(department_for_location)
+            ),
+            location_transitions=self.fit_location_transitions(),
+            los_by_admission_type=self.fit_length_of_stay()
+        )
+
+    def fit_arrival_profile(self) -> List[float]:
+        """Mean arrivals per hour-of-week over the observed period."""
+        admittime = pd.to_datetime(self.admissions_df['admittime']).dropna()
+        if admittime.empty:
+            return [0.0] * HOURS_PER_WEEK
+
+        hour_of_week = (admittime.dt.dayofweek * 24 + admittime.dt.hour).to_numpy()
+        counts = np.bincount(hour_of_week, minlength=HOURS_PER_WEEK)
+        span_hours = (admittime.max() - admittime.min()).total_seconds() / 3600.0
+        weeks = max(span_hours / HOURS_PER_WEEK, 1.0)
+        return (counts / weeks).round(6).tolist()
+
+    def fit_location_transitions(self) -> Dict[str, Dict[str, float]]:
+        """Transition probabilities from admission to discharge location."""
+        if 'discharge_location' not in self.admissions_df.columns:
+            return {}
+
+        pairs = self.admissions_df[['admission_location', 'discharge_location']].dropna()
+        if pairs.empty:
+            return {}
+        counts = pd.crosstab(pairs['admission_location'], pairs['discharge_location'])
+        probabilities = counts.div(counts.sum(axis=1), axis=0)
+        return {
+            str(source): {str(target): round(float(p), 6) for target, p in row.items() if p > 0}
+            for source, row in probabilities.iterrows()
+        }
+
+    def fit_length_of_stay(self) -> Dict[str, Dict[str, float]]:
+        """Lognormal fit and quantiles of LOS (days) per admission type."""
+        los = compute_length_of_stay(self.admissions_df)
+        frame = pd.DataFrame({
+            'admission_type': self.admissions_df['admission_type'].astype(str),
+            'los': los
+        })
+        frame = frame[frame['los'] > 0]
+        if frame.empty:
+            return {}
+
+        frame['log_los'] = np.log(frame['los'])
+        grouped = frame.groupby('admission_type')
+        summary = grouped['los'].agg(['count', 'mean', 'median'])
+        summary['p90'] = grouped['los'].quantile(0.9)
+        summary['lognorm_mu'] = grouped['log_los'].mean()
+        summary['lognorm_sigma'] = grouped['log_los'].std(ddof=0).fillna(0.0)
+        return {
+            str(admission_type): {key: round(float(value), 6) for key, value in row.items()}
+            for admission_type, row in summary.iterrows()
+        }
+
+    @staticmethod
+    def _normalized_counts(values: pd.Series) -> Dict[str, float]:
+        """Relative frequencies of a categorical column."""
+        shares = values.dropna().astype(str).value_counts(normalize=True)
+        return {str(key): round(float(value), 6) for key, value in shares.items()}
+
+def load_or_fit_calibration(path: str, admissions_df: pd.DataFrame) -> CalibrationArtifact:
+    """Load the artifact at path, refitting only if it is missing or stale."""
+    calibrator = SimulationCalibrator(admissions_df)
+    if os.path.exists(path):
+        artifact = CalibrationArtifact.load(path)
+        if artifact is not None and artifact.fingerprint == calibrator.fingerprint():
+            return artifact
+
+    artifact = calibrator.fit()
+    artifact.save(path)
+    return artifact
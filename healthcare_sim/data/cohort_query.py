@@ -0,0 +1,259 @@
+"""
+Cohort selection over the loader tables.
+
+CohortQuery is a small builder that filters admissions by admission type,
+location, admission window, ICD code prefix and age band, then projects the
+requested columns. Predicates are pushed down to the storage layer: Parquet
+tables are scanned with pyarrow dataset filters (row groups whose statistics
+cannot match are skipped and only the needed columns are read), CSV files are
+streamed in chunks, and in-memory DataFrames are filtered with boolean masks.
+"""
+
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# (column, op, value) with op in: in, >=, <, <=, startswith
+Predicate = Tuple[str, str, Any]
+TableSource = Union[pd.DataFrame, str]
+
+class CohortQuery:
+    """Chainable cohort filter over patients, admissions and diagnoses tables."""
+
+    def __init__(self, tables: Dict[str, TableSource], chunksize: int = 500_000):
+        """
+        Args:
+            tables: Table name (patients, admissions, diagnoses) to a DataFrame
+                or to the path of a .parquet or .csv(.gz) file
+            chunksize: Rows per chunk when streaming CSV files
+        """
+        self.tables = tables
+        self.chunksize = chunksize
+        self._admission_types: Optional[List[str]] = None
+        self._locations: Optional[List[str]] = None
+        self._admitted_from: Optional[datetime] = None
+        self._admitted_to: Optional[datetime] = None
+        self._icd_prefixes: Optional[List[str]] = None
+        self._min_age: Optional[int] = None
+        self._max_age: Optional[int] = None
+        self._columns: Optional[List[str]] = None
+
+    @classmethod
+    def from_loader(cls, loader) -> 'CohortQuery':
+        """Query a PatientDataLoader or MIMICDataLoader, preferring its Parquet cache."""
+        cache_path = getattr(loader, 'cache_path', None)
+        if cache_path and os.path.exists(os.path.join(cache_path, 'admissions.parquet')):
+            return cls.from_parquet_cache(cache_path)
+        return cls({
+            'patients': loader.patients_df,
+            'admissions': loader.admissions_df,
+            'diagnoses': loader.diagnoses_df
+        })
+
+    @classmethod
+    def from_parquet_cache(cls, cache_path: str) -> 'CohortQuery':
+        """Query the tables of a Parquet cache directory without loading them."""
+        return cls({
+            name: os.path.join(cache_path, f"{name}.parquet")
+            for name in ('patients', 'admissions', 'diagnoses')
+        })
+
+    # Builder methods
+
+    def admission_type(self, *admission_types: str) -> 'CohortQuery':
+        """Keep admissions of any of the given types."""
+        self._admission_types = list(admission_types)
+        return self
+
+    def location(self, *locations: str) -> 'CohortQuery':
+        """Keep admissions with any of the given admission locations."""
+        self._locations = list(locations)
+        return self
+
+    def admitted_between(self, start: Optional[datetime] = None,
+                         end: Optional[datetime] = None) -> 'CohortQuery':
+        """Keep admissions with start <= admittime < end."""
+        self._admitted_from = start
+        self._admitted_to = end
+        return self
+
+    def icd_prefix(self, *prefixes: str) -> 'CohortQuery':
+        """Keep admissions with at least one diagnosis code starting with a prefix."""
+        self._icd_prefixes = list(prefixes)
+        return self
+
+    def age_band(self, min_age: Optional[int] = None, max_age: Optional[int] = None) -> 'CohortQuery':
+        """Keep patients whose age is within [min_age, max_age]."""
+        self._min_age = min_age
+        self._max_age = max_age
+        return self
+
+    def select(self, *columns: str) -> 'CohortQuery':
+        """Project the result onto the given columns (admission columns or 'age')."""
+        self._columns = list(columns)
+        return self
+
+    # Execution
+
+    def execute(self) -> pd.DataFrame:
+        """Run the query and return the matching admissions."""
+        admission_columns = self._table_columns('admissions')
+        wanted = self._columns or admission_columns
+        predicates: List[Predicate] = []
+
+        if self._admission_types is not None:
+            predicates.append(('admission_type', 'in', self._admission_types))
+        if self._locations is not None:
+            predicates.append(('admission_location', 'in', self._locations))
+        if self._admitted_from is not None:
+            predicates.append(('admittime', '>=', pd.Timestamp(self._admitted_from)))
+        if self._admitted_to is not None:
+            predicates.append(('admittime', '<', pd.Timestamp(self._admitted_to)))
+
+        if self._icd_prefixes is not None:
+            diagnoses = self._read('diagnoses', ['hadm_id'],
+                                   [('icd_code', 'startswith', self._icd_prefixes)])
+            predicates.append(('hadm_id', 'in', diagnoses['hadm_id'].unique()))
+
+        ages = None
+        if self._min_age is not None or self._max_age is not None or 'age' in wanted:
+            ages = self._read_ages()
+            if self._min_age is not None or self._max_age is not None:
+                predicates.append(('subject_id', 'in', ages['subject_id'].unique()))
+
+        read_columns = [c for c in admission_columns if c in wanted or c == 'subject_id']
+        result = self._read('admissions', read_columns, predicates)
+
+        if ages is not None and 'age' in wanted:
+            result = result.merge(ages, on='subject_id', how='left')
+        return result[[c for c in wanted if c in result.columns]].reset_index(drop=True)
+
+    def _read_ages(self) -> pd.DataFrame:
+        """Read subject ids and ages of patients inside the age band."""
+        patient_columns = self._table_columns('patients')
+        predicates: List[Predicate] = []
+
+        if 'anchor_age' in patient_columns:
+            if self._min_age is not None:
+                predicates.append(('anchor_age', '>=', self._min_age))
+            if self._max_age is not None:
+                predicates.append(('anchor_age', '<=', self._max_age))
+            patients = self._read('patients', ['subject_id', 'anchor_age'], predicates)
+            return pd.DataFrame({'subject_id': patients['subject_id'], 'age': patients['anchor_age']})
+
+        # Age is counted in calendar years from dob, as in PatientDataLoader.get_patient_info
+        current_year = datetime.now().year
+        if self._max_age is not None:
+            predicates.append(('dob', '>=', pd.Timestamp(current_year - self._max_age, 1, 1)))
+        if self._min_age is not None:
+            predicates.append(('dob', '<', pd.Timestamp(current_year - self._min_age + 1, 1, 1)))
+        patients = self._read('patients', ['subject_id', 'dob'], predicates)
+        return pd.DataFrame({
+            'subject_id': patients['subject_id'],
+            'age': current_year - pd.to_datetime(patients['dob']).dt.year
+        })
+
+    def _table_columns(self, table: str) -> List[str]:
+        """Column names of a table without reading its rows."""
+        source = self.tables[table]
+        if isinstance(source, pd.DataFrame):
+            return list(source.columns)
+        if source.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            return pq.read_schema(source).names
+        return list(pd.read_csv(source, nrows=0).columns)
+
+    def _read(self, table: str, columns: List[str], predicates: List[Predicate]) -> pd.DataFrame:
+        """Read the rows of a table matching all predicates."""
+        source = self.tables[table]
+        if isinstance(source, pd.DataFrame):
+            return source.loc[self._mask(source, predicates), columns]
+        if source.endswith('.parquet'):
+            return self._read_parquet(source, columns, predicates)
+        return self._read_csv(source, columns, predicates)
+
+    def _read_parquet(self, path: str, columns: List[str],
+                      predicates: List[Predicate]) -> pd.DataFrame:
+        """Scan a Parquet file with predicates and projection pushed into pyarrow."""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+
+        expression = None
+        for column, op, value in predicates:
+            field = ds.field(column)
+            if op == 'in':
+                term = field.isin(pa.array(np.asarray(value, dtype=object)))
+            elif op == 'startswith':
+                text = field.cast(pa.string())
+                term = None
+                for prefix in value:
+                    match = pc.starts_with(text, prefix)
+                    term = match if term is None else term | match
+            elif op == '>=':
+                term = field >= self._arrow_scalar(value)
+            elif op == '<=':
+                term = field <= self._arrow_scalar(value)
+            else:
+                term = field < self._arrow_scalar(value)
+            expression = term if expression is None else expression & term
+
+        table = ds.dataset(path, format='parquet').to_table(columns=columns, filter=expression)
+        return table.to_pandas()
+
+    def _read_csv(self, path: str, columns: List[str],
+                  predicates: List[Predicate]) -> pd.DataFrame:
+        """Stream a CSV file in chunks, keeping only matching rows and columns."""
+        needed = list(dict.fromkeys(columns + [column for column, _, _ in predicates]))
+        parse_dates = [c for c in ('admittime', 'dischtime', 'dob') if c in needed]
+        chunks = [
+            chunk.loc[self._mask(chunk, predicates), columns]
+            for chunk in pd.read_csv(path, usecols=needed, parse_dates=parse_dates,
+                                     chunksize=self.chunksize)
+        ]
+        if not chunks:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(chunks, ignore_index=True)
+
+    @staticmethod
+    def _mask(df: pd.DataFrame, predicates: List[Predicate]) -> np.ndarray:
+        """Boolean mask of the rows of df matching all predicates."""
+        mask = np.ones(len(df), dtype=bool)
+        for column, op, value in predicates:
+            values = df[column]
+            if op == 'in':
+                # Hash lookup into the (deduplicated) value set
+                mask &= pd.Index(pd.unique(np.asarray(value, dtype=object))).get_indexer(values) >= 0
+            elif op == 'startswith':
+                mask &= CohortQuery._startswith(values, value)
+            else:
+                if column in ('admittime', 'dischtime', 'dob'):
+                    values = pd.to_datetime(values)
+                if op == '>=':
+                    mask &= (values >= value).to_numpy()
+                elif op == '<=':
+                    mask &= (values <= value).to_numpy()
+                else:
+                    mask &= (values < value).to_numpy()
+        return mask
+
+    @staticmethod
+    def _startswith(values: pd.Series, prefixes: Sequence[str]) -> np.ndarray:
+        """Prefix match, evaluated once per category for categorical columns."""
+        prefixes = tuple(prefixes)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            matching = values.cat.categories.astype(str).str.startswith(prefixes)
+            codes = values.cat.codes.to_numpy()
+            return (codes >= 0) & matching[np.maximum(codes, 0)]
+        return values.astype(str).str.startswith(prefixes).to_numpy()
+
+    @staticmethod
+    def _arrow_scalar(value: Any):
+        """Convert a predicate value into a pyarrow scalar."""
+        import pyarrow as pa
+        if isinstance(value, pd.Timestamp):
+            return pa.scalar(value.to_pydatetime())
+        return pa.scalar(value)
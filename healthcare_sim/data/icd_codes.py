@@ -0,0 +1,149 @@
+"""
+Dictionary encoding of ICD codes.
+
+Diagnoses and procedures share one ICDCodeTable mapping code strings to
+int32 ids. The loaders encode their tables once per load and keep the
+frequency aggregates in ICDFrequencyTables, so analytic calls work on small
+integer arrays instead of re-counting strings.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+class ICDCodeTable:
+    """Shared mapping between ICD code strings and int32 ids."""
+
+    def __init__(self, codes: Sequence[str]):
+        self.codes = pd.Index([str(code) for code in codes], dtype=object)
+        self._code_array = self.codes.to_numpy()
+
+    @classmethod
+    def from_frames(cls, *frames: Optional[pd.DataFrame]) -> 'ICDCodeTable':
+        """Build a table from the distinct icd_code values of the given frames."""
+        codes = set()
+        for frame in frames:
+            if frame is None or 'icd_code' not in frame.columns:
+                continue
+            values = frame['icd_code'].dropna()
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.cat.remove_unused_categories().cat.categories
+            codes.update(str(code) for code in pd.unique(np.asarray(values, dtype=object)))
+        return cls(sorted(codes))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def encode(self, values: pd.Series) -> np.ndarray:
+        """Map code strings to int32 ids (-1 for unknown or missing codes)."""
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Encode each category once, then gather by the categorical codes
+            category_ids = self.codes.get_indexer(values.cat.categories.astype(str))
+            category_ids = np.append(category_ids, -1).astype(np.int32)
+            return category_ids[values.cat.codes.to_numpy()]
+        return self.codes.get_indexer(values.astype(str)).astype(np.int32)
+
+    def decode(self, ids: np.ndarray) -> np.ndarray:
+        """Map int32 ids back to code strings."""
+        return self._code_array[np.asarray(ids)]
+
+    def attach(self, frame: pd.DataFrame) -> None:
+        """Add an icd_code_id column and store icd_code as a categorical over this table."""
+        ids = self.encode(frame['icd_code'])
+        frame['icd_code_id'] = ids
+        frame['icd_code'] = pd.Categorical.from_codes(ids, categories=self.codes)
+
+class ICDFrequencyTables:
+    """Code frequencies and diagnosis co-occurrence, computed once per load."""
+
+    def __init__(self,
+                 code_table: ICDCodeTable,
+                 diagnoses_df: Optional[pd.DataFrame] = None,
+                 procedures_df: Optional[pd.DataFrame] = None):
+        self.code_table = code_table
+        self.diagnoses_df = diagnoses_df
+        self.diagnosis_counts = self._count(diagnoses_df)
+        self.procedure_counts = self._count(procedures_df)
+        self._cooccurrence: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    def _count(self, frame: Optional[pd.DataFrame]) -> np.ndarray:
+        """Occurrences of each code id in a table."""
+        if frame is None or 'icd_code_id' not in frame.columns:
+            return np.zeros(len(self.code_table), dtype=np.int64)
+        ids = frame['icd_code_id'].to_numpy()
+        return np.bincount(ids[ids >= 0], minlength=len(self.code_table))
+
+    def top_codes(self, counts: np.ndarray, top_n: int = 10) -> Dict[str, int]:
+        """The top_n most frequent codes of a count vector, most frequent first."""
+        top_n = min(top_n, int(np.count_nonzero(counts)))
+        if top_n <= 0:
+            return {}
+        top = np.argpartition(-counts, top_n - 1)[:top_n]
+        top = top[np.argsort(-counts[top], kind='stable')]
+        return dict(zip(self.code_table.decode(top).tolist(), counts[top].tolist()))
+
+    def top_diagnoses(self, top_n: int = 10) -> Dict[str, int]:
+        """Most common diagnosis codes."""
+        return self.top_codes(self.diagnosis_counts, top_n)
+
+    def top_procedures(self, top_n: int = 10) -> Dict[str, int]:
+        """Most common procedure codes."""
+        return self.top_codes(self.procedure_counts, top_n)
+
+    def cooccurrence(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sparse diagnosis co-occurrence within admissions as (code_a, code_b, count).
+
+        Each unordered pair is reported once with code_a < code_b. Computed on
+        first use and cached for the lifetime of the load.
+        """
+        if self._cooccurrence is None:
+            self._cooccurrence = self._compute_cooccurrence()
+        return self._cooccurrence
+
+    def top_cooccurring(self, top_n: int = 10) -> List[Tuple[str, str, int]]:
+        """Most frequent diagnosis pairs recorded in the same admission."""
+        code_a, code_b, counts = self.cooccurrence()
+        top_n = min(top_n, len(counts))
+        if top_n <= 0:
+            return []
+        top = np.argpartition(-counts, top_n - 1)[:top_n]
+        top = top[np.argsort(-counts[top], kind='stable')]
+        names_a = self.code_table.decode(code_a[top])
+        names_b = self.code_table.decode(code_b[top])
+        return [(a, b, int(n)) for a, b, n in zip(names_a, names_b, counts[top])]
+
+    def _compute_cooccurrence(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Count code pairs per admission with a vectorized self-join."""
+        empty = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64))
+        if self.diagnoses_df is None or 'icd_code_id' not in self.diagnoses_df.columns:
+            return empty
+
+        pairs = pd.DataFrame({
+            'admission': pd.factorize(self.diagnoses_df['hadm_id'])[0],
+            'code': self.diagnoses_df['icd_code_id'].to_numpy()
+        })
+        pairs = pairs[pairs['code'] >= 0].drop_duplicates()
+        joined = pairs.merge(pairs, on='admission', suffixes=('_a', '_b'))
+        joined = joined[joined['code_a'] < joined['code_b']]
+        if joined.empty:
+            return empty
+
+        size = np.int64(len(self.code_table))
+        keys = joined['code_a'].to_numpy(dtype=np.int64) * size + joined['code_b'].to_numpy(dtype=np.int64)
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        return (
+            (unique_keys // size).astype(np.int32),
+            (unique_keys % size).astype(np.int32),
+            counts
+        )
+
+def encode_icd_tables(diagnoses_df: Optional[pd.DataFrame],
+                      procedures_df: Optional[pd.DataFrame] = None
+                      ) -> Tuple[ICDCodeTable, ICDFrequencyTables]:
+    """Encode the icd_code columns of the given tables in place with one shared table."""
+    code_table = ICDCodeTable.from_frames(diagnoses_df, procedures_df)
+    for frame in (diagnoses_df, procedures_df):
+        if frame is not None and 'icd_code' in frame.columns:
+            code_table.attach(frame)
+    return code_table, ICDFrequencyTables(code_table, diagnoses_df, procedures_df)
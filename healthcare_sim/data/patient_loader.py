@@ -2,129 +2,64 @@ import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import os
-import random
+from .calibration import compute_length_of_stay
+from .cohort_query import CohortQuery
+from .icd_codes import ICDCodeTable, ICDFrequencyTables, encode_icd_tables
+from .synthetic_generator import SyntheticDataConfig, SyntheticPatientGenerator
 
 class PatientDataLoader:
-    def __init__(self, mimic_path: Optional[str] = None):
+    def __init__(self, mimic_path: Optional[str] = None,
+                 cache_path: Optional[str] = None,
+                 synthetic_patients: int = 100):
         self.mimic_path = mimic_path
+        self.cache_path = cache_path
         self.patients_df = None
         self.admissions_df = None
         self.diagnoses_df = None
         self.procedures_df = None
+        self.code_table: Optional[ICDCodeTable] = None
+        self.code_frequencies: Optional[ICDFrequencyTables] = None
         
         try:
             if mimic_path and os.path.exists(mimic_path):
                 self.load_mimic_data()
+            elif cache_path and os.path.exists(os.path.join(cache_path, 'admissions.parquet')):
+                self.load_parquet_cache(cache_path)
             else:
-                self.generate_synthetic_data()
+                self.generate_synthetic_data(synthetic_patients)
         except Exception as e:
             print(f"Error loading MIMIC data: {str(e)}, using synthetic data instead")
-            self.generate_synthetic_data()
+            self.generate_synthetic_data(synthetic_patients)
     
-    def generate_synthetic_data(self):
-        """Generate synthetic patient data for simulation."""
-        # Generate synthetic patients
-        patient_count = 100
-        current_time = datetime.now()
-        
-        patients = []
-        admissions = []
-        diagnoses = []
-        procedures = []
-        
-        # Common diagnoses and procedures
-        diagnoses_list = [
-            "Acute Myocardial Infarction",
-            "Pneumonia",
-            "Stroke",
-            "Appendicitis",
-            "Diabetic Ketoacidosis",
-            "Trauma",
-            "Sepsis",
-            "Congestive Heart Failure",
-            "Acute Respiratory Failure",
-            "Gastrointestinal Bleeding"
-        ]
+    def generate_synthetic_data(self, patient_count: int = 100,
+                                config: Optional[SyntheticDataConfig] = None):
+        """Generate synthetic patient data for simulation.
         
-        procedures_list = [
-            "Coronary Angiography",
-            "Appendectomy",
-            "CT Scan",
-            "MRI",
-            "Endoscopy",
-            "Mechanical Ventilation",
-            "Central Line Placement",
-            "Blood Transfusion",
-            "Dialysis",
-            "Surgery"
-        ]
-        
-        locations = [
-            "EMERGENCY ROOM",
-            "MEDICAL INTENSIVE CARE UNIT",
-            "SURGICAL INTENSIVE CARE UNIT",
-            "OPERATING ROOM",
-            "GENERAL WARD",
-            "SURGICAL WARD"
-        ]
+        Args:
+            patient_count: Number of patients to generate (ignored if config is given)
+            config: Full sampling configuration for the vectorized generator
+        """
+        if config is None:
+            config = SyntheticDataConfig(patient_count=patient_count)
         
-        for i in range(patient_count):
-            # Generate patient
-            patient_id = f"P{i+1:03d}"
-            gender = random.choice(['M', 'F'])
-            age = random.randint(18, 90)
-            dob = current_time - timedelta(days=age*365)
-            
-            patients.append({
-                'subject_id': patient_id,
-                'gender': gender,
-                'dob': dob
-            })
-            
-            # Generate admission
-            admission_time = current_time - timedelta(days=random.randint(0, 30))
-            discharge_time = (
-                admission_time + timedelta(days=random.randint(1, 14))
-                if random.random() > 0.3 else None  # 30% still admitted
-            )
-            
-            admission_type = "EMERGENCY" if random.random() < 0.3 else "ELECTIVE"
-            diagnosis = random.choice(diagnoses_list)
-            location = random.choice(locations)
-            
-            admissions.append({
-                'subject_id': patient_id,
-                'hadm_id': f"H{i+1:03d}",
-                'admittime': admission_time,
-                'dischtime': discharge_time,
-                'admission_type': admission_type,
-                'admission_location': location,
-                'diagnosis': diagnosis
-            })
-            
-            # Generate diagnoses and procedures
-            num_diagnoses = random.randint(1, 5)
-            num_procedures = random.randint(0, 3)
-            
-            for j in range(num_diagnoses):
-                diagnoses.append({
-                    'subject_id': patient_id,
-                    'hadm_id': f"H{i+1:03d}",
-                    'icd_code': random.choice(diagnoses_list)
-                })
-            
-            for j in range(num_procedures):
-                procedures.append({
-                    'subject_id': patient_id,
-                    'hadm_id': f"H{i+1:03d}",
-                    'icd_code': random.choice(procedures_list)
-                })
-        
-        # Convert to DataFrames
-        self.patients_df = pd.DataFrame(patients)
-        self.admissions_df = pd.DataFrame(admissions)
-        self.diagnoses_df = pd.DataFrame(diagnoses)
-        self.procedures_df = pd.DataFrame(procedures)
+        tables = SyntheticPatientGenerator(config).generate()
+        self.patients_df = tables['patients']
+        self.admissions_df = tables['admissions']
+        self.diagnoses_df = tables['diagnoses']
+        self.procedures_df = tables['procedures']
+        self._encode_icd_codes()
+    
+    def load_parquet_cache(self, cache_path: str):
+        """Load patient tables from a Parquet cache directory."""
+        self.patients_df = pd.read_parquet(os.path.join(cache_path, 'patients.parquet'))
+        self.admissions_df = pd.read_parquet(os.path.join(cache_path, 'admissions.parquet'))
+        self.diagnoses_df = pd.read_parquet(os.path.join(cache_path, 'diagnoses.parquet'))
+        self.procedures_df = pd.read_parquet(os.path.join(cache_path, 'procedures.parquet'))
+        self._encode_icd_codes()
+    
+    def _encode_icd_codes(self):
+        """Dictionary-encode ICD codes and precompute their frequency tables."""
+        self.code_table, self.code_frequencies = encode_icd_tables(self.diagnoses_df, self.procedures_df)
     
     def load_mimic_data(self):
         """Load data from MIMIC-IV database."""
@@ -154,10 +89,16 @@ class PatientDataLoader:
                 self.admissions_df['dischtime'] = pd.to_datetime(self.admissions_df['dischtime'])
             if 'deathtime' in self.admissions_df.columns:
                 self.admissions_df['deathtime'] = pd.to_datetime(self.admissions_df['deathtime'])
+            
+            self._encode_icd_codes()
         except Exception as e:
             print(f"Error loading MIMIC data: {str(e)}")
             raise
     
+    def query(self) -> CohortQuery:
+        """Start a cohort query over the loaded tables (or the Parquet cache)."""
+        return CohortQuery.from_loader(self)
+    
     def get_patient_info(self, patient_id: str) -> Dict:
         """Get comprehensive patient information."""
         patient = self.patients_df[self.patients_df['subject_id'] == patient_id].iloc[0]
@@ -176,10 +117,18 @@ class PatientDataLoader:
                 'admission_location': latest_admission['admission_location'] if latest_admission is not None else None,
                 'diagnosis': latest_admission['diagnosis'] if latest_admission is not None else None,
             },
-            'diagnoses': diagnoses['icd_code'].tolist(),
-            'procedures': procedures['icd_code'].tolist()
+            'diagnoses': diagnoses['icd_code_id'].to_numpy(),
+            'procedures': procedures['icd_code_id'].to_numpy()
         }
     
+    def get_diagnoses_frequency(self, top_n: int = 10) -> Dict[str, int]:
+        """Get the most common diagnoses from the precomputed frequency table."""
+        return self.code_frequencies.top_diagnoses(top_n)
+    
+    def get_diagnosis_cooccurrence(self, top_n: int = 10) -> List[tuple]:
+        """Get the diagnosis pairs most often recorded in the same admission."""
+        return self.code_frequencies.top_cooccurring(top_n)
+    
     def get_active_patients(self) -> List[Dict]:
         """Get list of patients from the last 30 days."""
         current_time = datetime.now()
@@ -226,8 +175,8 @@ class PatientDataLoader:
                 'discharge_time': admission['dischtime'],
                 'admission_type': admission['admission_type'],
                 'diagnosis': admission['diagnosis'],
-                'diagnoses_codes': admission_diagnoses['icd_code'].tolist(),
-                'procedures': admission_procedures['icd_code'].tolist()
+                'diagnoses_codes': admission_diagnoses['icd_code_id'].to_numpy(),
+                'procedures': admission_procedures['icd_code_id'].to_numpy()
             })
         
         return history
@@ -270,6 +219,8 @@ class MIMICDataLoader:
         self.patients_df = None
         self.admissions_df = None
         self.diagnoses_df = None
+        self.code_table: Optional[ICDCodeTable] = None
+        self.code_frequencies: Optional[ICDFrequencyTables] = None
         self.load_data()
     
     def load_data(self):
@@ -287,6 +238,8 @@ class MIMICDataLoader:
             admissions_path = os.path.join(self.mimic_path, "hosp", "admissions.csv")
             print(f"Loading admissions from: {admissions_path}")
             self.admissions_df = pd.read_csv(admissions_path)
+            # MIMIC-IV admissions has no LOS column; derive it in days
+            self.admissions_df['los'] = compute_length_of_stay(self.admissions_df)
             print(f"Loaded {len(self.admissions_df)} admissions")
             
             # Load diagnoses from hosp module
@@ -295,12 +248,19 @@ class MIMICDataLoader:
             self.diagnoses_df = pd.read_csv(diagnoses_path)
             print(f"Loaded {len(self.diagnoses_df)} diagnoses")
             
+            # Encode ICD codes once and cache their frequency tables
+            self.code_table, self.code_frequencies = encode_icd_tables(self.diagnoses_df)
+            
             print("Successfully loaded all MIMIC tables")
             
         except Exception as e:
             print(f"Error loading MIMIC data: {str(e)}")
             raise RuntimeError(f"Error loading MIMIC data: {str(e)}")
     
+    def query(self) -> CohortQuery:
+        """Start a cohort query over the loaded tables."""
+        return CohortQuery.from_loader(self)
+    
     def get_random_patients(self, n: int = 10) -> List[Dict]:
         """Get n random patients with their admission and diagnosis data"""
         if self.patients_df is None or self.admissions_df is None:
@@ -334,7 +294,7 @@ class MIMICDataLoader:
                     'admission_location': latest_admission['admission_location'],
                     'discharge_location': latest_admission['discharge_location'],
                     'length_of_stay': latest_admission.get('los', 0),
-                    'diagnoses': diagnoses['icd_code'].tolist() if len(diagnoses) > 0 else []
+                    'diagnoses': diagnoses['icd_code_id'].to_numpy()
                 })
         
         return patient_data
@@ -354,11 +314,11 @@ class MIMICDataLoader:
         return self.admissions_df['admission_type'].value_counts().to_dict()
     
     def get_length_of_stay_stats(self) -> Dict[str, float]:
-        """Get statistics about length of stay"""
+        """Get statistics about length of stay (days, from admittime/dischtime)"""
         if self.admissions_df is None:
             raise RuntimeError("Data not loaded. Call load_data() first.")
         
-        los_stats = self.admissions_df['los'].describe()
+        los_stats = compute_length_of_stay(self.admissions_df).describe()
         return {
             'mean': los_stats['mean'],
             'median': los_stats['50%'],
@@ -371,7 +331,14 @@ class MIMICDataLoader:
         if self.diagnoses_df is None:
             raise RuntimeError("Data not loaded. Call load_data() first.")
         
-        return self.diagnoses_df['icd_code'].value_counts().head(top_n).to_dict()
+        return self.code_frequencies.top_diagnoses(top_n)
+    
+    def get_diagnosis_cooccurrence(self, top_n: int = 10) -> List[tuple]:
+        """Get the diagnosis pairs most often recorded in the same admission"""
+        if self.code_frequencies is None:
+            raise RuntimeError("Data not loaded. Call load_data() first.")
+        
+        return self.code_frequencies.top_cooccurring(top_n)
     
     def get_patient_details(self, patient_id: str) -> Optional[Dict]:
         """Get detailed information for a specific patient"""
@@ -407,5 +374,5 @@ class MIMICDataLoader:
                 }
                 for _, row in admissions.iterrows()
             ],
-            'diagnoses': diagnoses['icd_code'].tolist()
+            'diagnoses': diagnoses['icd_code_id'].to_numpy()
         }
\ No newline at end of file
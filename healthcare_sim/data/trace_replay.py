@@ -0,0 +1,146 @@
+"""
+Trace-driven replay of recorded admissions.
+
+Streams the admissions held by PatientDataLoader / MIMICDataLoader as
+time-ordered admission and discharge events so the simulation can be driven
+by real arrival patterns instead of randomly invented patients.
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+@dataclass
+class TraceEvent:
+    """A single admission or discharge scheduled on the simulation clock."""
+    sim_time: datetime
+    event_type: str  # admission, discharge
+    subject_id: str
+    hadm_id: str
+    admission_type: str
+    location: str
+    admittime: datetime
+    dischtime: Optional[datetime]
+    diagnoses: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))  # ICD code ids
+
+class AdmissionTraceReplayer:
+    """Replay loader admissions in admittime order as simulation events.
+
+    Trace time is mapped onto simulation time as
+    ``sim_start + (t - trace_start) / time_compression``, so a compression of
+    60 replays one hour of recorded arrivals per simulated minute.
+    """
+
+    def __init__(self,
+                 loader,
+                 time_compression: float = 1.0,
+                 sim_start: Optional[datetime] = None,
+                 trace_start: Optional[datetime] = None,
+                 trace_end: Optional[datetime] = None):
+        if time_compression <= 0:
+            raise ValueError("time_compression must be positive")
+
+        self.loader = loader
+        self.time_compression = time_compression
+        self.sim_start = sim_start or datetime.now()
+
+        admissions = loader.admissions_df
+        self._admittime = pd.to_datetime(admissions['admittime']).to_numpy()
+        self._dischtime = pd.to_datetime(admissions['dischtime']).to_numpy()
+        self._subject_ids = admissions['subject_id'].to_numpy()
+        self._hadm_ids = admissions['hadm_id'].to_numpy()
+        self._admission_types = admissions['admission_type'].to_numpy()
+        self._locations = admissions['admission_location'].to_numpy()
+
+        # Only the row order is materialized; events are built lazily
+        mask = ~np.isnat(self._admittime)
+        if trace_start is not None:
+            mask &= self._admittime >= np.datetime64(pd.Timestamp(trace_start))
+        if trace_end is not None:
+            mask &= self._admittime < np.datetime64(pd.Timestamp(trace_end))
+        rows = np.flatnonzero(mask)
+        self._order = rows[np.argsort(self._admittime[rows], kind='stable')]
+
+        if trace_start is not None:
+            self.trace_start = pd.Timestamp(trace_start)
+        elif len(self._order):
+            self.trace_start = pd.Timestamp(self._admittime[self._order[0]])
+        else:
+            self.trace_start = pd.Timestamp(self.sim_start)
+
+        self._diagnosis_hadm = None
+        self._diagnosis_codes = None
+
+    def __len__(self) -> int:
+        """Number of admissions in the replayed window."""
+        return len(self._order)
+
+    def to_sim_time(self, trace_time) -> datetime:
+        """Map a recorded timestamp onto the simulation clock."""
+        elapsed = pd.Timestamp(trace_time) - self.trace_start
+        return self.sim_start + (elapsed / self.time_compression).to_pytimedelta()
+
+    def iter_events(self) -> Iterator[TraceEvent]:
+        """Yield admission and discharge events in simulation time order."""
+        pending_discharges = []  # heap of (dischtime, sequence, event)
+
+        for sequence, row in enumerate(self._order):
+            admittime = pd.Timestamp(self._admittime[row])
+
+            while pending_discharges and pending_discharges[0][0] <= admittime:
+                yield heapq.heappop(pending_discharges)[2]
+
+            event = self._build_event(row, 'admission', admittime)
+            yield event
+
+            if event.dischtime is not None:
+                discharge = TraceEvent(
+                    sim_time=self.to_sim_time(event.dischtime),
+                    event_type='discharge',
+                    subject_id=event.subject_id,
+                    hadm_id=event.hadm_id,
+                    admission_type=event.admission_type,
+                    location=event.location,
+                    admittime=event.admittime,
+                    dischtime=event.dischtime,
+                    diagnoses=event.diagnoses
+                )
+                heapq.heappush(pending_discharges, (event.dischtime, sequence, discharge))
+
+        while pending_discharges:
+            yield heapq.heappop(pending_discharges)[2]
+
+    def _build_event(self, row: int, event_type: str, admittime: pd.Timestamp) -> TraceEvent:
+        """Build the event for a single admissions row."""
+        dischtime = self._dischtime[row]
+        return TraceEvent(
+            sim_time=self.to_sim_time(admittime),
+            event_type=event_type,
+            subject_id=str(self._subject_ids[row]),
+            hadm_id=str(self._hadm_ids[row]),
+            admission_type=str(self._admission_types[row]),
+            location=str(self._locations[row]),
+            admittime=admittime.to_pydatetime(),
+            dischtime=None if np.isnat(dischtime) else pd.Timestamp(dischtime).to_pydatetime(),
+            diagnoses=self._get_diagnoses(self._hadm_ids[row])
+        )
+
+    def _get_diagnoses(self, hadm_id) -> np.ndarray:
+        """Look up the diagnosis code ids of an admission by binary search."""
+        diagnoses_df = getattr(self.loader, 'diagnoses_df', None)
+        if diagnoses_df is None:
+            return np.empty(0, dtype=np.int32)
+
+        if self._diagnosis_hadm is None:
+            hadm = diagnoses_df['hadm_id'].to_numpy()
+            order = np.argsort(hadm, kind='stable')
+            self._diagnosis_hadm = hadm[order]
+            self._diagnosis_codes = diagnoses_df['icd_code_id'].to_numpy()[order]
+
+        lo = np.searchsorted(self._diagnosis_hadm, hadm_id, side='left')
+        hi = np.searchsorted(self._diagnosis_hadm, hadm_id, side='right')
+        return self._diagnosis_codes[lo:hi]
@@ -2,6 +2,10 @@
 This module contains environment-related components for the healthcare simulation.
 """
 
+from .csr_graph import CSRGraph
+from .equipment_index import EquipmentIndex
 from .hospital_environment import HospitalEnvironment, LocationType
+from .layout_generator import HospitalLayoutGenerator, LayoutSpec, generate_layout
 
-__all__ = ['HospitalEnvironment', 'LocationType'] 
\ No newline at end of file
+__all__ = ['CSRGraph', 'EquipmentIndex', 'HospitalEnvironment', 'LocationType', 'HospitalLayoutGenerator',
+           'LayoutSpec', 'generate_layout'] 
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Compact undirected graph for large hospital layouts.
+
+CSRGraph maps location ids to integer node ids and keeps edges in compressed
+sparse row arrays (indptr, indices, weights), where weights are travel times.
+Edges are appended to flat buffers and compiled into CSR form on the first
+traversal after a change. BFS (unit travel times) and Dijkstra run directly
+over the arrays. The node/edge API mirrors the parts of networkx.Graph that
+HospitalEnvironment uses.
+"""
+
+import heapq
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+class CSRGraph:
+    """Undirected graph with integer node ids and CSR adjacency arrays."""
+
+    def __init__(self):
+        self.node_ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        # Edge buffers, one entry per undirected edge
+        self._edge_a = array('i')
+        self._edge_b = array('i')
+        self._edge_weight = array('d')
+        self._indptr: Optional[np.ndarray] = None
+        self._indices: Optional[np.ndarray] = None
+        self._weights: Optional[np.ndarray] = None
+        self._unit_weights = True
+        self._adjacency_lists = None
+
+    @classmethod
+    def from_networkx(cls, graph, weight: str = 'travel_time') -> 'CSRGraph':
+        """Build a CSRGraph from a networkx graph (missing weights count as 1)."""
+        csr = cls()
+        for node in graph.nodes:
+            csr.add_node(node)
+        for a, b, data in graph.edges(data=True):
+            csr.add_edge(a, b, travel_time=data.get(weight, 1.0))
+        return csr
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self.index
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def nodes(self) -> List[str]:
+        return self.node_ids
+
+    def number_of_nodes(self) -> int:
+        return len(self.node_ids)
+
+    def number_of_edges(self) -> int:
+        return len(self._edge_a)
+
+    def add_node(self, node_id: str) -> int:
+        """Add a node (no-op if present) and return its integer id."""
+        node = self.index.get(node_id)
+        if node is None:
+            node = len(self.node_ids)
+            self.index[node_id] = node
+            self.node_ids.append(node_id)
+            self._indptr = None
+        return node
+
+    def add_edge(self, node_a: str, node_b: str, travel_time: float = 1.0) -> None:
+        """Connect two nodes, adding them if needed.
+
+        Repeated edges are kept as parallel edges; traversals use the shortest.
+        """
+        if travel_time < 0:
+            raise ValueError("travel_time must be non-negative")
+        self._edge_a.append(self.add_node(node_a))
+        self._edge_b.append(self.add_node(node_b))
+        self._edge_weight.append(travel_time)
+        self._indptr = None
+
+    def has_edge(self, node_a: str, node_b: str) -> bool:
+        return node_b in self.neighbors(node_a)
+
+    def neighbors(self, node_id: str) -> List[str]:
+        """Ids of the nodes adjacent to a node."""
+        self._compile()
+        node = self.index[node_id]
+        return [self.node_ids[i] for i in self._indices[self._indptr[node]:self._indptr[node + 1]]]
+
+    @property
+    def unit_weights(self) -> bool:
+        """True if every edge has travel time 1, so BFS gives shortest paths."""
+        self._compile()
+        return self._unit_weights
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the edge buffers and CSR arrays."""
+        self._compile()
+        buffers = sum(buf.itemsize * len(buf) for buf in (self._edge_a, self._edge_b, self._edge_weight))
+        return buffers + self._indptr.nbytes + self._indices.nbytes + self._weights.nbytes
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The (indptr, indices, weights) arrays, with both directions of every edge."""
+        self._compile()
+        return self._indptr, self._indices, self._weights
+
+    def _compile(self) -> None:
+        """Sort the edge buffers into CSR arrays if the graph changed."""
+        if self._indptr is not None:
+            return
+        a = np.frombuffer(self._edge_a, dtype=np.int32)
+        b = np.frombuffer(self._edge_b, dtype=np.int32)
+        w = np.frombuffer(self._edge_weight, dtype=np.float64)
+        sources = np.concatenate([a, b])
+        targets = np.concatenate([b, a])
+        weights = np.concatenate([w, w])
+
+        order = np.argsort(sources, kind='stable')
+        self._indices = targets[order].astype(np.int32)
+        self._weights = weights[order]
+        self._unit_weights = bool(np.all(w == 1.0))
+        self._indptr = np.zeros(len(self.node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(self.node_ids)), out=self._indptr[1:])
+        self._adjacency_lists = None
+
+    def bfs(self, source: int,
+            targets: Optional[Iterable[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Hop distances (-1 if unreachable) and BFS predecessors from a node.
+
+        Each level expands the whole frontier with array operations.
+
+        Args:
+            source: Integer id of the start node
+            targets: Stop after the first level that reaches any of these
+                nodes; nodes beyond it are then left at -1
+        """
+        indptr, indices, _ = self.csr()
+        n = len(self.node_ids)
+        distance = np.full(n, -1, dtype=np.int32)
+        parent = np.full(n, -1, dtype=np.int32)
+        distance[source] = 0
+        parent[source] = source
+        is_target = None
+        if targets is not None:
+            is_target = np.zeros(n, dtype=bool)
+            is_target[np.fromiter(targets, dtype=np.int64)] = True
+        frontier = np.array([source], dtype=np.int64)
+        level = 0
+        while frontier.size:
+            if is_target is not None and is_target[frontier].any():
+                break
+            level += 1
+            counts = indptr[frontier + 1] - indptr[frontier]
+            offsets = np.repeat(indptr[frontier] - np.cumsum(counts) + counts, counts)
+            neighbors = indices[offsets + np.arange(counts.sum())]
+            sources = np.repeat(frontier, counts)
+            unseen = distance[neighbors] < 0
+            neighbors, sources = neighbors[unseen], sources[unseen]
+            distance[neighbors] = level
+            # A node reached from several sources keeps the last write; only
+            # that occurrence joins the next frontier
+            parent[neighbors] = sources
+            frontier = neighbors[parent[neighbors] == sources].astype(np.int64)
+        return distance, parent
+
+    def dijkstra(self, source: int,
+                 targets: Optional[Iterable[int]] = None,
+                 stop_at_first: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Travel-time distances (inf if unreached) and predecessors from a node.
+
+        Args:
+            source: Integer id of the start node
+            targets: Stop once all of these nodes are settled; distances of
+                nodes not yet settled are then upper bounds or inf
+            stop_at_first: Stop at the first settled target instead, i.e.
+                the nearest one
+        """
+        if self._indptr is None or self._adjacency_lists is None:
+            indptr, indices, weights = self.csr()
+            # Python lists are much faster than array scalars in the heap loop
+            self._adjacency_lists = (indptr.tolist(), indices.tolist(), weights.tolist())
+        indptr, indices, weights = self._adjacency_lists
+
+        n = len(self.node_ids)
+        distance = [float('inf')] * n
+        parent = [-1] * n
+        settled = [False] * n
+        distance[source] = 0.0
+        parent[source] = source
+        remaining = set(targets) if targets is not None else None
+
+        heap = [(0.0, source)]
+        while heap:
+            d, node = heapq.heappop(heap)
+            if settled[node]:
+                continue
+            settled[node] = True
+            if remaining is not None and node in remaining:
+                remaining.discard(node)
+                if stop_at_first or not remaining:
+                    break
+            for k in range(indptr[node], indptr[node + 1]):
+                neighbor = indices[k]
+                candidate = d + weights[k]
+                if candidate < distance[neighbor]:
+                    distance[neighbor] = candidate
+                    parent[neighbor] = node
+                    heapq.heappush(heap, (candidate, neighbor))
+        return np.array(distance, dtype=np.float64), np.array(parent, dtype=np.int32)
+
+    def shortest_path(self, start: str, end: str) -> List[str]:
+        """Node ids along a shortest path, or [] if there is none."""
+        if start not in self.index or end not in self.index:
+            return []
+        s, t = self.index[start], self.index[end]
+        if self.unit_weights:
+            _, parent = self.bfs(s)
+        else:
+            _, parent = self.dijkstra(s, targets=[t])
+        return self.path_from_parents(parent, s, t)
+
+    def path_from_parents(self, parent: np.ndarray, source: int, target: int) -> List[str]:
+        """Walk a predecessor array back from target to source."""
+        if parent[target] < 0:
+            return []
+        path = [target]
+        while path[-1] != source:
+            path.append(int(parent[path[-1]]))
+        return [self.node_ids[node] for node in reversed(path)]
@@ -0,0 +1,126 @@
+"""
+Equipment availability index.
+
+Keeps, for every equipment type, the free units at each location, updated
+incrementally as equipment is added or changes status instead of scanning
+location equipment dicts. Only locations with free units of a type are
+indexed, so nearest-available queries only look at those candidates and
+resolve the closest one with the environment's shortest path state.
+
+Equipment ids are "<type>_<n>" (e.g. "ventilator_2"); ids without a numeric
+suffix are their own type.
+"""
+
+import re
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .hospital_environment import HospitalEnvironment
+
+_UNIT_SUFFIX = re.compile(r'_\d+$')
+
+def equipment_type(equipment_id: str) -> str:
+    """Type of an equipment unit, e.g. "ventilator" for "ventilator_2"."""
+    return _UNIT_SUFFIX.sub('', equipment_id)
+
+class EquipmentIndex:
+    """Free equipment units by type and location.
+
+    Updates and reservations hold one index lock, so concurrent reserve
+    calls never hand out the same unit.
+    """
+
+    def __init__(self, environment: 'HospitalEnvironment'):
+        self.environment = environment
+        # type -> location -> ids of the free units there (only non-empty sets)
+        self._free: Dict[str, Dict[str, Set[str]]] = {}
+        self._free_counts: Dict[str, int] = {}
+        # Reentrant: reserve() updates the environment, which calls set_status()
+        self._lock = threading.RLock()
+
+    def add_location(self, location_id: str, equipment: Dict[str, bool]) -> None:
+        """Index the equipment of a newly added location."""
+        with self._lock:
+            for equipment_id, is_available in equipment.items():
+                if is_available:
+                    self._mark_free(location_id, equipment_id)
+
+    def set_status(self, location_id: str, equipment_id: str, is_available: bool) -> None:
+        """Record a unit becoming free or in use."""
+        with self._lock:
+            if is_available:
+                self._mark_free(location_id, equipment_id)
+            else:
+                self._mark_used(location_id, equipment_id)
+
+    def free_count(self, kind: str, location_id: Optional[str] = None) -> int:
+        """Free units of a type, at one location or in the whole facility."""
+        with self._lock:
+            if location_id is None:
+                return self._free_counts.get(kind, 0)
+            return len(self._free.get(kind, {}).get(location_id, ()))
+
+    def locations_with(self, kind: str) -> Dict[str, int]:
+        """Locations holding free units of a type and how many each has."""
+        with self._lock:
+            return {location_id: len(units) for location_id, units in self._free.get(kind, {}).items()}
+
+    def find_nearest(self, kind: str, location_id: str) -> Optional[Tuple[str, float]]:
+        """Closest location with a free unit of a type and its travel time.
+
+        Returns:
+            (location id, travel time), or None if no free unit is reachable
+        """
+        with self._lock:
+            candidates = self._free.get(kind)
+            if not candidates:
+                return None
+            if location_id in candidates:
+                return location_id, 0.0
+            return self.environment.find_nearest(location_id, list(candidates))
+
+    def reserve(self, kind: str, near: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """Take a free unit of a type, the closest one to near if given.
+
+        The unit is marked unavailable in the environment.
+
+        Returns:
+            (location id, equipment id), or None if no unit is available
+        """
+        with self._lock:
+            candidates = self._free.get(kind)
+            if not candidates:
+                return None
+            if near is None:
+                location_id = next(iter(candidates))
+            else:
+                nearest = self.find_nearest(kind, near)
+                if nearest is None:
+                    return None
+                location_id = nearest[0]
+            equipment_id = min(candidates[location_id])
+            self.environment.update_equipment_status(location_id, equipment_id, False)
+            return location_id, equipment_id
+
+    def release(self, location_id: str, equipment_id: str) -> None:
+        """Return a reserved unit."""
+        self.environment.update_equipment_status(location_id, equipment_id, True)
+
+    def _mark_free(self, location_id: str, equipment_id: str) -> None:
+        kind = equipment_type(equipment_id)
+        units = self._free.setdefault(kind, {}).setdefault(location_id, set())
+        if equipment_id not in units:
+            units.add(equipment_id)
+            self._free_counts[kind] = self._free_counts.get(kind, 0) + 1
+
+    def _mark_used(self, location_id: str, equipment_id: str) -> None:
+        kind = equipment_type(equipment_id)
+        by_location = self._free.get(kind, {})
+        units = by_location.get(location_id)
+        if units is None or equipment_id not in units:
+            return
+        units.discard(equipment_id)
+        self._free_counts[kind] -= 1
+        if not units:
+            del by_location[location_id]
@@ -1,7 +1,15 @@
+import heapq
+import itertools
+import threading
 import networkx as nx
+import numpy as np
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from .csr_graph import CSRGraph
+from .equipment_index import EquipmentIndex
 
 class LocationType(Enum):
     WARD = "ward"
@@ -20,12 +28,68 @@ class Location:
     capacity: int
     current_occupancy: int = 0
     equipment: Dict[str, bool] = None  # equipment_name: is_available
+    reserved: int = 0  # places held by pending reservations
+
+@dataclass
+class Reservation:
+    """Capacity held at a location until it is confirmed, released or expires."""
+    id: str
+    location_id: str
+    count: int
+    expires_at: datetime
+    holder: Optional[str] = None  # e.g. the transferring patient's id
     
 class HospitalEnvironment:
-    def __init__(self):
-        self.layout = nx.Graph()
+    def __init__(self,
+                 graph_backend: str = "networkx",
+                 apsp_max_nodes: int = 2000,
+                 path_cache_size: int = 256,
+                 default_layout: bool = True):
+        """
+        Args:
+            graph_backend: "networkx" (default) or "csr" for the compact
+                array-based graph used with large generated campuses
+            apsp_max_nodes: Largest unit-travel-time layout for which
+                all-pairs tables are precomputed; larger or weighted layouts
+                cache shortest path trees per source instead
+            path_cache_size: Number of per-source shortest path trees kept
+            default_layout: Build the small built-in layout; disable to start
+                empty, e.g. for HospitalLayoutGenerator
+        """
+        if graph_backend == "networkx":
+            self.layout = nx.Graph()
+        elif graph_backend == "csr":
+            self.layout = CSRGraph()
+        else:
+            raise ValueError(f"Unknown graph backend: {graph_backend}")
+        self.graph_backend = graph_backend
+        self.apsp_max_nodes = apsp_max_nodes
+        self.path_cache_size = path_cache_size
         self.locations: Dict[str, Location] = {}
-        self.initialize_hospital_layout()
+        self.equipment_index = EquipmentIndex(self)
+        
+        # Occupancy and reservation counters of a location only change under
+        # its lock. Pending holds are also kept in a heap by expiry time so
+        # expired ones are swept without scanning locations; entries of
+        # confirmed or released holds are skipped when popped.
+        self._location_locks: Dict[str, threading.Lock] = {}
+        self._reservations: Dict[str, Reservation] = {}
+        self._reservation_expiry: List[Tuple[datetime, str]] = []
+        self._reservation_lock = threading.Lock()
+        self._reservation_ids = itertools.count(1)
+        self._reservation_clock: Optional[datetime] = None  # latest time given to a reservation call
+        
+        # Shortest path state, rebuilt lazily after the layout changes. Small
+        # unit-weight layouts get all-pairs tables of hop distances (-1 if
+        # unreachable) and next hops; other layouts cache per-source
+        # (distance, predecessor) arrays in LRU order
+        self._graph: Optional[CSRGraph] = None
+        self._hop_distance: Optional[np.ndarray] = None
+        self._next_hop: Optional[np.ndarray] = None
+        self._source_cache: "OrderedDict[int, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._distance_matrix: Optional[Tuple[List[str], np.ndarray]] = None
+        if default_layout:
+            self.initialize_hospital_layout()
     
     def initialize_hospital_layout(self):
         """Initialize the basic hospital layout with different areas."""
@@ -51,7 +115,7 @@ class HospitalEnvironment:
         ]
         
         for loc1, loc2 in connections:
-            self.layout.add_edge(loc1, loc2)
+            self.connect_locations(loc1, loc2)
     
     def add_location(self, location_id: str, location_type: LocationType, capacity: int,
                     equipment: Optional[Dict[str, bool]] = None):
@@ -65,26 +129,295 @@ class HospitalEnvironment:
             capacity=capacity,
             equipment=equipment
         )
-        self.locations[location_id] = location
+        lock = self._location_locks.setdefault(location_id, threading.Lock())
+        with lock:
+            previous = self.locations.get(location_id)
+            if previous is not None:
+                for equipment_id in previous.equipment:
+                    self.equipment_index.set_status(location_id, equipment_id, False)
+                # Pending holds still refer to this location and free their places later
+                location.reserved = previous.reserved
+            self.locations[location_id] = location
+        self.equipment_index.add_location(location_id, equipment)
         self.layout.add_node(location_id)
+        self._invalidate_paths()
+    
+    def connect_locations(self, location_a: str, location_b: str, travel_time: float = 1.0) -> None:
+        """Add a walkable path between two locations."""
+        self.layout.add_edge(location_a, location_b, travel_time=travel_time)
+        self._invalidate_paths()
+    
+    def _invalidate_paths(self) -> None:
+        """Drop the cached shortest path state after a layout change."""
+        self._graph = None
+        self._hop_distance = None
+        self._next_hop = None
+        self._source_cache.clear()
+        self._distance_matrix = None
+    
+    def _get_graph(self) -> CSRGraph:
+        """Array form of the layout used for all path computations."""
+        if self._graph is None:
+            if isinstance(self.layout, CSRGraph):
+                self._graph = self.layout
+            else:
+                self._graph = CSRGraph.from_networkx(self.layout)
+            if self._graph.unit_weights and len(self._graph) <= self.apsp_max_nodes:
+                self._build_shortest_paths()
+        return self._graph
+    
+    def _build_shortest_paths(self) -> None:
+        """Compute hop distances and next-hop tables with a BFS from every node."""
+        n = len(self._graph)
+        distance = np.empty((n, n), dtype=np.int32)
+        parent = np.empty((n, n), dtype=np.int32)  # parent[root, v]: v's predecessor from root
+        for root in range(n):
+            distance[root], parent[root] = self._graph.bfs(root)
+        
+        # The layout is undirected, so the predecessor of s in the BFS tree
+        # rooted at t is the first step from s towards t
+        self._hop_distance = distance
+        self._next_hop = np.ascontiguousarray(parent.T)
+    
+    def _source_tree(self, source: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Distances and predecessors from one node, cached in LRU order."""
+        tree = self._source_cache.get(source)
+        if tree is not None:
+            self._source_cache.move_to_end(source)
+            return tree
+        
+        if self._graph.unit_weights:
+            hops, parent = self._graph.bfs(source)
+            tree = (np.where(hops >= 0, hops, np.inf).astype(np.float64), parent)
+        else:
+            tree = self._graph.dijkstra(source)
+        self._source_cache[source] = tree
+        if len(self._source_cache) > self.path_cache_size:
+            self._source_cache.popitem(last=False)
+        return tree
+    
+    def get_distance(self, start: str, end: str) -> float:
+        """Travel time of the shortest path between two locations (inf if unreachable).
+        
+        With the default travel time of 1 per connection this is the hop count.
+        """
+        graph = self._get_graph()
+        s = graph.index.get(start)
+        t = graph.index.get(end)
+        if s is None or t is None:
+            return float('inf')
+        if self._hop_distance is not None:
+            hops = self._hop_distance[s, t]
+            return float(hops) if hops >= 0 else float('inf')
+        return float(self._source_tree(s)[0][t])
+    
+    def get_distances(self, location_ids: List[str]) -> np.ndarray:
+        """Shortest travel times between the given locations (inf if unreachable)."""
+        graph = self._get_graph()
+        nodes = np.array([graph.index.get(location_id, -1) for location_id in location_ids],
+                         dtype=np.int64)
+        known = np.flatnonzero(nodes >= 0)
+        matrix = np.full((len(nodes), len(nodes)), np.inf)
+        if self._hop_distance is not None:
+            hops = self._hop_distance[np.ix_(nodes[known], nodes[known])]
+            matrix[np.ix_(known, known)] = np.where(hops >= 0, hops, np.inf)
+        else:
+            for i in known:
+                matrix[i, known] = self._source_tree(nodes[i])[0][nodes[known]]
+        return matrix
+    
+    def get_distance_matrix(self) -> Tuple[List[str], np.ndarray]:
+        """Shortest travel times between all locations (inf if unreachable).
+        
+        Returns:
+            Location ids and the matrix indexed in that order; cached until
+            a location or connection is added. Prefer get_distances for a few
+            locations of a large layout.
+        """
+        if self._distance_matrix is None:
+            location_ids = list(self.locations)
+            self._distance_matrix = (location_ids, self.get_distances(location_ids))
+        return self._distance_matrix
+    
+    def find_nearest(self, start: str, candidates: List[str]) -> Optional[Tuple[str, float]]:
+        """Closest reachable candidate location and its travel time.
+        
+        Uses the all-pairs tables or a cached shortest path tree when
+        available, and otherwise a BFS (unit travel times) or Dijkstra search
+        that stops at the first candidate reached, so only the neighbourhood
+        of start is explored.
+        """
+        graph = self._get_graph()
+        s = graph.index.get(start)
+        nodes = np.array([graph.index.get(c, -1) for c in candidates], dtype=np.int64)
+        nodes = nodes[nodes >= 0]
+        if s is None or nodes.size == 0:
+            return None
+        
+        if self._hop_distance is not None:
+            distances = self._hop_distance[s, nodes].astype(np.float64)
+            distances[distances < 0] = np.inf
+        elif s in self._source_cache:
+            distances = self._source_tree(s)[0][nodes]
+        elif graph.unit_weights:
+            hops, _ = graph.bfs(s, targets=nodes.tolist())
+            distances = np.where(hops[nodes] >= 0, hops[nodes], np.inf)
+        else:
+            distances, _ = graph.dijkstra(s, targets=nodes.tolist(), stop_at_first=True)
+            distances = distances[nodes]
+            # Unsettled candidates only have upper bounds, but the minimum is exact
+        best = int(np.argmin(distances))
+        if not np.isfinite(distances[best]):
+            return None
+        return graph.node_ids[nodes[best]], float(distances[best])
     
     def get_path(self, start: str, end: str) -> List[str]:
         """Find the shortest path between two locations."""
-        try:
-            path = nx.shortest_path(self.layout, start, end)
-            return path
-        except nx.NetworkXNoPath:
+        graph = self._get_graph()
+        s = graph.index.get(start)
+        t = graph.index.get(end)
+        if s is None or t is None:
             return []
+        
+        if self._hop_distance is not None:
+            if self._hop_distance[s, t] < 0:
+                return []
+            path = [start]
+            while s != t:
+                s = self._next_hop[s, t]
+                path.append(graph.node_ids[s])
+            return path
+        return graph.path_from_parents(self._source_tree(s)[1], s, t)
+    
+    def update_occupancy(self, location_id: str, delta: int, now: Optional[datetime] = None) -> bool:
+        """Update the occupancy of a location.
+        
+        Places held by pending reservations are not available; holds that
+        have expired by now are released first.
+        """
+        self.expire_reservations(now)
+        location = self.locations[location_id]
+        with self._location_locks[location_id]:
+            new_occupancy = location.current_occupancy + delta
+            if 0 <= new_occupancy and new_occupancy + location.reserved <= location.capacity:
+                location.current_occupancy = new_occupancy
+                return True
+            return False
     
-    def update_occupancy(self, location_id: str, delta: int) -> bool:
-        """Update the occupancy of a location."""
+    def get_available_capacity(self, location_id: str, now: Optional[datetime] = None) -> int:
+        """Places neither occupied nor held by an unexpired reservation."""
+        self.expire_reservations(now)
         location = self.locations[location_id]
-        new_occupancy = location.current_occupancy + delta
+        with self._location_locks[location_id]:
+            return location.capacity - location.current_occupancy - location.reserved
+    
+    def reserve_capacity(self,
+                         location_id: str,
+                         count: int = 1,
+                         hold: timedelta = timedelta(minutes=30),
+                         now: Optional[datetime] = None,
+                         holder: Optional[str] = None) -> Optional[str]:
+        """Hold places at a location, e.g. a bed for an incoming transfer.
+        
+        Args:
+            location_id: Location to reserve at
+            count: Number of places
+            hold: How long the hold lasts unless confirmed
+            now: Current (simulation) time; defaults to the latest time
+                given to a reservation call, or the wall clock
+            holder: Who the places are held for
+            
+        Returns:
+            Reservation id, or None if the location lacks free capacity
+        """
+        now = self._reservation_now(now)
+        self.expire_reservations(now)
+        
+        location = self.locations[location_id]
+        with self._location_locks[location_id]:
+            if count <= 0 or location.current_occupancy + location.reserved + count > location.capacity:
+                return None
+            location.reserved += count
+        
+        with self._reservation_lock:
+            reservation = Reservation(f"res_{next(self._reservation_ids)}", location_id,
+                                      count, now + hold, holder)
+            self._reservations[reservation.id] = reservation
+            heapq.heappush(self._reservation_expiry, (reservation.expires_at, reservation.id))
+        return reservation.id
+    
+    def confirm_reservation(self, reservation_id: str, now: Optional[datetime] = None) -> bool:
+        """Turn a pending hold into occupancy.
+        
+        Returns:
+            False if the reservation is unknown, released or expired
+        """
+        now = self._reservation_now(now)
+        reservation = self._take_reservation(reservation_id)
+        if reservation is None:
+            return False
         
-        if 0 <= new_occupancy <= location.capacity:
-            location.current_occupancy = new_occupancy
-            return True
-        return False
+        location = self.locations[reservation.location_id]
+        with self._location_locks[reservation.location_id]:
+            location.reserved -= reservation.count
+            if reservation.expires_at <= now:
+                return False
+            # The held places were already counted against capacity
+            location.current_occupancy += reservation.count
+        return True
+    
+    def release_reservation(self, reservation_id: str) -> bool:
+        """Cancel a pending hold, freeing its places."""
+        reservation = self._take_reservation(reservation_id)
+        if reservation is None:
+            return False
+        self._free_reserved(reservation)
+        return True
+    
+    def expire_reservations(self, now: Optional[datetime] = None) -> List[Reservation]:
+        """Free the places of every hold that has expired by now.
+        
+        Pops holds off the expiry heap in expiry order, so the cost depends
+        on the number of expired holds rather than on the number of locations.
+        
+        Returns:
+            The expired reservations
+        """
+        now = self._reservation_now(now)
+        expired = []
+        with self._reservation_lock:
+            while self._reservation_expiry and self._reservation_expiry[0][0] <= now:
+                _, reservation_id = heapq.heappop(self._reservation_expiry)
+                reservation = self._reservations.pop(reservation_id, None)
+                if reservation is not None:
+                    expired.append(reservation)
+        for reservation in expired:
+            self._free_reserved(reservation)
+        return expired
+    
+    def get_reservation(self, reservation_id: str) -> Optional[Reservation]:
+        """A pending reservation by id."""
+        return self._reservations.get(reservation_id)
+    
+    def _reservation_now(self, now: Optional[datetime]) -> datetime:
+        """now, or the latest time seen by reservation calls if not given.
+        
+        Callers that pass simulation time once keep expiry on that clock.
+        """
+        if now is not None:
+            if self._reservation_clock is None or now > self._reservation_clock:
+                self._reservation_clock = now
+            return now
+        return self._reservation_clock or datetime.now()
+    
+    def _take_reservation(self, reservation_id: str) -> Optional[Reservation]:
+        """Remove a pending reservation so that only one caller settles it."""
+        with self._reservation_lock:
+            return self._reservations.pop(reservation_id, None)
+    
+    def _free_reserved(self, reservation: Reservation) -> None:
+        with self._location_locks[reservation.location_id]:
+            self.locations[reservation.location_id].reserved -= reservation.count
     
     def get_available_equipment(self, location_id: str) -> List[str]:
         """Get list of available equipment at a location."""
@@ -94,4 +427,13 @@ class HospitalEnvironment:
     def update_equipment_status(self, location_id: str, equipment_id: str, is_available: bool):
         """Update the availability status of equipment at a location."""
         if location_id in self.locations and equipment_id in self.locations[location_id].equipment:
-            self.locations[location_id].equipment[equipment_id] = is_available 
\ No newline at end of file
+            self.locations[location_id].equipment[equipment_id] = is_available
+            self.equipment_index.set_status(location_id, equipment_id, is_available)
+    
+    def find_nearest_equipment(self, equipment_type: str, location_id: str) -> Optional[Tuple[str, float]]:
+        """Closest location with a free unit of an equipment type (e.g. "ventilator").
+        
+        Returns:
+            (location id, travel time), or None if no free unit is reachable
+        """
+        return self.equipment_index.find_nearest(equipment_type, location_id)
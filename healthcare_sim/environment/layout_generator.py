@@ -0,0 +1,159 @@
+"""
+Procedural hospital layout generation.
+
+Builds multi-floor layouts into a HospitalEnvironment from a LayoutSpec.
+Every floor has a lobby served by the elevator banks, and wings branch off
+the lobby as corridors with rooms along them. The ground floor also holds
+the main departments (ER, pharmacy, waiting room, ...) on its own corridor.
+Corridors, lobbies and elevator stops are graph nodes only; rooms become
+Locations with the capacity and equipment configured for their type.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from .hospital_environment import HospitalEnvironment, LocationType
+
+DEFAULT_CAPACITY = {
+    LocationType.WARD: 20,
+    LocationType.ICU: 10,
+    LocationType.OR: 2,
+    LocationType.ER: 15,
+    LocationType.PHARMACY: 5,
+    LocationType.NURSE_STATION: 5,
+    LocationType.OFFICE: 2,
+    LocationType.WAITING_ROOM: 30,
+}
+
+# Units of each equipment kind per room of a type
+DEFAULT_EQUIPMENT_MIX = {
+    LocationType.ER: {'ventilator': 1, 'defibrillator': 2, 'monitoring_system': 4},
+    LocationType.ICU: {'ventilator': 2, 'ecmo': 1, 'dialysis_machine': 1},
+    LocationType.WARD: {'basic_monitoring': 2},
+    LocationType.OR: {'anesthesia_machine': 1, 'monitoring_system': 1},
+}
+
+@dataclass
+class LayoutSpec:
+    """Shape of a generated hospital.
+
+    Room counts are per wing (wing_rooms) or for the ground floor's main
+    corridor (ground_floor_rooms). Travel times are in the same units as
+    HospitalEnvironment.connect_locations; keeping them all at 1 lets the
+    environment use hop-count shortest paths.
+    """
+    floors: int = 3
+    wings_per_floor: int = 2
+    elevators: int = 2
+    rooms_per_corridor: int = 4  # rooms sharing one corridor segment
+    wing_rooms: Dict[LocationType, int] = field(default_factory=lambda: {
+        LocationType.NURSE_STATION: 1,
+        LocationType.WARD: 6,
+        LocationType.OFFICE: 1,
+    })
+    ground_floor_rooms: Dict[LocationType, int] = field(default_factory=lambda: {
+        LocationType.ER: 1,
+        LocationType.WAITING_ROOM: 1,
+        LocationType.PHARMACY: 1,
+        LocationType.ICU: 1,
+        LocationType.OR: 2,
+    })
+    capacity: Dict[LocationType, int] = field(default_factory=lambda: dict(DEFAULT_CAPACITY))
+    equipment_mix: Dict[LocationType, Dict[str, int]] = field(
+        default_factory=lambda: {t: dict(mix) for t, mix in DEFAULT_EQUIPMENT_MIX.items()})
+    corridor_travel_time: float = 1.0
+    room_travel_time: float = 1.0
+    elevator_travel_time: float = 1.0  # per floor
+
+    @property
+    def location_count(self) -> int:
+        """Number of Locations (rooms) the spec generates."""
+        wings = self.floors * self.wings_per_floor
+        return wings * sum(self.wing_rooms.values()) + sum(self.ground_floor_rooms.values())
+
+    @classmethod
+    def for_location_count(cls, locations: int, wings_per_floor: int = 4,
+                           max_floors: int = 20, **kwargs) -> 'LayoutSpec':
+        """Spec with about the given number of rooms.
+
+        Floors are added as the layout grows; past max_floors the floors get
+        more wings instead, like a campus of wide buildings.
+        """
+        spec = cls(**kwargs)
+        per_wing = max(1, sum(spec.wing_rooms.values()))
+        wings = max(1, math.ceil((locations - sum(spec.ground_floor_rooms.values())) / per_wing))
+        spec.floors = min(max_floors, math.ceil(wings / wings_per_floor))
+        spec.wings_per_floor = math.ceil(wings / spec.floors)
+        return spec
+
+class HospitalLayoutGenerator:
+    """Build the layout described by a LayoutSpec into a HospitalEnvironment."""
+
+    def __init__(self, spec: Optional[LayoutSpec] = None):
+        self.spec = spec or LayoutSpec()
+
+    def generate(self,
+                 environment: Optional[HospitalEnvironment] = None,
+                 graph_backend: str = "csr") -> HospitalEnvironment:
+        """Add the generated layout to environment, or to a new empty one.
+
+        Returns:
+            The environment holding the layout
+        """
+        if environment is None:
+            environment = HospitalEnvironment(graph_backend=graph_backend, default_layout=False)
+
+        spec = self.spec
+        for floor in range(spec.floors):
+            lobby = f"f{floor}_lobby"
+            for elevator in range(spec.elevators):
+                stop = f"elevator_{elevator}_f{floor}"
+                environment.connect_locations(stop, lobby, spec.corridor_travel_time)
+                if floor > 0:
+                    environment.connect_locations(
+                        f"elevator_{elevator}_f{floor - 1}", stop, spec.elevator_travel_time)
+            if spec.elevators == 0 and floor > 0:
+                # Stairs only
+                environment.connect_locations(f"f{floor - 1}_lobby", lobby, spec.elevator_travel_time)
+
+            if floor == 0 and spec.ground_floor_rooms:
+                self._build_corridor(environment, lobby, "f0_main", spec.ground_floor_rooms)
+            for wing in range(spec.wings_per_floor):
+                self._build_corridor(environment, lobby, f"f{floor}_w{wing}", spec.wing_rooms)
+        return environment
+
+    def _build_corridor(self, environment: HospitalEnvironment, lobby: str, prefix: str,
+                        rooms: Dict[LocationType, int]) -> List[str]:
+        """Add a corridor leaving the lobby with the rooms spread along it.
+
+        Returns:
+            Ids of the rooms added
+        """
+        spec = self.spec
+        room_ids = []
+        previous = lobby
+        segment = None
+        for location_type, count in rooms.items():
+            for k in range(count):
+                if len(room_ids) % max(1, spec.rooms_per_corridor) == 0:
+                    segment = f"{prefix}_corridor_{len(room_ids) // max(1, spec.rooms_per_corridor)}"
+                    environment.connect_locations(previous, segment, spec.corridor_travel_time)
+                    previous = segment
+
+                room_id = f"{prefix}_{location_type.value}_{k + 1}"
+                equipment = {
+                    f"{kind}_{unit + 1}": True
+                    for kind, units in spec.equipment_mix.get(location_type, {}).items()
+                    for unit in range(units)
+                }
+                environment.add_location(room_id, location_type,
+                                         capacity=spec.capacity.get(location_type, 1),
+                                         equipment=equipment)
+                environment.connect_locations(segment, room_id, spec.room_travel_time)
+                room_ids.append(room_id)
+        return room_ids
+
+def generate_layout(spec: Optional[LayoutSpec] = None, graph_backend: str = "csr") -> HospitalEnvironment:
+    """Create a HospitalEnvironment holding only the generated layout."""
+    return HospitalLayoutGenerator(spec).generate(graph_backend=graph_backend)
@@ -0,0 +1,106 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+
+import networkx as nx
+import numpy as np
+
+from environment.csr_graph import CSRGraph
+
+def make_graph(nodes=300, edges=700, weighted=True, seed=0):
+    """Random graph with string node ids and travel_time weights (may be disconnected)."""
+    rng = random.Random(seed)
+    graph = nx.gnm_random_graph(nodes, edges, seed=seed)
+    graph = nx.relabel_nodes(graph, {node: f"room_{node}" for node in graph.nodes})
+    for a, b in graph.edges:
+        graph.edges[a, b]['travel_time'] = rng.uniform(0.5, 10.0) if weighted else 1.0
+    return graph
+
+def path_cost(graph, path):
+    return sum(graph.edges[a, b]['travel_time'] for a, b in zip(path, path[1:]))
+
+def test_structure_matches_networkx():
+    graph = make_graph()
+    csr = CSRGraph.from_networkx(graph)
+    assert csr.number_of_nodes() == graph.number_of_nodes()
+    assert csr.number_of_edges() == graph.number_of_edges()
+    for node in list(graph.nodes)[:50]:
+        assert sorted(csr.neighbors(node)) == sorted(graph.neighbors(node))
+    assert csr.has_edge(*next(iter(graph.edges)))
+
+def test_bfs_matches_networkx():
+    graph = make_graph(weighted=False, seed=1)
+    csr = CSRGraph.from_networkx(graph)
+    assert csr.unit_weights
+    for source in list(graph.nodes)[:20]:
+        distance, parent = csr.bfs(csr.index[source])
+        expected = nx.single_source_shortest_path_length(graph, source)
+        for node, i in csr.index.items():
+            assert distance[i] == expected.get(node, -1)
+            if distance[i] > 0:
+                # Parents lie on a shortest path
+                assert distance[parent[i]] == distance[i] - 1
+                assert graph.has_edge(csr.node_ids[parent[i]], node)
+
+def test_bfs_stops_at_targets():
+    graph = make_graph(weighted=False, seed=2)
+    csr = CSRGraph.from_networkx(graph)
+    source = 'room_0'
+    expected = nx.single_source_shortest_path_length(graph, source)
+    target = max(expected, key=expected.get)
+    distance, _ = csr.bfs(csr.index[source], targets=[csr.index[target]])
+    assert distance[csr.index[target]] == expected[target]
+    assert distance.max() == expected[target]
+
+def test_dijkstra_matches_networkx():
+    graph = make_graph(seed=3)
+    csr = CSRGraph.from_networkx(graph)
+    assert not csr.unit_weights
+    for source in list(graph.nodes)[:20]:
+        distance, parent = csr.dijkstra(csr.index[source])
+        expected = nx.single_source_dijkstra_path_length(graph, source, weight='travel_time')
+        for node, i in csr.index.items():
+            if node in expected:
+                assert np.isclose(distance[i], expected[node])
+                if node != source:
+                    edge = graph.edges[csr.node_ids[parent[i]], node]['travel_time']
+                    assert np.isclose(distance[parent[i]] + edge, distance[i])
+            else:
+                assert np.isinf(distance[i]) and parent[i] == -1
+
+def test_shortest_path_cost_matches_networkx():
+    for weighted in (False, True):
+        graph = make_graph(weighted=weighted, seed=4)
+        csr = CSRGraph.from_networkx(graph)
+        rng = random.Random(5)
+        nodes = list(graph.nodes)
+        for _ in range(50):
+            start, end = rng.choice(nodes), rng.choice(nodes)
+            path = csr.shortest_path(start, end)
+            if not nx.has_path(graph, start, end):
+                assert path == []
+                continue
+            expected = nx.shortest_path_length(graph, start, end, weight='travel_time')
+            assert path[0] == start and path[-1] == end
+            assert np.isclose(path_cost(graph, path), expected)
+    assert csr.shortest_path('room_0', 'missing') == []
+
+def test_edges_added_after_a_query():
+    csr = CSRGraph()
+    csr.add_edge('a', 'b', 1.0)
+    csr.add_edge('b', 'c', 1.0)
+    assert csr.shortest_path('a', 'c') == ['a', 'b', 'c']
+    csr.add_edge('a', 'c', 5.0)
+    csr.add_edge('c', 'd', 1.0)
+    assert csr.shortest_path('a', 'd') == ['a', 'b', 'c', 'd']
+
+if __name__ == "__main__":
+    test_structure_matches_networkx()
+    test_bfs_matches_networkx()
+    test_bfs_stops_at_targets()
+    test_dijkstra_matches_networkx()
+    test_shortest_path_cost_matches_networkx()
+    test_edges_added_after_a_query()
+    print("csr_graph tests passed")
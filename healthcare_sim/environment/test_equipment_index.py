@@ -0,0 +1,51 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent.futures import ThreadPoolExecutor
+
+from environment.hospital_environment import HospitalEnvironment, LocationType
+
+def make_environment(units_per_location=25):
+    environment = HospitalEnvironment()
+    for i, location_id in enumerate(("icu_1", "ward_1", "er")):
+        first = i * units_per_location
+        equipment = {f"ventilator_{n}": True for n in range(first, first + units_per_location)}
+        environment.add_location(location_id, environment.locations[location_id].type,
+                                 environment.locations[location_id].capacity, equipment)
+    return environment
+
+def test_reserve_prefers_the_nearest_location():
+    environment = make_environment(units_per_location=1)
+    index = environment.equipment_index
+    location_id, equipment_id = index.reserve("ventilator", near="icu_1")
+    assert location_id == "icu_1"
+    assert environment.locations["icu_1"].equipment[equipment_id] is False
+    assert index.free_count("ventilator", "icu_1") == 0
+    assert index.reserve("ventilator", near="icu_1")[0] != "icu_1"
+    index.release(location_id, equipment_id)
+    assert index.free_count("ventilator", "icu_1") == 1
+
+def test_concurrent_reservations_get_distinct_units():
+    environment = make_environment()
+    index = environment.equipment_index
+    total = index.free_count("ventilator")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: index.reserve("ventilator", near="er"), range(total + 10)))
+    reserved = [result for result in results if result is not None]
+    assert len(reserved) == total
+    assert len(set(reserved)) == total
+    assert index.free_count("ventilator") == 0
+    assert index.locations_with("ventilator") == {}
+
+def test_replaced_location_drops_its_units():
+    environment = make_environment(units_per_location=2)
+    environment.add_location("er", LocationType.ER, 15, {"monitor_1": True})
+    assert environment.equipment_index.free_count("ventilator", "er") == 0
+    assert environment.equipment_index.free_count("monitor") == 1
+
+if __name__ == "__main__":
+    test_reserve_prefers_the_nearest_location()
+    test_concurrent_reservations_get_distinct_units()
+    test_replaced_location_drops_its_units()
+    print("equipment_index tests passed")
@@ -0,0 +1,275 @@
+"""
+Streaming export of simulation outputs.
+
+SimulationExporter writes lifecycle events, vital sign readings and
+department occupancy samples to disk while the simulation runs, so the
+results can be analyzed without keeping a SimulationManager (or the full
+history) in memory. Rows are buffered per table and written every
+batch_rows rows:
+
+- Parquet: a hive-partitioned dataset per table
+  (events/day=2026-01-01/department=ICU/<run>-0.parquet). Each partition
+  file stays open while its day is current and gets one row group per
+  flush; the partition columns live in the directory names.
+- CSV: the same directory layout, appending to one file per partition.
+
+The events table uses the column names ReportMetrics reads, so
+ReportMetrics.from_event_log(<root>/events) reports on an exported run.
+"""
+
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+
+import pandas as pd
+
+# Column types per table; partition columns (day, department) included
+TABLE_COLUMNS = {
+    'events': {
+        'timestamp': 'timestamp', 'day': 'string', 'department': 'string',
+        'type': 'string', 'patient_id': 'string', 'event_id': 'string',
+        'description': 'string', 'length_of_stay': 'float', 'transfer_wait': 'float',
+        'response_time': 'float',
+    },
+    'vitals': {
+        'timestamp': 'timestamp', 'day': 'string', 'department': 'string',
+        'patient_id': 'string', 'heart_rate': 'float', 'systolic_bp': 'float',
+        'diastolic_bp': 'float', 'temperature': 'float', 'oxygen_saturation': 'float',
+        'respiratory_rate': 'float',
+    },
+    'occupancy': {
+        'timestamp': 'timestamp', 'day': 'string', 'department': 'string',
+        'occupancy': 'float', 'capacity': 'float', 'occupancy_rate': 'float',
+        'queue_length': 'float',
+    },
+}
+
+# Directory name of a partition whose value is missing (read back as null)
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+class PartitionedTableWriter:
+    """Buffered writer of one table into a partitioned Parquet or CSV dataset."""
+
+    def __init__(self,
+                 path: str,
+                 columns: Dict[str, str],
+                 file_format: str = 'parquet',
+                 partition_by: Sequence[str] = ('day', 'department'),
+                 batch_rows: int = 65_536,
+                 run_id: Optional[str] = None):
+        """
+        Args:
+            path: Dataset directory
+            columns: Column name to type ('timestamp', 'string' or 'float')
+            file_format: 'parquet' or 'csv'
+            partition_by: Columns whose values become directory levels
+            batch_rows: Rows buffered before they are written
+            run_id: Prefix of the files this writer creates
+        """
+        if file_format not in ('parquet', 'csv'):
+            raise ValueError(f"Unsupported export format: {file_format}")
+        self.path = path
+        self.columns = columns
+        self.file_format = file_format
+        self.partition_by = [c for c in partition_by if c in columns]
+        self.batch_rows = batch_rows
+        self.run_id = run_id or uuid.uuid4().hex[:8]
+        self.rows_written = 0
+        self._buffer: Dict[str, List] = {name: [] for name in columns}
+        self._buffered = 0
+        self._writers: Dict[Tuple, object] = {}  # open ParquetWriter per partition
+        self._files: Dict[Tuple, str] = {}  # current file per partition
+        self._file_counts: Dict[Tuple, int] = {}
+        self._schema = None
+        if file_format == 'parquet':
+            import pyarrow as pa
+            types = {'timestamp': pa.timestamp('us'), 'string': pa.string(), 'float': pa.float64()}
+            self._schema = pa.schema([(name, types[kind]) for name, kind in columns.items()
+                                      if name not in self.partition_by])
+
+    def __len__(self) -> int:
+        """Rows written or waiting in the buffer."""
+        return self.rows_written + self._buffered
+
+    def append(self, row: Dict) -> None:
+        """Buffer one row; columns missing from it are null."""
+        for name, values in self._buffer.items():
+            values.append(row.get(name))
+        self._buffered += 1
+        if self._buffered >= self.batch_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows, one row group per partition."""
+        if self._buffered == 0:
+            return
+        frame = pd.DataFrame(self._buffer)
+        for name, kind in self.columns.items():
+            if kind == 'timestamp':
+                frame[name] = pd.to_datetime(frame[name])
+            elif kind == 'float':
+                frame[name] = pd.to_numeric(frame[name], errors='coerce')
+        self._buffer = {name: [] for name in self.columns}
+        self._buffered = 0
+
+        if self.partition_by:
+            partitions = frame.groupby(self.partition_by, dropna=False, sort=False)
+        else:
+            partitions = [((), frame)]
+        for key, group in partitions:
+            self._write(tuple(None if pd.isna(v) else v for v in key), group)
+        self.rows_written += len(frame)
+
+        # Simulated time only moves forward, so files of past days are complete
+        if 'day' in self.partition_by:
+            days = frame['day'].dropna()
+            if len(days):
+                current = days.min()
+                level = self.partition_by.index('day')
+                for key in [k for k in self._writers if k[level] is not None and k[level] < current]:
+                    self._close_partition(key)
+
+    def close(self) -> None:
+        """Write what is buffered and close all files."""
+        self.flush()
+        for key in list(self._writers):
+            self._close_partition(key)
+
+    def _partition_dir(self, key: Tuple) -> str:
+        parts = [f"{column}={NULL_PARTITION if value is None else quote(str(value), safe='')}"
+                 for column, value in zip(self.partition_by, key)]
+        return os.path.join(self.path, *parts)
+
+    def _new_file(self, key: Tuple) -> str:
+        directory = self._partition_dir(key)
+        os.makedirs(directory, exist_ok=True)
+        count = self._file_counts.get(key, 0)
+        self._file_counts[key] = count + 1
+        path = os.path.join(directory, f"{self.run_id}-{count}.{self.file_format}")
+        self._files[key] = path
+        return path
+
+    def _write(self, key: Tuple, rows: pd.DataFrame) -> None:
+        rows = rows.drop(columns=self.partition_by)
+        if self.file_format == 'csv':
+            path = self._files.get(key)
+            is_new = path is None
+            if is_new:
+                path = self._new_file(key)
+            rows.to_csv(path, mode='a', header=is_new, index=False)
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        writer = self._writers.get(key)
+        if writer is None:
+            writer = self._writers[key] = pq.ParquetWriter(self._new_file(key), self._schema)
+        writer.write_table(pa.Table.from_pandas(rows, schema=self._schema, preserve_index=False))
+
+    def _close_partition(self, key: Tuple) -> None:
+        writer = self._writers.pop(key, None)
+        if writer is not None:
+            writer.close()
+
+class SimulationExporter:
+    """Stream events, vitals and occupancy of a run into <root>/<table> datasets."""
+
+    def __init__(self,
+                 root: str,
+                 file_format: str = 'parquet',
+                 batch_rows: int = 65_536,
+                 partition_by: Sequence[str] = ('day', 'department')):
+        """
+        Args:
+            root: Output directory; one dataset per table below it
+            file_format: 'parquet' or 'csv'
+            batch_rows: Rows per table buffered before a write (about a row group)
+            partition_by: Partition columns of every table
+        """
+        self.root = root
+        self.file_format = file_format
+        run_id = datetime.now().strftime('%Y%m%d%H%M%S') + '-' + uuid.uuid4().hex[:6]
+        self.tables = {
+            name: PartitionedTableWriter(os.path.join(root, name), columns,
+                                         file_format=file_format, partition_by=partition_by,
+                                         batch_rows=batch_rows, run_id=run_id)
+            for name, columns in TABLE_COLUMNS.items()
+        }
+
+    def __enter__(self) -> 'SimulationExporter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def table_path(self, table: str) -> str:
+        """Dataset directory of a table (events, vitals or occupancy)."""
+        return self.tables[table].path
+
+    def record_event(self, time: datetime, event_type: str, department: Optional[str],
+                     patient_id, description: str = '', event_id: Optional[str] = None,
+                     **durations: float) -> None:
+        """Export one lifecycle event.
+
+        Args:
+            durations: length_of_stay (days), transfer_wait or response_time (minutes)
+        """
+        self.tables['events'].append({
+            'timestamp': time,
+            'day': time.date().isoformat(),
+            'department': department,
+            'type': event_type,
+            'patient_id': None if patient_id is None else str(patient_id),
+            'event_id': event_id,
+            'description': description,
+            **durations,
+        })
+
+    def record_vitals(self, time: datetime, department: Optional[str], patient_id,
+                      vitals: Optional[Dict]) -> None:
+        """Export one set of vital signs ('blood_pressure' as "systolic/diastolic")."""
+        if not vitals:
+            return
+        systolic = diastolic = None
+        pressure = vitals.get('blood_pressure')
+        if isinstance(pressure, str) and '/' in pressure:
+            systolic, diastolic = pressure.split('/', 1)
+        self.tables['vitals'].append({
+            'timestamp': time,
+            'day': time.date().isoformat(),
+            'department': department,
+            'patient_id': str(patient_id),
+            'heart_rate': vitals.get('heart_rate'),
+            'systolic_bp': systolic,
+            'diastolic_bp': diastolic,
+            'temperature': vitals.get('temperature'),
+            'oxygen_saturation': vitals.get('oxygen_saturation'),
+            'respiratory_rate': vitals.get('respiratory_rate'),
+        })
+
+    def record_occupancy(self, time: datetime, department_stats: List[Dict]) -> None:
+        """Export department statistics rows (name, current_occupancy, capacity, queue_length)."""
+        day = time.date().isoformat()
+        for dept in department_stats:
+            occupancy, capacity = dept['current_occupancy'], dept['capacity']
+            self.tables['occupancy'].append({
+                'timestamp': time,
+                'day': day,
+                'department': dept['name'],
+                'occupancy': occupancy,
+                'capacity': capacity,
+                'occupancy_rate': occupancy / capacity if capacity else None,
+                'queue_length': dept.get('queue_length'),
+            })
+
+    def flush(self) -> None:
+        """Write all buffered rows."""
+        for table in self.tables.values():
+            table.flush()
+
+    def close(self) -> None:
+        """Write all buffered rows and close the files."""
+        for table in self.tables.values():
+            table.close()
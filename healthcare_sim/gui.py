@@ -33,6 +33,7 @@ def reset_simulation():
             })
         
         st.session_state.events = []
+        st.session_state.pop('report_metrics', None)
         st.session_state.start_time = datetime.now()
         st.session_state.is_running = False
         st.session_state.simulation_speed = 1.0
@@ -106,6 +107,26 @@ def display_hospital_overview():
                     for p in patients:
                         st.markdown(f"• {p['patient_id']} ({p['status']})")
 
+def display_occupancy_trends():
+    """Display department occupancy history from the simulation's telemetry rollups."""
+    st.markdown("### Occupancy Trends")
+    
+    telemetry = st.session_state.simulation.telemetry.departments
+    if not telemetry.entities:
+        st.info("No occupancy history recorded yet")
+        return
+    
+    resolution = st.radio(
+        "Resolution",
+        ["minute", "hour", "day"],
+        index=0,
+        horizontal=True,
+        key="trend_resolution"
+    )
+    # Percent of capacity, one line per department
+    trends = telemetry.frame(telemetry.entities, "occupancy", resolution) * 100
+    st.line_chart(trends.dropna(how="all"))
+
 def display_patient_monitor():
     """Display active patients and their status with interactive controls."""
     st.subheader("👥 Patient Monitor")
@@ -275,6 +296,9 @@ def display_simulation_controls():
     
     # Reset button
     if st.sidebar.button("🔄 Reset Simulation"):
+        # Finish the export files before the simulation is replaced
+        if 'simulation' in st.session_state:
+            st.session_state.pop('simulation').close_export()
         reset_simulation()
     
     # Speed control
@@ -326,6 +350,7 @@ def main():
     with col1:
         # Hospital overview section
         display_hospital_overview()
+        display_occupancy_trends()
         st.divider()
         # Patient monitor section
         display_patient_monitor()
@@ -2,5 +2,6 @@
 
 from .ai_integration import AIModelManager
 from .agent_brain import AgentBrain
+from .decision_broker import DecisionBroker
 
-__all__ = ['AIModelManager', 'AgentBrain'] 
\ No newline at end of file
+__all__ = ['AIModelManager', 'AgentBrain', 'DecisionBroker'] 
\ No newline at end of file
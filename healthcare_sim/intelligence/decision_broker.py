@@ -0,0 +1,215 @@
+"""
+Micro-batching of agent decisions.
+
+DecisionBroker collects make_decision requests from many agents for a short
+window and resolves them together: backends exposing make_decisions_batch
+(or make_decisions_batch_async) receive the whole batch in one call, and
+text-only backends receive one packed prompt whose JSON answer is split back
+into per-request decisions. Requests are batched per brain, so each agent's
+situation is decided by its own brain, and each waiting agent gets its own
+decision.
+"""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from healthcare_sim.config import config
+
+class DecisionBroker:
+    """Gather decision requests within a window and resolve them in batches."""
+
+    def __init__(self,
+                 brain: Any = None,
+                 window: float = 0.02,
+                 max_batch_size: int = 16,
+                 max_concurrent_batches: Optional[int] = None):
+        """
+        Args:
+            brain: Default backend (with make_decisions_batch[_async],
+                generate_response or make_decision) for requests that name none
+            window: Seconds to wait for more requests after the first one
+            max_batch_size: Requests per batch; a full batch is sent at once
+            max_concurrent_batches: Batches in flight (defaults to
+                config.VLLM_MAX_CONCURRENT)
+        """
+        self.brain = brain
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.max_concurrent_batches = max_concurrent_batches or config.VLLM_MAX_CONCURRENT
+
+        # id(brain) -> (brain, queued requests); only requests of one brain share a batch
+        self._pending: Dict[int, Tuple[Any, List[Tuple[Dict, asyncio.Future]]]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Blocking brain calls run here, so at most max_concurrent_batches at a time
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent_batches,
+                                            thread_name_prefix="decision-broker")
+
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "batched_calls": 0,    # batches sent to make_decisions_batch
+            "packed_prompts": 0,   # batches sent as one generate_response prompt
+            "fallbacks": 0,        # batches resolved one request at a time
+            "short_batches": 0     # batches answered with fewer decisions than requests
+        }
+
+    def __enter__(self) -> 'DecisionBroker':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Wait for running brain calls and shut down the executor."""
+        self._executor.shutdown(wait=True)
+
+    async def make_decision_async(self, situation: Dict, brain: Any = None) -> Dict:
+        """Queue a situation for a brain (the broker's by default) and wait for its decision."""
+        brain = self.brain if brain is None else brain
+        if brain is None:
+            raise ValueError("DecisionBroker needs a brain for the request")
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Each asyncio.run() gets a fresh loop; rebind loop-bound state
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_batches)
+            self._timer = None
+            self._pending = {}
+
+        future = loop.create_future()
+        _, queue = self._pending.setdefault(id(brain), (brain, []))
+        queue.append((situation, future))
+        self.stats["requests"] += 1
+
+        if len(queue) >= self.max_batch_size:
+            self._dispatch(id(brain))
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._dispatch)
+        return await future
+
+    def _dispatch(self, key: Optional[int] = None) -> None:
+        """Send up to max_batch_size pending requests of one brain (or of every brain) as batches."""
+        if key is None:
+            self._timer = None
+        for brain_key in (list(self._pending) if key is None else [key]):
+            brain, queue = self._pending.pop(brain_key)
+            batch = queue[:self.max_batch_size]
+            if len(queue) > self.max_batch_size:
+                self._pending[brain_key] = (brain, queue[self.max_batch_size:])
+            task = self._loop.create_task(self._run_batch(brain, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        if self._pending and self._timer is None:
+            self._timer = self._loop.call_later(self.window, self._dispatch)
+        elif not self._pending and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def _run_batch(self, brain: Any, batch: List[Tuple[Dict, asyncio.Future]]) -> None:
+        """Resolve a batch with its brain and fan the decisions back to the waiting futures."""
+        situations = [situation for situation, _ in batch]
+        try:
+            async with self._semaphore:
+                decisions = await self._decide_batch(brain, situations)
+                if len(decisions) < len(batch):
+                    # Requests the backend left unanswered are decided one at a time
+                    self.stats["short_batches"] += 1
+                    decisions = decisions + await self._decide_each(brain, situations[len(decisions):])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.stats["batches"] += 1
+        for (_, future), decision in zip(batch, decisions):
+            if future.done():
+                continue
+            if isinstance(decision, BaseException):
+                future.set_exception(decision)
+            else:
+                future.set_result(decision)
+
+    async def _decide_batch(self, brain: Any, situations: List[Dict]) -> List[Dict]:
+        """Decide a batch with the most efficient method the backend supports."""
+        loop = asyncio.get_running_loop()
+
+        if hasattr(brain, 'make_decisions_batch_async'):
+            self.stats["batched_calls"] += 1
+            return list(await brain.make_decisions_batch_async(situations))
+        if hasattr(brain, 'make_decisions_batch'):
+            self.stats["batched_calls"] += 1
+            return list(await loop.run_in_executor(self._executor, brain.make_decisions_batch,
+                                                   situations))
+
+        if hasattr(brain, 'generate_response') and len(situations) > 1:
+            prompt = self.build_batch_prompt(situations)
+            response = await loop.run_in_executor(self._executor, brain.generate_response, prompt)
+            decisions = self.parse_batch_response(response, len(situations))
+            if decisions is not None:
+                self.stats["packed_prompts"] += 1
+                return decisions
+
+        self.stats["fallbacks"] += 1
+        return await self._decide_each(brain, situations)
+
+    async def _decide_each(self, brain: Any, situations: List[Dict]) -> List[Any]:
+        """Decide situations one by one on the broker's bounded executor.
+
+        A failed decision is returned as its exception so that only its own
+        request fails.
+        """
+        loop = asyncio.get_running_loop()
+        return list(await asyncio.gather(*[
+            loop.run_in_executor(self._executor, self._decide_one, brain, situation)
+            for situation in situations
+        ], return_exceptions=True))
+
+    def _decide_one(self, brain: Any, situation: Dict) -> Dict:
+        """Decide a single situation without batching."""
+        if hasattr(brain, 'make_decision'):
+            return brain.make_decision(situation)
+        response = brain.generate_response(self.build_batch_prompt([situation]))
+        decisions = self.parse_batch_response(response, 1)
+        if decisions is not None:
+            return decisions[0]
+        return {'action': response, 'reasoning': response}
+
+    @staticmethod
+    def build_batch_prompt(situations: List[Dict]) -> str:
+        """Pack several situations into one prompt asking for a JSON array of answers."""
+        parts = [
+            f"Decide on each of the following {len(situations)} healthcare situations.",
+            f"Respond with only a JSON array of {len(situations)} objects, in the same order,",
+            'each of the form {"action": "...", "reasoning": "..."}.',
+            ""
+        ]
+        for i, situation in enumerate(situations, 1):
+            parts.append(f"Situation {i}:")
+            parts.append(json.dumps(situation, default=str))
+            parts.append("")
+        return "\n".join(parts)
+
+    @staticmethod
+    def parse_batch_response(response: str, expected: int) -> Optional[List[Dict]]:
+        """Split a packed-prompt answer into decisions, or None if it is malformed."""
+        start = response.find('[')
+        end = response.rfind(']')
+        if start < 0 or end <= start:
+            return None
+        try:
+            answers = json.loads(response[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(answers, list) or len(answers) != expected:
+            return None
+        if not all(isinstance(a, dict) and 'action' in a for a in answers):
+            return None
+        return [{'action': str(a['action']), 'reasoning': str(a.get('reasoning', ''))}
+                for a in answers]
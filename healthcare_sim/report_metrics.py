@@ -0,0 +1,416 @@
+"""
+Single-pass aggregation of the figures behind HealthcareReportGenerator.
+
+ReportMetrics consumes simulation events once, either all at report time
+or incrementally as they happen, and keeps the counters every report
+section reads. Agent and facility state is summarized in one pass per
+report, so generating a report costs O(sections) on top of that instead of
+re-filtering the full event list for every section.
+
+Events may carry durations under the names in DURATION_METRICS
+(length_of_stay in days, the others in minutes); they are kept as
+streaming statistics per department, and response times also per agent.
+
+Event logs on disk (NDJSON, Parquet or CSV) are aggregated out of core with
+from_event_log: the log is read in chunks of rows, each chunk is folded in
+with vectorized group-bys, so memory stays bounded by the chunk size however
+long the run was.
+"""
+
+import os
+from collections import Counter
+from datetime import datetime
+from numbers import Real
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from streaming_stats import (ALL_DEPARTMENTS, DURATION_METRICS, DurationMetrics, DurationStats,
+                             RunningStats)
+
+# Event fields the aggregates read; other columns of a log are not loaded
+EVENT_COLUMNS = ('type', 'department', 'timestamp', 'time', 'agent_id') + DURATION_METRICS
+
+# Rough size of an NDJSON event, to turn a row count into a read block size
+NDJSON_ROW_BYTES = 200
+
+def iter_event_log(path: str, chunksize: int = 1_000_000) -> Iterator[pd.DataFrame]:
+    """Read an event log in chunks of rows.
+
+    Args:
+        path: NDJSON file (.ndjson/.jsonl, optionally .gz), Parquet or CSV
+            file, or directory of Parquet or CSV files (hive partitions
+            such as department=ICU/ become columns)
+        chunksize: Rows per chunk (approximate for NDJSON, which is read
+            in blocks of bytes)
+
+    Yields:
+        DataFrames with the EVENT_COLUMNS present in the log
+    """
+    if os.path.isdir(path) or path.endswith(('.parquet', '.csv')):
+        import pyarrow.dataset as ds
+        file_format = 'parquet'
+        if _dataset_format(path) == 'csv':
+            import pyarrow as pa
+            from pyarrow import csv as pa_csv
+            # Fixed types so files agree however their values look; empty fields are null
+            column_types = {c: pa.float64() if c in DURATION_METRICS else pa.string()
+                            for c in ('type', 'department', 'agent_id') + DURATION_METRICS}
+            file_format = ds.CsvFileFormat(convert_options=pa_csv.ConvertOptions(
+                column_types=column_types, strings_can_be_null=True))
+        dataset = ds.dataset(path, format=file_format, partitioning='hive')
+        columns = [c for c in EVENT_COLUMNS if c in dataset.schema.names]
+        for batch in dataset.to_batches(columns=columns, batch_size=chunksize):
+            if batch.num_rows:
+                yield batch.to_pandas()
+        return
+
+    try:
+        import pyarrow as pa
+        from pyarrow import json as pa_json
+        open_json = pa_json.open_json
+    except (ImportError, AttributeError):  # no pyarrow, or one without streaming JSON
+        open_json = None
+
+    rows_done = 0
+    if open_json is not None:
+        # Fixed column types so chunks agree however their first rows look;
+        # other fields are dropped while parsing
+        schema = pa.schema([(c, pa.float64() if c in DURATION_METRICS else pa.string())
+                            for c in EVENT_COLUMNS])
+        try:
+            reader = open_json(
+                pa.input_stream(path),  # decompresses .gz by extension
+                read_options=pa_json.ReadOptions(
+                    block_size=max(1 << 20, chunksize * NDJSON_ROW_BYTES)),
+                parse_options=pa_json.ParseOptions(explicit_schema=schema,
+                                                   unexpected_field_behavior='ignore'))
+            for batch in reader:
+                if batch.num_rows:
+                    frame = batch.to_pandas()
+                    rows_done += batch.num_rows
+                    # Columns missing from the log come back all null
+                    yield frame[[c for c in frame.columns if frame[c].notna().any()]]
+            return
+        except pa.ArrowInvalid:
+            # Values that do not fit the schema (e.g. numeric agent ids or
+            # epoch timestamps); the rest of the log is read with pandas
+            pass
+
+    with pd.read_json(path, lines=True, chunksize=chunksize, convert_dates=False) as reader:
+        for chunk in reader:
+            if rows_done:
+                skip = min(rows_done, len(chunk))
+                chunk = chunk.iloc[skip:]
+                rows_done -= skip
+            if len(chunk):
+                yield chunk[[c for c in EVENT_COLUMNS if c in chunk.columns]]
+
+def _dataset_format(path: str) -> str:
+    """'csv' for a CSV file or a directory holding CSV files, else 'parquet'."""
+    if not os.path.isdir(path):
+        return 'csv' if path.endswith('.csv') else 'parquet'
+    for _, _, files in os.walk(path):
+        for name in files:
+            if name.endswith('.csv'):
+                return 'csv'
+            if name.endswith('.parquet'):
+                return 'parquet'
+    return 'parquet'
+
+class ReportMetrics:
+    """Event counters and state aggregates for simulation reports."""
+
+    def __init__(self,
+                 fatigue_threshold: float = 70,
+                 occupancy_threshold: float = 0.9):
+        """
+        Args:
+            fatigue_threshold: Fatigue above which staff count as highly fatigued
+            occupancy_threshold: Occupancy share above which a location is flagged
+        """
+        self.fatigue_threshold = fatigue_threshold
+        self.occupancy_threshold = occupancy_threshold
+
+        # Event aggregates
+        self.total_events = 0
+        self.events_by_type: Counter = Counter()
+        self.events_by_department: Counter = Counter()
+        self.first_event_time: Optional[datetime] = None
+        self.last_event_time: Optional[datetime] = None
+        self.durations = DurationMetrics()
+        self.response_by_agent: Dict[str, RunningStats] = {}
+        self._consumed = 0  # events already taken from the list passed to sync()
+        self._source: Optional[Sequence[Dict]] = None  # that list
+
+        # State aggregates, refreshed by snapshot()
+        self.agent_count = 0
+        self.staff_count = 0  # agents that care for patients
+        self.total_patients = 0
+        self.patients_by_specialization: Dict[str, int] = {}
+        self.min_workload: Optional[int] = None
+        self.max_workload: Optional[int] = None
+        self.high_fatigue_staff: List[str] = []
+        self.location_count = 0
+        self.high_occupancy_locations: List[str] = []
+        self.simulation_durations: Optional[DurationMetrics] = None
+        self.simulation_response_by_provider: Dict[str, RunningStats] = {}
+
+    @classmethod
+    def from_events(cls, events: Iterable[Dict], **kwargs) -> 'ReportMetrics':
+        """Aggregate an event sequence in one pass."""
+        metrics = cls(**kwargs)
+        metrics.add_events(events)
+        return metrics
+
+    @classmethod
+    def from_event_log(cls, path: str, chunksize: int = 1_000_000, **kwargs) -> 'ReportMetrics':
+        """Aggregate an on-disk event log chunk by chunk (see iter_event_log)."""
+        metrics = cls(**kwargs)
+        for frame in iter_event_log(path, chunksize):
+            metrics.add_frame(frame)
+        return metrics
+
+    @property
+    def emergency_count(self) -> int:
+        return self.events_by_type.get('emergency', 0)
+
+    @property
+    def staff_patient_ratio(self) -> Optional[float]:
+        """Patients per staff member, None without staff."""
+        if self.staff_count == 0:
+            return None
+        return self.total_patients / self.staff_count
+
+    @property
+    def workload_imbalanced(self) -> bool:
+        """True if the busiest staff member has over twice the patients of the least busy."""
+        return self.max_workload is not None and self.max_workload > 2 * self.min_workload
+
+    def add_event(self, event: Dict) -> None:
+        """Fold one event into the aggregates."""
+        self.total_events += 1
+        self.events_by_type[event.get('type')] += 1
+        department = event.get('department')
+        if department is not None:
+            self.events_by_department[department] += 1
+
+        # Both fields count, as both columns do in add_frame
+        for field in ('timestamp', 'time'):
+            timestamp = self._event_time(event.get(field))
+            if timestamp is None:
+                continue
+            if self.first_event_time is None or timestamp < self.first_event_time:
+                self.first_event_time = timestamp
+            if self.last_event_time is None or timestamp > self.last_event_time:
+                self.last_event_time = timestamp
+
+        for metric in DURATION_METRICS:
+            value = event.get(metric)
+            if isinstance(value, Real):
+                self.durations.record(metric, department, float(value))
+        response_time = event.get('response_time')
+        agent_id = event.get('agent_id')
+        if agent_id is not None and isinstance(response_time, Real):
+            self.response_by_agent.setdefault(agent_id, RunningStats()).add(float(response_time))
+
+    def add_events(self, events: Iterable[Dict]) -> None:
+        for event in events:
+            self.add_event(event)
+
+    def add_frame(self, frame: pd.DataFrame) -> None:
+        """Fold a DataFrame of events (one row each) into the aggregates.
+
+        Gives the same result as add_event on every row, computed with
+        column-wise counts and group-bys.
+        """
+        if frame.empty:
+            return
+        self.total_events += len(frame)
+        if 'type' in frame:
+            self._count(self.events_by_type, frame['type'], dropna=False)
+        else:
+            self.events_by_type[None] += len(frame)
+        department = frame['department'] if 'department' in frame else None
+        if department is not None:
+            self._count(self.events_by_department, department, dropna=True)
+
+        for first, last in self._frame_time_bounds(frame):
+            if self.first_event_time is None or first < self.first_event_time:
+                self.first_event_time = first
+            if self.last_event_time is None or last > self.last_event_time:
+                self.last_event_time = last
+
+        for metric in DURATION_METRICS:
+            if metric not in frame:
+                continue
+            values = pd.to_numeric(frame[metric], errors='coerce')
+            present = values.notna()
+            if not present.any():
+                continue
+            if department is None:
+                self.durations.record_many(metric, None, values[present].to_numpy())
+                continue
+            # Rows without a department only count towards the total
+            groups = pd.DataFrame({'department': department[present], 'value': values[present]})
+            for name, group in groups.groupby('department', dropna=False, sort=False, observed=True):
+                self.durations.record_many(metric, None if pd.isna(name) else name,
+                                           group['value'].to_numpy())
+
+        if 'response_time' in frame and 'agent_id' in frame:
+            responses = pd.DataFrame({
+                'agent_id': frame['agent_id'],
+                'value': pd.to_numeric(frame['response_time'], errors='coerce')
+            }).dropna()
+            for agent_id, group in responses.groupby('agent_id', sort=False, observed=True):
+                self.response_by_agent.setdefault(agent_id, RunningStats()).add_many(
+                    group['value'].to_numpy())
+
+    def sync(self, events: Sequence[Dict]) -> int:
+        """Consume the events appended to a growing list since the last call.
+
+        If a different list is passed, or the list shrank (e.g. on a
+        simulation reset), the event aggregates are rebuilt from it.
+
+        Returns:
+            Number of events consumed
+        """
+        if events is not self._source or len(events) < self._consumed:
+            self._reset_events()
+            self._source = events
+        new_events = events[self._consumed:]
+        self.add_events(new_events)
+        self._consumed = len(events)
+        return len(new_events)
+
+    def snapshot(self, simulation) -> None:
+        """Summarize current agent and facility state in one pass each."""
+        self.agent_count = len(simulation.agents)
+        self.staff_count = 0
+        self.total_patients = 0
+        self.patients_by_specialization = {}
+        self.min_workload = None
+        self.max_workload = None
+        self.high_fatigue_staff = []
+        for agent in simulation.agents.values():
+            if getattr(agent, 'fatigue', 0) > self.fatigue_threshold:
+                self.high_fatigue_staff.append(agent.name)
+            if not hasattr(agent, 'patients'):
+                continue
+            load = len(agent.patients)
+            self.staff_count += 1
+            self.total_patients += load
+            specialization = agent.specialization
+            self.patients_by_specialization[specialization] = (
+                self.patients_by_specialization.get(specialization, 0) + load)
+            self.min_workload = load if self.min_workload is None else min(self.min_workload, load)
+            self.max_workload = load if self.max_workload is None else max(self.max_workload, load)
+
+        # Durations the simulation measured itself (e.g. length of stay)
+        self.simulation_durations = getattr(simulation, 'durations', None)
+        self.simulation_response_by_provider = getattr(simulation, 'response_by_provider', {})
+
+        locations = simulation.environment.locations
+        self.location_count = len(locations)
+        self.high_occupancy_locations = [
+            location.type.value for location in locations.values()
+            if location.current_occupancy / location.capacity > self.occupancy_threshold
+        ]
+
+    def duration_summary(self, metric: str,
+                         department: str = ALL_DEPARTMENTS) -> Optional[Dict[str, float]]:
+        """count, mean, std, min, max, p50, p90 and p99 of a duration metric.
+
+        Combines durations from events with those recorded by the simulation
+        at the last snapshot. None if nothing was recorded.
+        """
+        sources = [self.durations.get(metric, department)]
+        if self.simulation_durations is not None:
+            sources.append(self.simulation_durations.get(metric, department))
+        sources = [series for series in sources if series is not None]
+        if not sources:
+            return None
+        if len(sources) == 1:
+            return sources[0].summary()
+        combined = DurationStats(self.durations.k)
+        for series in sources:
+            combined.merge(series)
+        return combined.summary()
+
+    def agent_response(self, agent_id, name: Optional[str] = None) -> Optional[RunningStats]:
+        """Response times of an agent, from events (by id) and the simulation (by name).
+
+        None if neither has any.
+        """
+        sources = [self.response_by_agent.get(agent_id),
+                   self.simulation_response_by_provider.get(name)]
+        sources = [stats for stats in sources if stats is not None and stats.count]
+        if not sources:
+            return None
+        if len(sources) == 1:
+            return sources[0]
+        combined = RunningStats()
+        for stats in sources:
+            combined.merge(stats)
+        return combined
+
+    def duration_departments(self, metric: str) -> List[str]:
+        """Departments with recorded values of a duration metric."""
+        departments = set(self.durations.departments(metric))
+        if self.simulation_durations is not None:
+            departments.update(self.simulation_durations.departments(metric))
+        return sorted(departments)
+
+    @staticmethod
+    def _count(counter: Counter, column: pd.Series, dropna: bool) -> None:
+        for key, count in column.value_counts(dropna=dropna, sort=False).items():
+            if count:  # categorical columns also list unused categories
+                counter[None if pd.isna(key) else key] += int(count)
+
+    @staticmethod
+    def _event_time(value) -> Optional[datetime]:
+        """An event time as a datetime, parsed like _frame_time_bounds (None if invalid)."""
+        if value is None or isinstance(value, bool):
+            return None
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, Real):
+            parsed = pd.to_datetime(value, unit='s', errors='coerce')  # epoch seconds
+        elif isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                parsed = pd.to_datetime(value, errors='coerce')
+        else:
+            return None
+        return None if pd.isna(parsed) else parsed.to_pydatetime()
+
+    @staticmethod
+    def _frame_time_bounds(frame: pd.DataFrame) -> List[Tuple[datetime, datetime]]:
+        """(earliest, latest) event time in the timestamp and time columns of a chunk.
+
+        Numeric columns are read as seconds since the epoch.
+        """
+        bounds = []
+        for column in ('timestamp', 'time'):
+            if column not in frame:
+                continue
+            values = frame[column].dropna()
+            if pd.api.types.is_numeric_dtype(values):
+                # Epoch seconds
+                values = pd.to_datetime(values, unit='s', errors='coerce').dropna()
+            elif not pd.api.types.is_datetime64_any_dtype(values):
+                values = pd.to_datetime(values, errors='coerce', cache=False).dropna()
+            if len(values):
+                bounds.append((values.min().to_pydatetime(), values.max().to_pydatetime()))
+        return bounds
+
+    def _reset_events(self) -> None:
+        self.total_events = 0
+        self.events_by_type.clear()
+        self.events_by_department.clear()
+        self.first_event_time = None
+        self.last_event_time = None
+        self.durations = DurationMetrics()
+        self.response_by_agent = {}
+        self._consumed = 0
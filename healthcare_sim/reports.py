@@ -5,20 +5,48 @@ from datetime import datetime, timedelta
 import streamlit as st
 import json
 from typing import Dict, List, Optional
-import numpy as np
 from io import BytesIO
+from report_metrics import ReportMetrics
 
 class HealthcareReportGenerator:
     """Generates standardized healthcare simulation reports following best practices."""
     
-    def __init__(self, simulation_manager, events: List[Dict], start_time: datetime):
+    def __init__(self, simulation_manager, events: Optional[List[Dict]], start_time: datetime,
+                 metrics: Optional[ReportMetrics] = None):
+        """
+        Args:
+            simulation_manager: Simulation to report on
+            events: Events recorded during the run, or None if metrics
+                already holds them (e.g. aggregated from an event log)
+            start_time: When the run started
+            metrics: Aggregator kept up to date across reports; only events
+                it has not seen yet are consumed
+        """
         self.simulation = simulation_manager
         self.events = events
         self.start_time = start_time
         self.end_time = datetime.now()
+        self.metrics = metrics or ReportMetrics()
+        if events is not None:
+            self.metrics.sync(events)
+    
+    @classmethod
+    def from_event_log(cls, simulation_manager, path: str, start_time: datetime,
+                       chunksize: int = 1_000_000) -> 'HealthcareReportGenerator':
+        """Report on events read from an NDJSON or Parquet log in chunks.
+        
+        Only the aggregates are kept in memory, so the log can be far larger
+        than RAM.
+        """
+        metrics = ReportMetrics.from_event_log(path, chunksize=chunksize)
+        report = cls(simulation_manager, None, start_time, metrics=metrics)
+        if metrics.last_event_time is not None:
+            report.end_time = metrics.last_event_time
+        return report
     
     def generate_markdown_report(self) -> str:
         """Generate a complete report in markdown format."""
+        self.metrics.snapshot(self.simulation)
         report = []
         
         # Title
@@ -71,15 +99,11 @@ class HealthcareReportGenerator:
     
     def _generate_executive_summary(self) -> str:
         """Generate an executive summary of the simulation results."""
-        total_events = len(self.events)
-        total_patients = sum(len(agent.patients) for agent in self.simulation.agents.values() 
-                           if hasattr(agent, 'patients'))
-        emergency_count = len([e for e in self.events if e.get('type') == 'emergency'])
-        
+        metrics = self.metrics
         return f"""This report summarizes the healthcare simulation conducted from {self.start_time.strftime('%Y-%m-%d %H:%M')} 
-to {self.end_time.strftime('%Y-%m-%d %H:%M')}. The simulation involved {len(self.simulation.agents)} healthcare 
-professionals managing {total_patients} patients, with {total_events} total events recorded including 
-{emergency_count} emergency cases. Key findings and recommendations are detailed in the following sections."""
+to {self.end_time.strftime('%Y-%m-%d %H:%M')}. The simulation involved {metrics.agent_count} healthcare 
+professionals managing {metrics.total_patients} patients, with {metrics.total_events} total events recorded including 
+{metrics.emergency_count} emergency cases. Key findings and recommendations are detailed in the following sections."""
     
     def _get_simulation_parameters(self) -> Dict:
         """Get simulation parameters in a structured format."""
@@ -87,8 +111,8 @@ professionals managing {total_patients} patients, with {total_events} total even
             "Duration": f"{(self.end_time - self.start_time).total_seconds() / 60:.1f} minutes",
             "Emergency Frequency": self.simulation.emergency_frequency,
             "Data Source": "MIMIC-IV Database" if self.simulation.patient_data else "Synthetic Data",
-            "Number of Healthcare Professionals": len(self.simulation.agents),
-            "Facility Locations": len(self.simulation.environment.locations)
+            "Number of Healthcare Professionals": self.metrics.agent_count,
+            "Facility Locations": self.metrics.location_count
         }
     
     def _get_staff_metrics(self) -> List[str]:
@@ -100,7 +124,7 @@ professionals managing {total_patients} patients, with {total_events} total even
             
             metrics.append(f"### {agent.name} - {agent.specialization}\n")
             metrics.append(f"- **Patient Load:** {len(agent.patients)}")
-            metrics.append(f"- **Average Response Time:** {self._calculate_response_time(agent)}")
+            metrics.append(f"- **Average Time to First Patient Event:** {self._calculate_response_time(agent)}")
             metrics.append(f"- **Fatigue Level:** {agent.fatigue}%")
             metrics.append(f"- **Patient Outcomes:** {self._calculate_patient_outcomes(agent)}\n")
             
@@ -114,28 +138,45 @@ professionals managing {total_patients} patients, with {total_events} total even
     
     def _get_patient_statistics(self) -> List[str]:
         """Get patient statistics in markdown format."""
-        total_patients = sum(len(agent.patients) for agent in self.simulation.agents.values() 
-                           if hasattr(agent, 'patients'))
-        
         stats = [
-            f"- **Total Patients:** {total_patients}",
+            f"- **Total Patients:** {self.metrics.total_patients}",
             f"- **Average Length of Stay:** {self._calculate_avg_los()}",
             f"- **Patient Distribution by Department:** {self._get_patient_distribution()}",
-            f"- **Critical Cases:** {len([e for e in self.events if e.get('type') == 'emergency'])}"
+            f"- **Critical Cases:** {self.metrics.emergency_count}"
         ]
+        
+        # Percentiles per department from the streaming sketches
+        for metric, label, unit in (("length_of_stay", "Length of Stay", "days"),
+                                    ("transfer_wait", "Transfer Wait", "minutes"),
+                                    ("boarding_time", "ER Boarding Time", "minutes")):
+            departments = self.metrics.duration_departments(metric)
+            if not departments:
+                continue
+            stats.append(f"\n#### {label} by Department ({unit})\n")
+            stats.append("| Department | Count | Mean | p50 | p90 | p99 |")
+            stats.append("|---|---|---|---|---|---|")
+            for department in departments:
+                summary = self.metrics.duration_summary(metric, department)
+                stats.append(f"| {department} | {summary['count']} | {summary['mean']:.1f} | "
+                             f"{summary['p50']:.1f} | {summary['p90']:.1f} | {summary['p99']:.1f} |")
         return stats
     
     def _get_emergency_analysis(self) -> List[str]:
         """Get emergency analysis in markdown format."""
-        emergency_events = [e for e in self.events if e.get('type') == 'emergency']
+        emergency_count = self.metrics.emergency_count
         analysis = []
         
-        if emergency_events:
-            response_times = [5] * len(emergency_events)  # placeholder
+        if emergency_count:
+            analysis.append(f"- **Total Emergencies:** {emergency_count}")
+        # Minutes from admission to the patient's first simulated event; the
+        # simulation does not model a separate assessment step
+        response = self.metrics.duration_summary("response_time")
+        if response:
             analysis.extend([
-                f"- **Total Emergencies:** {len(emergency_events)}",
-                f"- **Average Response Time:** {np.mean(response_times):.1f} minutes",
-                f"- **Response Time Range:** {min(response_times):.1f} - {max(response_times):.1f} minutes"
+                f"- **Average Time to First Patient Event:** {response['mean']:.1f} minutes",
+                f"- **Time to First Patient Event Range:** {response['min']:.1f} - {response['max']:.1f} minutes",
+                f"- **Time to First Patient Event Percentiles:** p50 {response['p50']:.1f}, "
+                f"p90 {response['p90']:.1f}, p99 {response['p99']:.1f} minutes"
             ])
         return analysis
     
@@ -161,7 +202,11 @@ professionals managing {total_patients} patients, with {total_events} total even
     
     def _calculate_response_time(self, agent) -> str:
         """Calculate average response time for an agent."""
-        return "5.0 minutes"  # placeholder
+        stats = self.metrics.agent_response(getattr(agent, 'agent_id', None),
+                                            getattr(agent, 'name', None))
+        if stats is None:
+            return "N/A"
+        return f"{stats.mean:.1f} minutes"
     
     def _calculate_patient_outcomes(self, agent) -> str:
         """Calculate patient outcomes for an agent."""
@@ -169,30 +214,30 @@ professionals managing {total_patients} patients, with {total_events} total even
     
     def _calculate_avg_los(self) -> str:
         """Calculate average length of stay."""
-        return "3.2 days"  # placeholder
+        return self._format_duration(self.metrics.duration_summary("length_of_stay"), "days")
     
     def _get_patient_distribution(self) -> str:
         """Get patient distribution across departments."""
-        distribution = {}
-        for agent in self.simulation.agents.values():
-            if hasattr(agent, 'patients'):
-                distribution[agent.specialization] = len(agent.patients)
-        
+        distribution = self.metrics.patients_by_specialization
         return ", ".join(f"{k}: {v}" for k, v in distribution.items())
     
     def _calculate_staff_patient_ratio(self) -> str:
         """Calculate staff-to-patient ratio."""
-        total_staff = len([a for a in self.simulation.agents.values() if hasattr(a, 'patients')])
-        total_patients = sum(len(agent.patients) for agent in self.simulation.agents.values() 
-                           if hasattr(agent, 'patients'))
-        
-        if total_staff == 0:
+        ratio = self.metrics.staff_patient_ratio
+        if ratio is None:
             return "N/A"
-        return f"1:{total_patients/total_staff:.1f}"
+        return f"1:{ratio:.1f}"
     
     def _calculate_avg_wait_time(self) -> str:
         """Calculate average wait time."""
-        return "12.5 minutes"  # placeholder
+        return self._format_duration(self.metrics.duration_summary("transfer_wait"), "minutes")
+    
+    def _format_duration(self, summary: Optional[Dict], unit: str) -> str:
+        """Mean and percentiles of a duration summary."""
+        if not summary:
+            return "N/A"
+        return (f"{summary['mean']:.1f} {unit} (p50 {summary['p50']:.1f}, "
+                f"p90 {summary['p90']:.1f}, p99 {summary['p99']:.1f})")
     
     def _calculate_satisfaction_score(self) -> str:
         """Calculate patient satisfaction score."""
@@ -203,27 +248,22 @@ professionals managing {total_patients} patients, with {total_events} total even
         recommendations = []
         
         # Check staff fatigue
-        high_fatigue_staff = [a for a in self.simulation.agents.values() 
-                            if hasattr(a, 'fatigue') and a.fatigue > 70]
-        if high_fatigue_staff:
+        if self.metrics.high_fatigue_staff:
             recommendations.append(
                 "Consider implementing additional rest periods for staff members showing high fatigue levels."
             )
         
         # Check workload distribution
-        workloads = [len(a.patients) for a in self.simulation.agents.values() if hasattr(a, 'patients')]
-        if workloads:
-            if max(workloads) > 2 * min(workloads):
-                recommendations.append(
-                    "Significant workload imbalance detected. Consider redistributing patients among available staff."
-                )
+        if self.metrics.workload_imbalanced:
+            recommendations.append(
+                "Significant workload imbalance detected. Consider redistributing patients among available staff."
+            )
         
         # Check resource utilization
-        for location in self.simulation.environment.locations.values():
-            if location.current_occupancy / location.capacity > 0.9:
-                recommendations.append(
-                    f"High occupancy in {location.type.value}. Consider expanding capacity or optimizing patient flow."
-                )
+        for location_type in self.metrics.high_occupancy_locations:
+            recommendations.append(
+                f"High occupancy in {location_type}. Consider expanding capacity or optimizing patient flow."
+            )
         
         return recommendations
 
@@ -232,10 +272,14 @@ def add_report_section(st_container):
     st_container.subheader("📊 Simulation Reports")
     
     if st.button("Generate Report"):
+        # Reuse the aggregator across reports so only new events are consumed
+        if 'report_metrics' not in st.session_state:
+            st.session_state.report_metrics = ReportMetrics()
         report_gen = HealthcareReportGenerator(
             st.session_state.simulation,
             st.session_state.events,
-            st.session_state.start_time
+            st.session_state.start_time,
+            metrics=st.session_state.report_metrics
         )
         
         # Generate markdown report
@@ -256,13 +300,11 @@ def add_report_section(st_container):
         st.subheader("Key Metrics Preview")
         col1, col2 = st.columns(2)
         
+        metrics = report_gen.metrics
         with col1:
-            st.metric("Total Events", len(st.session_state.events))
-            st.metric("Active Staff", len(st.session_state.simulation.agents))
+            st.metric("Total Events", metrics.total_events)
+            st.metric("Active Staff", metrics.agent_count)
         
         with col2:
-            emergency_count = len([e for e in st.session_state.events if e.get('type') == 'emergency'])
-            st.metric("Emergency Cases", emergency_count)
-            total_patients = sum(len(agent.patients) for agent in st.session_state.simulation.agents.values() 
-                               if hasattr(agent, 'patients'))
-            st.metric("Total Patients", total_patients)
\ No newline at end of file
+            st.metric("Emergency Cases", metrics.emergency_count)
+            st.metric("Total Patients", metrics.total_patients)
\ No newline at end of file
@@ -181,8 +181,11 @@ def main():
         
         with col3:
             if st.button("🔄 Reset"):
+                # Finish the export files before the simulation is replaced
+                st.session_state.simulation.close_export()
                 st.session_state.simulation = SimulationManager()
                 st.session_state.events = []
+                st.session_state.pop('report_metrics', None)
                 st.session_state.start_time = datetime.now()
                 st.session_state.is_running = False
                 st.session_state.is_paused = False
@@ -202,6 +205,15 @@ def main():
                 st.metric("Patients", f"{dept['current_occupancy']}/{dept['capacity']}")
                 st.progress(clamp(occupancy_rate))
         
+        # Occupancy history from the fixed-size telemetry rollups
+        telemetry = st.session_state.simulation.telemetry.departments
+        if telemetry.entities:
+            st.subheader("Occupancy Trends")
+            resolution = st.radio("Resolution", ["minute", "hour", "day"], index=0, horizontal=True,
+                                  key="trend_resolution")
+            trends = telemetry.frame(telemetry.entities, "occupancy", resolution) * 100
+            st.line_chart(trends.dropna(how="all"))
+        
         # Patient list
         st.subheader("Active Patients")
         show_all = st.button("👥 Toggle All Patient Data")
@@ -1,12 +1,31 @@
 from typing import Dict, List, Optional, Any
+from collections import Counter
 from datetime import datetime, timedelta
+import heapq
+import itertools
+import os
 import random
+import numpy as np
+from config import config
 from lifecycle.lifecycle_manager import LifecycleManager, LifecycleStage
 from data.db_engine import HealthcareDBEngine
+from data.trace_replay import AdmissionTraceReplayer, TraceEvent
+from data.calibration import CalibrationArtifact, department_for_location, load_or_fit_calibration
+from data.patient_loader import MIMICDataLoader
+from environment.hospital_environment import HospitalEnvironment
+from telemetry import HospitalTelemetry
+from streaming_stats import DurationMetrics, RunningStats
+from export import SimulationExporter
 
 class SimulationManager:
-    def __init__(self):
-        """Initialize simulation manager with database engine"""
+    def __init__(self, mimic_path: Optional[str] = None):
+        """Initialize simulation manager with database engine
+        
+        Args:
+            mimic_path: MIMIC-IV directory to calibrate from (defaults to
+                config.MIMIC_DATABASE_PATH); without one the saved
+                calibration artifact is used as is
+        """
         self.current_time = datetime.now()
         self.db = HealthcareDBEngine()  # Use in-memory SQLite database
         self.lifecycle_manager = LifecycleManager()
@@ -14,6 +33,104 @@ class SimulationManager:
         # Initialize simulation state
         self.last_update = self.current_time
         self.update_interval = timedelta(seconds=1)
+        
+        # Occupancy history per department in fixed-size rollups for trend charts;
+        # locations are sampled too when a HospitalEnvironment is attached
+        self.telemetry = HospitalTelemetry()
+        self.environment: Optional[HospitalEnvironment] = None
+        
+        # Streaming length of stay (days), response time and transfer wait /
+        # boarding (minutes) per department; only in-flight patients are
+        # tracked individually. Response time runs from admission to the
+        # patient's first generated event; patient events are drawn at random
+        # each interval, so it is a simulated delay, not a measured assessment.
+        self.durations = DurationMetrics()
+        self.response_by_provider: Dict[str, RunningStats] = {}
+        self._admitted_at: Dict[Any, tuple] = {}  # patient_id -> (admission time, department name)
+        self._responded: set = set()  # admitted patients already seen by a provider
+        self._transfer_requested_at: Dict[Any, tuple] = {}  # patient_id -> (request time, target department)
+        
+        # Fitted parameters (arrival rates, routing, LOS), refit when the MIMIC data changed
+        self.rng = np.random.default_rng()
+        self.calibration = self._load_calibration(mimic_path or config.MIMIC_DATABASE_PATH)
+        self._scheduled_discharges: List = []  # heap of (discharge_time, patient_id)
+        self._admission_ids = itertools.count(1)  # ids of generated arrivals (NEW_0001, ...)
+        
+        # Trace-driven mode (replaces random arrivals when enabled)
+        self.trace_replayer: Optional[AdmissionTraceReplayer] = None
+        self._trace_events = None
+        self._next_trace_event: Optional[TraceEvent] = None
+        self._blocked_trace_admissions: set = set()  # hadm_ids turned away; their discharges are skipped
+        
+        # Streaming export of events, vitals and occupancy (see enable_export)
+        self.exporter: Optional[SimulationExporter] = None
+    
+    def _load_calibration(self, mimic_path: Optional[str]) -> Optional[CalibrationArtifact]:
+        """Load the calibration artifact, refitting it from MIMIC admissions if they are available"""
+        if not config.CALIBRATION_PATH:
+            return None
+        if mimic_path and os.path.isdir(mimic_path):
+            try:
+                loader = MIMICDataLoader(mimic_path)
+                return load_or_fit_calibration(config.CALIBRATION_PATH, loader.admissions_df)
+            except (RuntimeError, OSError) as e:
+                print(f"Error calibrating from MIMIC data: {str(e)}, using the saved calibration")
+        if os.path.exists(config.CALIBRATION_PATH):
+            return CalibrationArtifact.load(config.CALIBRATION_PATH)
+        return None
+    
+    def enable_export(self,
+                      path: str,
+                      file_format: str = "parquet",
+                      batch_rows: int = 65_536) -> SimulationExporter:
+        """Stream lifecycle events, vitals and occupancy samples to disk during the run.
+        
+        Args:
+            path: Output directory, with events/, vitals/ and occupancy/ datasets
+                partitioned by day and department
+            file_format: 'parquet' or 'csv'
+            batch_rows: Rows buffered per table before a write
+            
+        Returns:
+            The exporter; call close_export() when the run ends
+        """
+        self.close_export()
+        self.exporter = SimulationExporter(path, file_format=file_format, batch_rows=batch_rows)
+        return self.exporter
+    
+    def close_export(self) -> None:
+        """Write any buffered rows and stop exporting"""
+        if self.exporter is not None:
+            self.exporter.close()
+            self.exporter = None
+    
+    def enable_trace_replay(self,
+                            loader,
+                            time_compression: float = 60.0,
+                            trace_start: Optional[datetime] = None,
+                            trace_end: Optional[datetime] = None) -> int:
+        """Drive admissions from a loader's recorded admissions instead of random arrivals.
+        
+        Args:
+            loader: PatientDataLoader or MIMICDataLoader with an admissions table
+            time_compression: Recorded time units replayed per simulated time unit
+            trace_start: Optional start of the replayed window (e.g. a peak day)
+            trace_end: Optional end of the replayed window
+            
+        Returns:
+            Number of admissions scheduled for replay
+        """
+        self.trace_replayer = AdmissionTraceReplayer(
+            loader,
+            time_compression=time_compression,
+            sim_start=self.current_time,
+            trace_start=trace_start,
+            trace_end=trace_end
+        )
+        self._trace_events = self.trace_replayer.iter_events()
+        self._next_trace_event = next(self._trace_events, None)
+        self._blocked_trace_admissions = set()
+        return len(self.trace_replayer)
     
     def update(self, time_delta: timedelta) -> None:
         """Update simulation state"""
@@ -21,10 +138,28 @@ class SimulationManager:
             # Update current time
             self.current_time += time_delta
             
+            # Replay any recorded admissions/discharges that are now due
+            if self.trace_replayer is not None:
+                self._replay_trace_events()
+            
+            # Discharge patients whose sampled length of stay has elapsed
+            self._process_scheduled_discharges()
+            
             # Check if we should generate new events
             if self.current_time - self.last_update >= self.update_interval:
                 self._generate_events()
                 self.last_update = self.current_time
+                department_stats = self.get_department_stats()
+                # Patients waiting for a bed are the department's queue
+                waiting = Counter(target for _, target in self._transfer_requested_at.values())
+                for dept in department_stats:
+                    dept["queue_length"] = waiting.get(dept["name"], 0)
+                self.telemetry.record_departments(self.current_time, department_stats)
+                if self.environment is not None:
+                    self.telemetry.record_environment(self.environment, self.current_time,
+                                                      departments=False)
+                if self.exporter is not None:
+                    self.exporter.record_occupancy(self.current_time, department_stats)
             
             # Update lifecycle events
             self.lifecycle_manager.update(self.current_time)
@@ -34,8 +169,8 @@ class SimulationManager:
     
     def _generate_events(self):
         """Generate random events in the simulation"""
-        # Chance for new admission
-        if random.random() < 0.1:  # 10% chance
+        # Chance for new admission (arrivals come from the trace when replaying)
+        if self.trace_replayer is None and random.random() < self._arrival_probability():
             self._generate_new_admission()
         
         # Update existing patients
@@ -45,6 +180,129 @@ class SimulationManager:
             if random.random() < 0.2:
                 self._generate_patient_event(patient)
     
+    def _replay_trace_events(self):
+        """Apply all trace events scheduled at or before the current time"""
+        while self._next_trace_event is not None and self._next_trace_event.sim_time <= self.current_time:
+            event = self._next_trace_event
+            if event.event_type == 'admission':
+                self._apply_trace_admission(event)
+            else:
+                self._apply_trace_discharge(event)
+            self._next_trace_event = next(self._trace_events, None)
+    
+    def _apply_trace_admission(self, event: TraceEvent):
+        """Admit a patient from a recorded admission"""
+        dept_key = department_for_location(event.location)
+        dept_name = self.db.departments[dept_key]["name"]
+        departments = self.db.get_department_stats()
+        dept = next((d for d in departments if d["name"] == dept_name), None)
+        
+        if dept and dept["current_occupancy"] >= dept["capacity"]:
+            event_type = "admission_blocked"
+            description = f"Admission blocked - {dept_name} at capacity"
+            self._blocked_trace_admissions.add(event.hadm_id)
+        else:
+            status = "Under Observation" if event.admission_type == "EMERGENCY" else "Stable"
+            self.db.admit_patient(event.subject_id, dept_key, status)
+            self._admitted_at[event.subject_id] = (self.current_time, dept_name)
+            event_type = "admission"
+            description = f"Trace admission {event.hadm_id} ({event.admission_type})"
+        
+        event_id = self.lifecycle_manager.create_lifecycle_event(
+            patient_id=event.subject_id,
+            stage=LifecycleStage.BIRTH,
+            description=description,
+            location=dept_name,
+            providers=self._get_random_providers(),
+            biometric_data=None
+        )
+        self._export_event(event_type, dept_name, event.subject_id, description, event_id)
+    
+    def _apply_trace_discharge(self, event: TraceEvent):
+        """Discharge a patient at the recorded discharge time"""
+        if event.hadm_id in self._blocked_trace_admissions:
+            # The admission was turned away, so there is no stay to end
+            self._blocked_trace_admissions.discard(event.hadm_id)
+            return
+        dept_name = self.db.departments[department_for_location(event.location)]["name"]
+        description = f"Trace discharge {event.hadm_id}"
+        self.db.update_patient_status(event.subject_id, "Discharged")
+        event_id = self.lifecycle_manager.create_lifecycle_event(
+            patient_id=event.subject_id,
+            stage=LifecycleStage.BIRTH,
+            description=description,
+            location=dept_name,
+            providers=self._get_random_providers(),
+            biometric_data=None
+        )
+        self._record_discharge(event.subject_id, dept_name, description, event_id)
+    
+    def _arrival_probability(self) -> float:
+        """Probability of a new arrival during one update interval"""
+        if self.calibration is None:
+            return 0.1  # 10% chance
+        
+        # Poisson arrivals at the fitted hour-of-week rate
+        expected = self.calibration.arrival_rate(self.current_time) * self.update_interval.total_seconds() / 3600.0
+        return 1.0 - float(np.exp(-expected))
+    
+    def _schedule_discharge(self, patient_id: str, admission_type: str) -> bool:
+        """Schedule a discharge after a length of stay drawn from the calibration"""
+        if self.calibration is None:
+            return False
+        los_days = self.calibration.sample_length_of_stay(admission_type, self.rng)
+        if los_days is None:
+            return False
+        discharge_time = self.current_time + timedelta(days=los_days)
+        heapq.heappush(self._scheduled_discharges, (discharge_time, patient_id))
+        return True
+    
+    def _process_scheduled_discharges(self):
+        """Discharge patients whose scheduled discharge time has passed"""
+        while self._scheduled_discharges and self._scheduled_discharges[0][0] <= self.current_time:
+            _, patient_id = heapq.heappop(self._scheduled_discharges)
+            self.db.update_patient_status(patient_id, "Discharged")
+            self._record_discharge(patient_id, description="Scheduled discharge")
+    
+    def _record_discharge(self, patient_id, department: Optional[str] = None,
+                          description: str = "", event_id: Optional[str] = None):
+        """Record the length of stay of a discharged patient"""
+        self._transfer_requested_at.pop(patient_id, None)
+        self._responded.discard(patient_id)
+        admitted = self._admitted_at.pop(patient_id, None)
+        los_days = None
+        if admitted is not None:
+            admitted_at, dept_name = admitted
+            department = department or dept_name
+            los_days = (self.current_time - admitted_at).total_seconds() / 86400.0
+            self.durations.record('length_of_stay', dept_name, los_days)
+        self._export_event("discharge", department, patient_id, description, event_id,
+                           length_of_stay=los_days)
+    
+    def _record_response(self, patient_id, providers: List[str]) -> Optional[float]:
+        """Record the time from admission to a patient's first event (reported as response time).
+        
+        Returns:
+            Minutes since admission, or None if not the first event
+        """
+        admitted = self._admitted_at.get(patient_id)
+        if admitted is None or patient_id in self._responded:
+            return None
+        self._responded.add(patient_id)
+        admitted_at, dept_name = admitted
+        minutes = (self.current_time - admitted_at).total_seconds() / 60.0
+        self.durations.record('response_time', dept_name, minutes)
+        for provider in providers:
+            self.response_by_provider.setdefault(provider, RunningStats()).add(minutes)
+        return minutes
+    
+    def _export_event(self, event_type: str, department: Optional[str], patient_id,
+                      description: str, event_id: Optional[str] = None, **durations):
+        """Pass a lifecycle event to the exporter, if exporting"""
+        if self.exporter is not None:
+            self.exporter.record_event(self.current_time, event_type, department, patient_id,
+                                       description, event_id, **durations)
+    
     def _generate_patient_event(self, patient: Dict):
         """Generate an event for a specific patient"""
         # Generate new vital signs
@@ -91,14 +349,22 @@ class SimulationManager:
         self.db.update_patient_status(patient["patient_id"], new_status)
         
         # Create lifecycle event
-        self.lifecycle_manager.create_lifecycle_event(
+        description = f"{event} - {patient['department_name']}"
+        providers = self._get_random_providers()
+        event_id = self.lifecycle_manager.create_lifecycle_event(
             patient_id=patient["patient_id"],
             stage=LifecycleStage.BIRTH,  # Using BIRTH as default stage
-            description=f"{event} - {patient['department_name']}",
+            description=description,
             location=patient["department_name"],
-            providers=self._get_random_providers(),
+            providers=providers,
             biometric_data=vitals
         )
+        response_minutes = self._record_response(patient["patient_id"], providers)
+        if self.exporter is not None:
+            self._export_event("patient_event", patient["department_name"], patient["patient_id"],
+                               description, event_id, response_time=response_minutes)
+            self.exporter.record_vitals(self.current_time, patient["department_name"],
+                                        patient["patient_id"], vitals)
         
         # Consider patient transfer based on status
         self._handle_patient_transfer(patient, new_status)
@@ -116,20 +382,35 @@ class SimulationManager:
         }
         
         target_dept = transfer_rules.get((current_dept, new_status))
-        if target_dept:
+        if not target_dept:
+            # The patient no longer needs a transfer
+            self._transfer_requested_at.pop(patient["patient_id"], None)
+        else:
             departments = self.db.get_department_stats()
             dept = next((d for d in departments if d["name"] == target_dept), None)
+            # A patient keeps waiting from the first request until a bed frees up
+            requested_at, _ = self._transfer_requested_at.get(patient["patient_id"], (self.current_time, None))
+            self._transfer_requested_at[patient["patient_id"]] = (requested_at, target_dept)
             
             if dept and dept["current_occupancy"] < dept["capacity"]:
                 self.db.transfer_patient(patient["patient_id"], dept["department_id"])
-                self.lifecycle_manager.create_lifecycle_event(
+                del self._transfer_requested_at[patient["patient_id"]]
+                wait_minutes = (self.current_time - requested_at).total_seconds() / 60.0
+                self.durations.record('transfer_wait', target_dept, wait_minutes)
+                if current_dept == "Emergency Room":
+                    # Time admitted ER patients spend waiting for an inpatient bed
+                    self.durations.record('boarding_time', current_dept, wait_minutes)
+                description = f"Transferred from {current_dept} to {target_dept}"
+                event_id = self.lifecycle_manager.create_lifecycle_event(
                     patient_id=patient["patient_id"],
                     stage=LifecycleStage.BIRTH,
-                    description=f"Transferred from {current_dept} to {target_dept}",
+                    description=description,
                     location=target_dept,
                     providers=self._get_random_providers(),
                     biometric_data=None
                 )
+                self._export_event("transfer", target_dept, patient["patient_id"], description,
+                                   event_id, transfer_wait=wait_minutes)
     
     def _get_random_providers(self) -> List[str]:
         """Get a random selection of healthcare providers"""
@@ -146,25 +427,45 @@ class SimulationManager:
     def _generate_new_admission(self):
         """Generate a new patient admission"""
         departments = self.db.get_department_stats()
-        er = next((d for d in departments if d['name'] == "Emergency Room"), None)
+        dept_key = "er"
+        admission_type = "EMERGENCY"
+        if self.calibration is not None:
+            dept_key = self.calibration.sample_department(self.rng) or dept_key
+            mix = self.calibration.admission_type_mix
+            if mix:
+                p = np.asarray(list(mix.values()), dtype=float)
+                admission_type = list(mix)[self.rng.choice(len(mix), p=p / p.sum())]
+        dept_name = self.db.departments[dept_key]["name"]
+        dept = next((d for d in departments if d['name'] == dept_name), None)
         
-        if er and er['current_occupancy'] < er['capacity']:
+        if dept and dept['current_occupancy'] < dept['capacity']:
+            patient_id = f"NEW_{next(self._admission_ids):04d}"
+            status = "Under Observation" if admission_type == "EMERGENCY" else "Stable"
+            if not self.db.admit_patient(patient_id, dept_key, status):
+                return
+            self._admitted_at[patient_id] = (self.current_time, dept_name)
+            self._schedule_discharge(patient_id, admission_type)
+            
             # Create lifecycle event for new admission
-            patient_id = f"NEW_{random.randint(1000, 9999)}"
-            self.lifecycle_manager.create_lifecycle_event(
+            description = f"New {admission_type.lower()} admission"
+            vitals = {
+                'heart_rate': random.randint(60, 100),
+                'blood_pressure': f"{random.randint(110, 140)}/{random.randint(70, 90)}",
+                'temperature': round(random.uniform(36.5, 38.5), 1),
+                'oxygen_saturation': random.randint(92, 100),
+                'respiratory_rate': random.randint(12, 20)
+            }
+            event_id = self.lifecycle_manager.create_lifecycle_event(
                 patient_id=patient_id,
                 stage=LifecycleStage.BIRTH,
-                description="New emergency admission",
-                location="Emergency Room",
+                description=description,
+                location=dept_name,
                 providers=["Dr. Smith", "Nurse Johnson"],
-                biometric_data={
-                    'heart_rate': random.randint(60, 100),
-                    'blood_pressure': f"{random.randint(110, 140)}/{random.randint(70, 90)}",
-                    'temperature': round(random.uniform(36.5, 38.5), 1),
-                    'oxygen_saturation': random.randint(92, 100),
-                    'respiratory_rate': random.randint(12, 20)
-                }
+                biometric_data=vitals
             )
+            if self.exporter is not None:
+                self._export_event("admission", dept_name, patient_id, description, event_id)
+                self.exporter.record_vitals(self.current_time, dept_name, patient_id, vitals)
     
     def get_department_stats(self) -> List[Dict]:
         """Get current department statistics"""
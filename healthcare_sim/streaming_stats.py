@@ -0,0 +1,256 @@
+"""
+Constant-memory streaming statistics for durations.
+
+RunningStats keeps count, mean, variance (Welford's algorithm), min and
+max. KLLSketch is a KLL quantile sketch: a stack of compactors where each
+level holds items of weight 2^level, and a full level is sorted and every
+other item (random offset) promoted to the next one. Its size is O(k) and
+quantile rank error is about 1.7/k. DurationMetrics keeps both per
+(metric, department) so reports can show mean and p50/p90/p99 of length of
+stay, transfer wait, response and boarding times over arbitrarily long runs.
+"""
+
+import math
+import random
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DURATION_METRICS = ('length_of_stay', 'transfer_wait', 'response_time', 'boarding_time')
+
+# Bucket that aggregates every department
+ALL_DEPARTMENTS = 'All'
+
+class RunningStats:
+    """Count, mean, variance, min and max in O(1) memory."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def add_many(self, values: Sequence[float]) -> None:
+        """Add a batch, combining its moments with Chan's parallel update."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        batch = RunningStats()
+        batch.count = int(values.size)
+        batch.mean = float(values.mean())
+        batch._m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        self.merge(batch)
+
+    def merge(self, other: 'RunningStats') -> None:
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 with fewer than two values)."""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+class KLLSketch:
+    """KLL streaming quantile sketch."""
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        """
+        Args:
+            k: Accuracy parameter; the top compactor holds k items
+            seed: Seed of the random compaction offsets
+        """
+        self.k = k
+        self.count = 0
+        self._compactors: List[List[float]] = [[]]
+        self._rng = random.Random(seed)
+        self._size = 0  # items retained across all levels
+        self._update_capacities()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _update_capacities(self) -> None:
+        """Level capacities shrink geometrically below the top level."""
+        levels = len(self._compactors)
+        self._capacities = [max(2, int(math.ceil(self.k * (2 / 3) ** (levels - level - 1))))
+                            for level in range(levels)]
+        self._max_size = sum(self._capacities)
+
+    def add(self, value: float) -> None:
+        self._compactors[0].append(float(value))
+        self.count += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def add_many(self, values: Iterable[float]) -> None:
+        """Add values, filling the bottom level in chunks between compactions."""
+        if isinstance(values, np.ndarray):
+            values = values.astype(np.float64, copy=False).tolist()
+        else:
+            values = [float(v) for v in values]
+        start = 0
+        while start < len(values):
+            chunk = values[start:start + max(1, self._max_size - self._size)]
+            self._compactors[0].extend(chunk)
+            start += len(chunk)
+            self.count += len(chunk)
+            self._size += len(chunk)
+            while self._size >= self._max_size:
+                self._compress()
+
+    def merge(self, other: 'KLLSketch') -> None:
+        """Fold another sketch into this one."""
+        while len(self._compactors) < len(other._compactors):
+            self._compactors.append([])
+        self._update_capacities()
+        for level, items in enumerate(other._compactors):
+            self._compactors[level].extend(items)
+        self.count += other.count
+        self._size = sum(len(items) for items in self._compactors)
+        while self._size >= self._max_size:
+            self._compress()
+
+    def quantile(self, q: float) -> float:
+        """Estimated value at quantile q in [0, 1] (NaN if empty)."""
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        items, weights = self._weighted_items()
+        if items.size == 0:
+            return [math.nan] * len(qs)
+        order = np.argsort(items, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        targets = np.asarray(qs, dtype=np.float64) * cumulative[-1]
+        index = np.minimum(np.searchsorted(cumulative, targets, side='left'), len(order) - 1)
+        return [float(v) for v in items[order][index]]
+
+    def _weighted_items(self) -> Tuple[np.ndarray, np.ndarray]:
+        items = np.fromiter((v for level in self._compactors for v in level), dtype=np.float64,
+                            count=self._size)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype=np.float64)
+                                  for h, level in enumerate(self._compactors)]) if items.size else np.empty(0)
+        return items, weights
+
+    def _compress(self) -> None:
+        """Compact the lowest full level, promoting half of its items."""
+        for level, items in enumerate(self._compactors):
+            if len(items) >= self._capacities[level]:
+                if level + 1 == len(self._compactors):
+                    self._compactors.append([])
+                    self._update_capacities()
+                items.sort()
+                offset = self._rng.randint(0, 1)
+                # An odd item out stays behind at this level
+                keep = [items.pop()] if len(items) % 2 else []
+                self._compactors[level + 1].extend(items[offset::2])
+                self._size -= len(items) - len(items[offset::2])
+                self._compactors[level] = keep
+                return
+
+class DurationStats:
+    """Running moments plus a quantile sketch of one duration series."""
+
+    def __init__(self, k: int = 200):
+        self.stats = RunningStats()
+        self.sketch = KLLSketch(k)
+
+    def add(self, value: float) -> None:
+        self.stats.add(value)
+        self.sketch.add(value)
+
+    def add_many(self, values: Sequence[float]) -> None:
+        self.stats.add_many(values)
+        self.sketch.add_many(values)
+
+    def merge(self, other: 'DurationStats') -> None:
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+
+    def summary(self) -> Dict[str, float]:
+        """count, mean, std, min, max, p50, p90 and p99."""
+        p50, p90, p99 = self.sketch.quantiles([0.5, 0.9, 0.99])
+        return {
+            'count': self.stats.count,
+            'mean': self.stats.mean if self.stats.count else math.nan,
+            'std': self.stats.std,
+            'min': self.stats.min if self.stats.count else math.nan,
+            'max': self.stats.max if self.stats.count else math.nan,
+            'p50': p50,
+            'p90': p90,
+            'p99': p99,
+        }
+
+class DurationMetrics:
+    """DurationStats per (metric, department), plus an all-department total."""
+
+    def __init__(self, k: int = 200):
+        self.k = k
+        self._series: Dict[Tuple[str, str], DurationStats] = {}
+
+    def record(self, metric: str, department: Optional[str], value: float) -> None:
+        """Add one duration; it also counts towards the all-department total."""
+        if value is None or not math.isfinite(value):
+            return
+        departments = [ALL_DEPARTMENTS]
+        if department is not None and department != ALL_DEPARTMENTS:
+            departments.append(department)
+        for name in departments:
+            series = self._series.get((metric, name))
+            if series is None:
+                series = self._series[(metric, name)] = DurationStats(self.k)
+            series.add(value)
+
+    def record_many(self, metric: str, department: Optional[str], values: Sequence[float]) -> None:
+        """Add a batch of durations of one department; non-finite values are skipped."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        departments = [ALL_DEPARTMENTS]
+        if department is not None and department != ALL_DEPARTMENTS:
+            departments.append(department)
+        for name in departments:
+            series = self._series.get((metric, name))
+            if series is None:
+                series = self._series[(metric, name)] = DurationStats(self.k)
+            series.add_many(values)
+
+    def get(self, metric: str, department: str = ALL_DEPARTMENTS) -> Optional[DurationStats]:
+        return self._series.get((metric, department))
+
+    def departments(self, metric: str) -> List[str]:
+        """Departments with recorded values of a metric (excluding the total)."""
+        return sorted(d for m, d in self._series if m == metric and d != ALL_DEPARTMENTS)
+
+    def merge(self, other: 'DurationMetrics') -> None:
+        for key, series in other._series.items():
+            if key not in self._series:
+                self._series[key] = DurationStats(self.k)
+            self._series[key].merge(series)
+
+    def summary(self, metric: str, department: str = ALL_DEPARTMENTS) -> Optional[Dict[str, float]]:
+        series = self.get(metric, department)
+        return series.summary() if series is not None else None
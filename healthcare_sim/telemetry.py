@@ -0,0 +1,294 @@
+"""
+Fixed-memory occupancy telemetry.
+
+Samples of occupancy, queue length and equipment utilization are folded
+into preallocated NumPy ring buffers at several resolutions (minute, hour
+and day buckets). Each bucket keeps the sum, count and peak of the samples
+that fell into it, so a level answers mean and peak queries over its
+retention window, and memory does not grow with simulated time. Trend
+charts over weeks of simulated time read a few hundred hourly or daily
+buckets instead of raw samples.
+"""
+
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+METRICS = ('occupancy', 'queue_length', 'equipment_utilization')
+
+# Bucket width in seconds and default number of buckets kept per resolution
+RESOLUTIONS = {'minute': 60, 'hour': 3600, 'day': 86400}
+DEFAULT_RETENTION = {'minute': 24 * 60, 'hour': 24 * 7 * 8, 'day': 2 * 365}
+
+_EPOCH = datetime(1970, 1, 1)
+
+def _epoch_seconds(time: datetime) -> float:
+    """Seconds since the epoch of a naive (simulation wall clock) or aware time."""
+    if time.tzinfo is not None:
+        time = time.astimezone(timezone.utc).replace(tzinfo=None)
+    return (time - _EPOCH).total_seconds()
+
+class RollupRing:
+    """Ring of time buckets at one resolution with sum/count/peak per column."""
+
+    def __init__(self, width_seconds: int, slots: int, columns: int):
+        self.width = width_seconds
+        self.slots = slots
+        self.bucket = np.full(slots, -1, dtype=np.int64)  # absolute bucket number per slot
+        self.sums = np.zeros((slots, columns))
+        self.counts = np.zeros((slots, columns), dtype=np.int32)
+        self.peaks = np.full((slots, columns), -np.inf, dtype=np.float32)
+        self.earliest = -1
+        self.latest = -1
+
+    @property
+    def columns(self) -> int:
+        return self.sums.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.bucket.nbytes + self.sums.nbytes + self.counts.nbytes + self.peaks.nbytes
+
+    def grow(self, columns: int) -> None:
+        """Widen the buffers to at least the given number of columns."""
+        extra = columns - self.columns
+        if extra <= 0:
+            return
+        self.sums = np.hstack([self.sums, np.zeros((self.slots, extra))])
+        self.counts = np.hstack([self.counts, np.zeros((self.slots, extra), dtype=np.int32)])
+        self.peaks = np.hstack([self.peaks, np.full((self.slots, extra), -np.inf, dtype=np.float32)])
+
+    def add(self, seconds: float, columns: np.ndarray, values: np.ndarray) -> None:
+        """Fold one sample of the given columns into its bucket."""
+        bucket = int(seconds // self.width)
+        if bucket < self.latest - self.slots + 1:
+            return  # older than the retention window
+        slot = bucket % self.slots
+        if self.bucket[slot] != bucket:
+            self.bucket[slot] = bucket
+            self.sums[slot] = 0.0
+            self.counts[slot] = 0
+            self.peaks[slot] = -np.inf
+        self.sums[slot, columns] += values
+        self.counts[slot, columns] += 1
+        self.peaks[slot, columns] = np.fmax(self.peaks[slot, columns], values)
+        self.latest = max(self.latest, bucket)
+        self.earliest = bucket if self.earliest < 0 else min(self.earliest, bucket)
+
+    def window(self, columns, stat: str = 'mean',
+               start: Optional[float] = None,
+               end: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Bucket start times (seconds) and per-bucket stats, oldest first.
+
+        Buckets without samples for a column are NaN.
+        """
+        if self.latest < 0:
+            return np.empty(0), np.empty((0, np.size(columns)))
+        first = max(self.earliest, self.latest - self.slots + 1)
+        if start is not None:
+            first = max(first, int(start // self.width))
+        last = self.latest if end is None else min(self.latest, int(end // self.width))
+        buckets = np.arange(first, last + 1, dtype=np.int64)
+        if buckets.size == 0:
+            return np.empty(0), np.empty((0, np.size(columns)))
+        slots = buckets % self.slots
+        present = self.bucket[slots] == buckets
+
+        counts = self.counts[np.ix_(slots, np.atleast_1d(columns))]
+        if stat == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values = self.sums[np.ix_(slots, np.atleast_1d(columns))] / counts
+        elif stat == 'max':
+            values = self.peaks[np.ix_(slots, np.atleast_1d(columns))].astype(np.float64)
+        elif stat == 'count':
+            values = counts.astype(np.float64)
+        else:
+            raise ValueError(f"Unknown statistic: {stat}")
+        empty = ~present[:, None] | (counts == 0)
+        values[empty] = 0.0 if stat == 'count' else np.nan
+        if stat == 'max':
+            values[np.isneginf(values)] = np.nan  # only NaN samples
+        return buckets * float(self.width), values
+
+class TelemetrySeries:
+    """Multi-resolution time series of metrics for a growing set of entities."""
+
+    def __init__(self,
+                 metrics: Sequence[str] = METRICS,
+                 retention: Optional[Dict[str, int]] = None,
+                 initial_entities: int = 16):
+        """
+        Args:
+            metrics: Metric names recorded for every entity
+            retention: Buckets kept per resolution ('minute', 'hour', 'day')
+            initial_entities: Entities preallocated before the buffers grow
+        """
+        self.metrics = list(metrics)
+        self._metric_index = {name: i for i, name in enumerate(self.metrics)}
+        self.entities: List[str] = []
+        self._entity_index: Dict[str, int] = {}
+        retention = {**DEFAULT_RETENTION, **(retention or {})}
+        columns = initial_entities * len(self.metrics)
+        self.levels = {
+            name: RollupRing(RESOLUTIONS[name], slots, columns)
+            for name, slots in retention.items() if slots > 0
+        }
+
+    @property
+    def nbytes(self) -> int:
+        return sum(level.nbytes for level in self.levels.values())
+
+    def record(self, time: datetime, entities: Sequence[str], values: np.ndarray) -> None:
+        """Record one sample per entity.
+
+        Args:
+            time: Sample time
+            entities: Entity names (locations, departments, ...)
+            values: Array of shape (len(entities), len(metrics))
+        """
+        rows = np.array([self._entity_row(entity) for entity in entities], dtype=np.int64)
+        needed = len(self.entities) * len(self.metrics)
+        for level in self.levels.values():
+            if needed > level.columns:
+                level.grow(max(needed, level.columns + level.columns // 2))
+
+        columns = (rows[:, None] * len(self.metrics) + np.arange(len(self.metrics))).ravel()
+        values = np.asarray(values, dtype=np.float64).ravel()
+        seconds = _epoch_seconds(time)
+        for level in self.levels.values():
+            level.add(seconds, columns, values)
+
+    def series(self, entity: str, metric: str,
+               resolution: str = 'hour',
+               stat: str = 'mean',
+               start: Optional[datetime] = None,
+               end: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Bucket times (datetime64) and values of one metric of one entity."""
+        times, values = self.window([entity], metric, resolution, stat, start, end)
+        return times, values[:, 0]
+
+    def window(self, entities: Sequence[str], metric: str,
+               resolution: str = 'hour',
+               stat: str = 'mean',
+               start: Optional[datetime] = None,
+               end: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Bucket times (datetime64) and values of a metric, one column per entity.
+
+        Unknown entities give all-NaN columns.
+        """
+        level = self.levels[resolution]
+        offset = self._metric_index[metric]
+        known = np.array([entity in self._entity_index for entity in entities], dtype=bool)
+        columns = np.array([self._entity_index.get(entity, 0) * len(self.metrics) + offset
+                            for entity in entities], dtype=np.int64)
+        seconds, values = level.window(
+            columns, stat,
+            _epoch_seconds(start) if start is not None else None,
+            _epoch_seconds(end) if end is not None else None)
+        values[:, ~known] = np.nan
+        return (seconds * 1e6).astype('datetime64[us]'), values
+
+    def frame(self, entities: Sequence[str], metric: str, resolution: str = 'hour',
+              stat: str = 'mean', start: Optional[datetime] = None,
+              end: Optional[datetime] = None):
+        """A metric as a pandas DataFrame indexed by bucket time, for charts."""
+        import pandas as pd
+        times, values = self.window(entities, metric, resolution, stat, start, end)
+        return pd.DataFrame(values, index=pd.DatetimeIndex(times, name='time'), columns=list(entities))
+
+    def _entity_row(self, entity: str) -> int:
+        index = self._entity_index.get(entity)
+        if index is None:
+            index = len(self.entities)
+            self._entity_index[entity] = index
+            self.entities.append(entity)
+        return index
+
+class HospitalTelemetry:
+    """Occupancy, queue and equipment telemetry per location and department.
+
+    Occupancy is recorded as a fraction of capacity. Without explicit queue
+    lengths, a location's queue is its places held by pending reservations;
+    a department's is unknown (NaN).
+    """
+
+    def __init__(self,
+                 retention: Optional[Dict[str, int]] = None,
+                 department_of: Optional[Callable] = None):
+        """
+        Args:
+            retention: Buckets kept per resolution ('minute', 'hour', 'day')
+            department_of: Maps a Location to its department name; defaults
+                to the location type
+        """
+        self.locations = TelemetrySeries(retention=retention)
+        self.departments = TelemetrySeries(retention=retention)
+        self.department_of = department_of or (lambda location: location.type.value)
+
+    @property
+    def nbytes(self) -> int:
+        return self.locations.nbytes + self.departments.nbytes
+
+    def record_environment(self, environment, now: datetime,
+                           queue_lengths: Optional[Dict[str, float]] = None,
+                           departments: bool = True) -> None:
+        """Sample every location of a HospitalEnvironment.
+
+        Args:
+            queue_lengths: Queue length per location id
+            departments: Also roll the locations up into department series
+                (leave off when record_departments samples the departments)
+        """
+        locations = list(environment.locations.values())
+        if not locations:
+            return
+        queue_lengths = queue_lengths or {}
+        capacity = np.array([location.capacity for location in locations], dtype=np.float64)
+        occupancy = np.array([location.current_occupancy for location in locations], dtype=np.float64)
+        queue = np.array([queue_lengths.get(location.id, location.reserved) for location in locations],
+                         dtype=np.float64)
+        equipment_total = np.array([len(location.equipment) for location in locations], dtype=np.float64)
+        equipment_used = np.array([sum(not free for free in location.equipment.values())
+                                   for location in locations], dtype=np.float64)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = np.column_stack([
+                np.where(capacity > 0, occupancy / capacity, np.nan),
+                queue,
+                np.where(equipment_total > 0, equipment_used / equipment_total, np.nan),
+            ])
+        self.locations.record(now, [location.id for location in locations], values)
+        if not departments:
+            return
+
+        names, department = np.unique([self.department_of(location) for location in locations],
+                                      return_inverse=True)
+        sums = np.zeros((len(names), 5))
+        np.add.at(sums, department,
+                  np.column_stack([occupancy, capacity, queue, equipment_used, equipment_total]))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            rollup = np.column_stack([
+                np.where(sums[:, 1] > 0, sums[:, 0] / sums[:, 1], np.nan),
+                sums[:, 2],
+                np.where(sums[:, 4] > 0, sums[:, 3] / sums[:, 4], np.nan),
+            ])
+        self.departments.record(now, list(names), rollup)
+
+    def record_departments(self, now: datetime, department_stats: List[Dict]) -> None:
+        """Sample department statistics rows (name, current_occupancy, capacity).
+
+        Rows may also carry 'queue_length' and 'equipment_utilization'; both
+        are NaN (no sample) when missing.
+        """
+        if not department_stats:
+            return
+        values = np.empty((len(department_stats), len(METRICS)))
+        for i, dept in enumerate(department_stats):
+            occupancy, capacity = dept['current_occupancy'], dept['capacity']
+            values[i] = (
+                occupancy / capacity if capacity else np.nan,
+                dept.get('queue_length', np.nan),
+                dept.get('equipment_utilization', np.nan),
+            )
+        self.departments.record(now, [dept['name'] for dept in department_stats], values)
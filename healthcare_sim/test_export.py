@@ -0,0 +1,120 @@
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from export import TABLE_COLUMNS, PartitionedTableWriter, SimulationExporter
+from report_metrics import ReportMetrics
+
+DEPARTMENTS = ['Emergency', 'ICU', 'General Ward/East', None]
+
+def make_rows(count=2_000):
+    start = datetime(2026, 1, 1, 20, 0)
+    rows = []
+    for i in range(count):
+        time = start + timedelta(minutes=3 * i)
+        rows.append({
+            'timestamp': time,
+            'day': time.date().isoformat(),
+            'department': DEPARTMENTS[i % len(DEPARTMENTS)],
+            'type': 'discharge' if i % 3 == 0 else 'admission',
+            'patient_id': f"patient_{i}",
+            'event_id': f"event_{i}",
+            'description': f"Event {i}",
+            'length_of_stay': i / 100 if i % 3 == 0 else None,
+        })
+    return rows
+
+def read_dataset(path, file_format):
+    table = ds.dataset(path, format=file_format, partitioning='hive').to_table()
+    frame = table.to_pandas()
+    frame['timestamp'] = pd.to_datetime(frame['timestamp'])
+    frame['day'] = frame['day'].astype(str)
+    return frame.sort_values('timestamp').reset_index(drop=True)
+
+def check_round_trip(file_format):
+    rows = make_rows()
+    with tempfile.TemporaryDirectory() as directory:
+        writer = PartitionedTableWriter(directory, TABLE_COLUMNS['events'],
+                                        file_format=file_format, batch_rows=128)
+        for row in rows:
+            writer.append(row)
+        writer.close()
+        assert len(writer) == len(rows)
+
+        frame = read_dataset(directory, file_format)
+        expected = pd.DataFrame(rows)
+        assert len(frame) == len(expected)
+        assert (frame['timestamp'] == expected['timestamp']).all()
+        assert (frame['day'] == expected['day']).all()
+        departments = [None if pd.isna(value) else value for value in frame['department']]
+        assert departments == [row['department'] for row in rows]
+        assert (frame['patient_id'] == expected['patient_id']).all()
+        assert np.allclose(frame['length_of_stay'].astype(float),
+                           expected['length_of_stay'].astype(float), equal_nan=True)
+
+        # One directory per day and department, values URL-encoded
+        days = sorted(os.listdir(directory))
+        assert days == [f"day={day}" for day in sorted(expected['day'].unique())]
+        assert 'department=General%20Ward%2FEast' in os.listdir(os.path.join(directory, days[0]))
+
+def test_parquet_round_trip():
+    check_round_trip('parquet')
+
+def test_csv_round_trip():
+    check_round_trip('csv')
+
+def test_unsupported_format():
+    try:
+        PartitionedTableWriter('unused', TABLE_COLUMNS['events'], file_format='xlsx')
+    except ValueError:
+        return
+    raise AssertionError("expected ValueError")
+
+def check_exported_events(file_format):
+    start = datetime(2026, 1, 1, 23, 0)
+    with tempfile.TemporaryDirectory() as directory:
+        with SimulationExporter(directory, file_format=file_format, batch_rows=50) as exporter:
+            for i in range(300):
+                time = start + timedelta(minutes=i)
+                exporter.record_event(time, 'discharge', 'ICU', i, f"Patient {i} discharged",
+                                      length_of_stay=i / 10)
+                exporter.record_vitals(time, 'ICU', i, {'heart_rate': 80,
+                                                        'blood_pressure': '120/80'})
+            exporter.record_occupancy(start, [{'name': 'ICU', 'current_occupancy': 3,
+                                               'capacity': 4}])
+
+        metrics = ReportMetrics.from_event_log(exporter.table_path('events'))
+        assert metrics.total_events == 300
+        assert metrics.events_by_type == {'discharge': 300}
+        assert metrics.events_by_department == {'ICU': 300}
+        assert metrics.first_event_time == start
+        assert metrics.last_event_time == start + timedelta(minutes=299)
+        assert np.isclose(metrics.durations.get('length_of_stay', 'ICU').stats.mean, 14.95)
+
+        vitals = read_dataset(exporter.table_path('vitals'), file_format)
+        assert len(vitals) == 300
+        assert (vitals['systolic_bp'] == 120).all() and (vitals['diastolic_bp'] == 80).all()
+        occupancy = ds.dataset(exporter.table_path('occupancy'), format=file_format,
+                               partitioning='hive').to_table()
+        assert occupancy.column('occupancy_rate').to_pylist() == [0.75]
+
+def test_exported_parquet_events_feed_report_metrics():
+    check_exported_events('parquet')
+
+def test_exported_csv_events_feed_report_metrics():
+    check_exported_events('csv')
+
+if __name__ == "__main__":
+    test_parquet_round_trip()
+    test_csv_round_trip()
+    test_unsupported_format()
+    test_exported_parquet_events_feed_report_metrics()
+    test_exported_csv_events_feed_report_metrics()
+    print("export tests passed")
@@ -0,0 +1,124 @@
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from report_metrics import ReportMetrics
+from streaming_stats import ALL_DEPARTMENTS, DURATION_METRICS
+
+def make_events(count=5_000, seed=0):
+    """Synthetic simulation events with gaps in every optional column."""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    events = []
+    for i in range(count):
+        event = {
+            'timestamp': start + timedelta(minutes=rng.randint(0, 60 * 24 * 30)),
+            'type': rng.choice(['admission', 'discharge', 'transfer', 'emergency', 'response']),
+            'department': rng.choice(['Emergency', 'ICU', 'General Ward', None]),
+        }
+        if event['type'] == 'discharge':
+            event['length_of_stay'] = rng.expovariate(1 / 4)
+        elif event['type'] == 'transfer':
+            event['transfer_wait'] = rng.expovariate(1 / 30)
+        elif event['type'] == 'response':
+            event['agent_id'] = f"doctor_{rng.randint(0, 9)}"
+            event['response_time'] = rng.expovariate(1 / 5)
+        events.append(event)
+    return events
+
+def assert_same_metrics(expected, actual):
+    assert actual.total_events == expected.total_events
+    assert actual.events_by_type == expected.events_by_type
+    assert actual.events_by_department == expected.events_by_department
+    assert actual.first_event_time == expected.first_event_time
+    assert actual.last_event_time == expected.last_event_time
+    for metric in DURATION_METRICS:
+        assert actual.duration_departments(metric) == expected.duration_departments(metric)
+        if expected.durations.get(metric) is None:
+            assert actual.durations.get(metric) is None
+            continue
+        for department in [ALL_DEPARTMENTS] + expected.duration_departments(metric):
+            a = actual.durations.get(metric, department).stats
+            e = expected.durations.get(metric, department).stats
+            assert a.count == e.count
+            assert np.isclose(a.mean, e.mean) and np.isclose(a.variance, e.variance)
+            assert np.isclose(a.min, e.min) and np.isclose(a.max, e.max)
+    assert actual.response_by_agent.keys() == expected.response_by_agent.keys()
+    for agent_id, e in expected.response_by_agent.items():
+        a = actual.response_by_agent[agent_id]
+        assert a.count == e.count and np.isclose(a.mean, e.mean)
+
+def test_add_frame_matches_add_event():
+    events = make_events()
+    expected = ReportMetrics.from_events(events)
+    actual = ReportMetrics()
+    frame = pd.DataFrame(events)
+    for start in range(0, len(frame), 1_000):
+        actual.add_frame(frame.iloc[start:start + 1_000])
+    assert_same_metrics(expected, actual)
+
+def test_add_frame_with_categorical_columns():
+    events = make_events(seed=1)
+    expected = ReportMetrics.from_events(events)
+    frame = pd.DataFrame(events)
+    for column in ('type', 'department', 'agent_id'):
+        frame[column] = frame[column].astype('category')
+    actual = ReportMetrics()
+    actual.add_frame(frame)
+    assert_same_metrics(expected, actual)
+
+def test_from_event_log_matches_from_events():
+    events = make_events(seed=2)
+    expected = ReportMetrics.from_events(events)
+    with tempfile.TemporaryDirectory() as directory:
+        parquet_path = os.path.join(directory, 'events.parquet')
+        pd.DataFrame(events).to_parquet(parquet_path, index=False)
+        assert_same_metrics(expected, ReportMetrics.from_event_log(parquet_path, chunksize=700))
+
+        ndjson_path = os.path.join(directory, 'events.ndjson')
+        pd.DataFrame(events).to_json(ndjson_path, orient='records', lines=True, date_format='iso')
+        assert_same_metrics(expected, ReportMetrics.from_event_log(ndjson_path, chunksize=700))
+
+        csv_path = os.path.join(directory, 'events.csv')
+        pd.DataFrame(events).to_csv(csv_path, index=False)
+        assert_same_metrics(expected, ReportMetrics.from_event_log(csv_path, chunksize=700))
+
+def test_string_and_epoch_times_match_add_frame():
+    events = make_events(count=1_000, seed=6)
+    datetimes = ReportMetrics.from_events(events)
+    for i, event in enumerate(events):
+        if i % 2:
+            event['timestamp'] = event['timestamp'].isoformat()
+        else:
+            event['time'] = (event.pop('timestamp') - datetime(1970, 1, 1)).total_seconds()
+    parsed = ReportMetrics.from_events(events)
+    frame = ReportMetrics()
+    frame.add_frame(pd.DataFrame(events))
+    assert parsed.first_event_time == datetimes.first_event_time
+    assert parsed.last_event_time == datetimes.last_event_time
+    assert_same_metrics(parsed, frame)
+
+def test_sync_rebuilds_on_new_list():
+    events = make_events(count=100, seed=3)
+    metrics = ReportMetrics()
+    assert metrics.sync(events) == 100
+    events.extend(make_events(count=10, seed=4))
+    assert metrics.sync(events) == 10
+    replacement = make_events(count=20, seed=5)
+    assert metrics.sync(replacement) == 20
+    assert_same_metrics(ReportMetrics.from_events(replacement), metrics)
+
+if __name__ == "__main__":
+    test_add_frame_matches_add_event()
+    test_add_frame_with_categorical_columns()
+    test_from_event_log_matches_from_events()
+    test_string_and_epoch_times_match_add_frame()
+    test_sync_rebuilds_on_new_list()
+    print("report_metrics tests passed")
@@ -0,0 +1,101 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from streaming_stats import ALL_DEPARTMENTS, DurationMetrics, KLLSketch, RunningStats
+
+QUANTILES = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+def rank_error(values, sketch):
+    """Largest distance between requested and true rank of the sketch's quantiles."""
+    ordered = np.sort(values)
+    estimates = sketch.quantiles(QUANTILES)
+    ranks = np.searchsorted(ordered, estimates, side='right') / len(ordered)
+    return float(np.max(np.abs(ranks - np.array(QUANTILES))))
+
+def test_running_stats_matches_numpy():
+    values = np.random.default_rng(0).lognormal(1.0, 0.8, 10_000)
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.count == len(values)
+    assert np.isclose(stats.mean, values.mean())
+    assert np.isclose(stats.std, values.std(ddof=1))
+    assert stats.min == values.min() and stats.max == values.max()
+
+def test_running_stats_add_many_and_merge():
+    rng = np.random.default_rng(1)
+    parts = [rng.normal(100, 15, 3_000), rng.normal(5, 1, 7), rng.exponential(30, 5_000)]
+    batched, merged = RunningStats(), RunningStats()
+    for part in parts:
+        batched.add_many(part)
+        other = RunningStats()
+        other.add_many(part)
+        merged.merge(other)
+    values = np.concatenate(parts)
+    for stats in (batched, merged):
+        assert stats.count == len(values)
+        assert np.isclose(stats.mean, values.mean())
+        assert np.isclose(stats.variance, values.var(ddof=1))
+        assert stats.min == values.min() and stats.max == values.max()
+
+def test_running_stats_merge_empty():
+    stats = RunningStats()
+    stats.add_many([1.0, 2.0, 3.0])
+    stats.merge(RunningStats())
+    empty = RunningStats()
+    empty.merge(stats)
+    assert empty.count == 3 and np.isclose(empty.mean, 2.0)
+
+def test_kll_rank_error():
+    values = np.random.default_rng(2).lognormal(2.0, 1.0, 200_000)
+    sketch = KLLSketch(k=200, seed=0)
+    sketch.add_many(values[:100_000])
+    for value in values[100_000:]:
+        sketch.add(value)
+    assert len(sketch) == len(values)
+    assert rank_error(values, sketch) < 0.02
+
+def test_kll_merge_rank_error():
+    rng = np.random.default_rng(3)
+    parts = [rng.normal(60, 10, 50_000), rng.exponential(120, 80_000), rng.uniform(0, 10, 20_000)]
+    merged = KLLSketch(k=200, seed=0)
+    for seed, part in enumerate(parts):
+        sketch = KLLSketch(k=200, seed=seed + 1)
+        sketch.add_many(part)
+        merged.merge(sketch)
+    values = np.concatenate(parts)
+    assert len(merged) == len(values)
+    assert rank_error(values, merged) < 0.02
+
+def test_kll_small_inputs_are_exact():
+    sketch = KLLSketch(k=200, seed=0)
+    assert np.isnan(sketch.quantile(0.5))
+    sketch.add_many(range(1, 101))
+    assert sketch.quantiles([0.0, 0.5, 1.0]) == [1.0, 50.0, 100.0]
+
+def test_duration_metrics_totals_and_merge():
+    first, second = DurationMetrics(), DurationMetrics()
+    first.record('length_of_stay', 'ICU', 2.0)
+    first.record('length_of_stay', None, 4.0)
+    first.record('length_of_stay', 'ICU', float('nan'))
+    second.record_many('length_of_stay', 'Emergency', [1.0, 3.0, float('inf')])
+    first.merge(second)
+
+    assert first.departments('length_of_stay') == ['Emergency', 'ICU']
+    total = first.summary('length_of_stay', ALL_DEPARTMENTS)
+    assert total['count'] == 4 and np.isclose(total['mean'], 2.5)
+    assert first.summary('length_of_stay', 'ICU')['count'] == 1
+    assert first.summary('transfer_wait') is None
+
+if __name__ == "__main__":
+    test_running_stats_matches_numpy()
+    test_running_stats_add_many_and_merge()
+    test_running_stats_merge_empty()
+    test_kll_rank_error()
+    test_kll_merge_rank_error()
+    test_kll_small_inputs_are_exact()
+    test_duration_metrics_totals_and_merge()
+    print("streaming_stats tests passed")
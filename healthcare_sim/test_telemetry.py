@@ -0,0 +1,92 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from telemetry import HospitalTelemetry, RollupRing
+
+def make_samples(count=5_000, columns=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'seconds': np.sort(rng.uniform(0, 48 * 3600, count)),
+        'column': rng.integers(0, columns, count),
+        'value': rng.normal(50, 20, count),
+    })
+
+def fill(ring, samples):
+    for row in samples.itertuples():
+        ring.add(row.seconds, np.array([row.column]), np.array([row.value]))
+
+def test_window_matches_group_by():
+    samples = make_samples()
+    ring = RollupRing(width_seconds=3600, slots=72, columns=4)
+    fill(ring, samples)
+
+    samples['bucket'] = (samples['seconds'] // 3600).astype(int)
+    grouped = samples.groupby(['bucket', 'column'])['value']
+    for stat, expected in (('mean', grouped.mean()), ('max', grouped.max()), ('count', grouped.count())):
+        starts, values = ring.window([0, 1, 2, 3], stat=stat)
+        assert np.array_equal(starts, np.arange(48) * 3600.0)
+        table = expected.unstack('column').reindex(range(48)).to_numpy(dtype=np.float64)
+        if stat == 'count':
+            table = np.nan_to_num(table)
+        assert np.allclose(values, table, equal_nan=True, rtol=1e-6)
+
+def test_ring_keeps_only_the_latest_slots():
+    samples = make_samples(seed=1)
+    ring = RollupRing(width_seconds=3600, slots=12, columns=4)
+    fill(ring, samples)
+    starts, counts = ring.window([0, 1, 2, 3], stat='count')
+    assert np.array_equal(starts, np.arange(36, 48) * 3600.0)
+    recent = samples[samples['seconds'] >= 36 * 3600]
+    assert counts.sum() == len(recent)
+
+    # Samples older than the retention window are ignored
+    ring.add(0.0, np.array([0]), np.array([1e9]))
+    _, peaks = ring.window([0], stat='max')
+    assert np.nanmax(peaks) < 1e9
+
+def test_window_bounds_and_empty_buckets():
+    ring = RollupRing(width_seconds=60, slots=10, columns=2)
+    starts, values = ring.window([0, 1])
+    assert starts.size == 0 and values.shape == (0, 2)
+
+    ring.add(0, np.array([0]), np.array([1.0]))
+    ring.add(130, np.array([0, 1]), np.array([3.0, 4.0]))
+    starts, values = ring.window([0, 1], stat='mean')
+    assert starts.tolist() == [0.0, 60.0, 120.0]
+    assert np.allclose(values, [[1.0, np.nan], [np.nan, np.nan], [3.0, 4.0]], equal_nan=True)
+    starts, _ = ring.window([0], start=60, end=60)
+    assert starts.tolist() == [60.0]
+
+def test_grow_adds_columns():
+    ring = RollupRing(width_seconds=60, slots=4, columns=1)
+    ring.add(0, np.array([0]), np.array([2.0]))
+    ring.grow(3)
+    assert ring.columns == 3
+    ring.add(10, np.array([2]), np.array([5.0]))
+    _, values = ring.window([0, 1, 2], stat='max')
+    assert np.allclose(values, [[2.0, np.nan, 5.0]], equal_nan=True)
+
+def test_department_queue_is_unknown_without_a_signal():
+    telemetry = HospitalTelemetry()
+    telemetry.record_departments(datetime(2026, 1, 1, 8, 0), [
+        {'name': 'ICU', 'current_occupancy': 12, 'capacity': 10},
+        {'name': 'General Ward', 'current_occupancy': 5, 'capacity': 20, 'queue_length': 3},
+    ])
+    _, occupancy = telemetry.departments.window(['ICU', 'General Ward'], 'occupancy', 'minute')
+    _, queue = telemetry.departments.window(['ICU', 'General Ward'], 'queue_length', 'minute')
+    assert np.allclose(occupancy, [[1.2, 0.25]])
+    assert np.isnan(queue[0, 0]) and queue[0, 1] == 3
+
+if __name__ == "__main__":
+    test_window_matches_group_by()
+    test_ring_keeps_only_the_latest_slots()
+    test_window_bounds_and_empty_buckets()
+    test_grow_adds_columns()
+    test_department_queue_is_unknown_without_a_signal()
+    print("telemetry tests passed")
@@ -1,21 +1,37 @@
 import streamlit as st
 import plotly.graph_objects as go
+import numpy as np
 from datetime import datetime, timedelta
 
+# Above this many events markers are not labelled, only described on hover
+TIMELINE_LABEL_LIMIT = 50
+
 def create_lifecycle_timeline(events):
-    """Create a timeline visualization of lifecycle events."""
+    """Create a timeline visualization of lifecycle events.
+    
+    One WebGL (Scattergl) trace per stage, built from column arrays.
+    """
     if not events:
         return None
-        
-    fig = go.Figure()
     
-    for event in events:
-        fig.add_trace(go.Scatter(
-            x=[event.timestamp],
-            y=[event.stage.name],
-            mode='markers+text',
-            name=event.event_id,
-            text=[event.description],
+    # Column arrays, in event order
+    times = np.array([event.timestamp for event in events], dtype='datetime64[us]')
+    stages = np.array([event.stage.name for event in events], dtype=object)
+    descriptions = np.array([event.description for event in events], dtype=object)
+    event_ids = np.array([event.event_id for event in events], dtype=object)
+    
+    fig = go.Figure()
+    mode = 'markers+text' if len(events) <= TIMELINE_LABEL_LIMIT else 'markers'
+    for stage_name in dict.fromkeys(stages):
+        in_stage = stages == stage_name
+        fig.add_trace(go.Scattergl(
+            x=times[in_stage],
+            y=stages[in_stage],
+            mode=mode,
+            name=stage_name,
+            text=descriptions[in_stage],
+            customdata=event_ids[in_stage],
+            hovertemplate='<b>%{text}</b><br>%{customdata}<br>Time: %{x}<extra></extra>',
             marker=dict(size=10),
             textposition="top center"
         ))
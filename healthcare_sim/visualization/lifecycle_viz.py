@@ -2,57 +2,38 @@ import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 from typing import List, Dict
 from ..lifecycle.lifecycle_manager import LifecycleStage, LifecycleEvent
 
+# Above this many events markers are not labelled, only described on hover
+TIMELINE_LABEL_LIMIT = 50
+
 def create_lifecycle_timeline(events: List[LifecycleEvent]) -> go.Figure:
-    """Create an interactive timeline visualization of lifecycle events"""
+    """Create an interactive timeline visualization of lifecycle events
     
-    # Prepare data
-    df = pd.DataFrame([
-        {
-            'Stage': event.stage.value,
-            'Date': event.timestamp,
-            'Description': event.description,
-            'Location': event.location,
-            'Providers': ', '.join(event.providers),
-            'Has_Genetic': bool(event.genetic_data),
-            'Has_Biometric': bool(event.biometric_data)
-        }
-        for event in events
-    ])
+    Events are drawn as one WebGL (Scattergl) trace per stage built from
+    column arrays, so figure size and render time grow with the number of
+    points rather than the number of traces.
+    """
+    
+    # Column arrays, in event order
+    dates = np.array([event.timestamp for event in events], dtype='datetime64[us]')
+    stages = np.array([event.stage.value for event in events], dtype=np.int64)
+    descriptions = np.array([event.description for event in events], dtype=object)
+    details = np.array([(event.location, ', '.join(event.providers)) for event in events],
+                       dtype=object).reshape(-1, 2)
+    has_genetic = np.array([bool(event.genetic_data) for event in events], dtype=np.int8)
     
     # Create figure with secondary y-axis
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     
-    # Add events as scatter plot
-    fig.add_trace(
-        go.Scatter(
-            x=df['Date'],
-            y=df['Stage'],
-            mode='markers+text',
-            name='Events',
-            text=df['Description'],
-            hovertemplate=(
-                '<b>%{text}</b><br>' +
-                'Date: %{x}<br>' +
-                'Stage: %{y}<br>' +
-                '<extra></extra>'
-            ),
-            marker=dict(
-                size=12,
-                symbol='circle',
-                color=['red' if g else 'blue' for g in df['Has_Genetic']]
-            )
-        )
-    )
-    
     # Add connecting lines
     fig.add_trace(
-        go.Scatter(
-            x=df['Date'],
-            y=df['Stage'],
+        go.Scattergl(
+            x=dates,
+            y=stages,
             mode='lines',
             line=dict(color='gray', width=1),
             showlegend=False,
@@ -60,6 +41,41 @@ def create_lifecycle_timeline(events: List[LifecycleEvent]) -> go.Figure:
         )
     )
     
+    # Add events, one trace per stage
+    mode = 'markers+text' if len(events) <= TIMELINE_LABEL_LIMIT else 'markers'
+    for stage in LifecycleStage:
+        in_stage = stages == stage.value
+        if not in_stage.any():
+            continue
+        fig.add_trace(
+            go.Scattergl(
+                x=dates[in_stage],
+                y=stages[in_stage],
+                mode=mode,
+                name=stage.name.replace('_', ' ').title(),
+                text=descriptions[in_stage],
+                customdata=details[in_stage],
+                hovertemplate=(
+                    '<b>%{text}</b><br>' +
+                    'Date: %{x}<br>' +
+                    'Stage: %{y}<br>' +
+                    'Location: %{customdata[0]}<br>' +
+                    'Providers: %{customdata[1]}<br>' +
+                    '<extra></extra>'
+                ),
+                marker=dict(
+                    size=12,
+                    symbol='circle',
+                    # Events with genetic data in red, others in blue; numeric
+                    # colors with a two-color scale avoid validating color names
+                    color=has_genetic[in_stage],
+                    colorscale=[[0, 'blue'], [1, 'red']],
+                    cmin=0,
+                    cmax=1
+                )
+            )
+        )
+    
     # Update layout
     fig.update_layout(
         title='Patient Lifecycle Timeline',